@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from . import users, auth, tasks, items, production_reports, warehouse_requests, orders, material_delivery, production_followup, part_pickup, qc_inspection, change_addendum, submissions, meetings, notifications, static_files
+from . import users, auth, tasks, items, dashboard, production_reports, warehouse_requests, orders, material_delivery, production_followup, part_pickup, qc_inspection, change_addendum, submissions, meetings, notifications, static_files, system, events, exports
 
 api_router = APIRouter()
 
@@ -8,6 +8,7 @@ api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
 api_router.include_router(items.router, prefix="/items", tags=["items"])
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
 api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
 api_router.include_router(production_reports.router, prefix="/production-reports", tags=["production-reports"])
 api_router.include_router(warehouse_requests.router, prefix="/warehouse", tags=["warehouse"])
@@ -20,3 +21,6 @@ api_router.include_router(change_addendum.router, prefix="/warehouse-requests",
 api_router.include_router(submissions.router, prefix="/api/v1", tags=["submissions"])
 api_router.include_router(meetings.router, prefix="/api/v1", tags=["meetings"])
 api_router.include_router(static_files.router, tags=["static-files"])
+api_router.include_router(system.router, prefix="/system", tags=["system"])
+api_router.include_router(events.router, prefix="/events", tags=["events"])
+api_router.include_router(exports.router, prefix="/exports", tags=["exports"])
@@ -1,27 +1,27 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...core.security import (
-    verify_password,
-    create_access_token
+    verify_password_async,
+    create_access_token,
+    get_user_by_email_async
 )
 from ...core.config import settings
 from ...schemas.token import Token
-from ...models.user import User
-from ...db.session import get_db
+from ...db.session import get_async_db
 
 router = APIRouter()
 
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Authenticate user
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await get_user_by_email_async(db, form_data.username)
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -31,7 +31,9 @@ async def login_for_access_token(
     # Create access token
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email},
+        expires_delta=access_token_expires,
+        user=user if settings.embed_role_claims and user.is_active else None
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
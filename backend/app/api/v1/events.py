@@ -0,0 +1,68 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from fastapi.security import OAuth2PasswordBearer
+
+from ...core.config import settings
+from ...core.events import broker, format_sse
+from ...core.security import credentials_exception, get_current_principal
+from ...db.session import AsyncSessionLocal
+from ...services.live_update_service import subscribed_snapshot
+
+router = APIRouter()
+
+# EventSource can't send headers, so the token may also come as ?access_token=
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/token", auto_error=False)
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    header_token: Optional[str] = Depends(optional_oauth2_scheme),
+    access_token: Optional[str] = Query(None)
+):
+    """
+    Server-Sent Events stream of live dashboard and task-board updates.
+    Starts with a `dashboard.snapshot` event, followed by deltas
+    (`tasks.counts`, `orders.active`, `task.created`) as changes commit.
+    """
+    token = header_token or access_token
+    if not token:
+        raise credentials_exception()
+
+    # Subscribed before the snapshot is read, so no delta committed meanwhile is lost
+    subscription = broker.subscribe()
+    try:
+        # A short-lived session: the stream itself must not hold a connection
+        async with AsyncSessionLocal() as db:
+            await get_current_principal(token, db)
+            snapshot = await subscribed_snapshot(db, subscription)
+    except BaseException:
+        subscription.close()
+        raise
+
+    async def event_stream():
+        try:
+            yield f"retry: {settings.sse_retry_ms}\n\n"
+            yield format_sse({"type": "dashboard.snapshot", "data": snapshot})
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(subscription.get(), timeout=settings.sse_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                if message is None:
+                    # Too far behind; the browser reconnects and gets a fresh snapshot
+                    break
+                yield format_sse(message)
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,148 @@
+from datetime import date, datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import false, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.security import get_current_principal, require_warehouse_staff
+from ...core.principal_cache import Principal
+from ...db.session import get_async_db
+from ...models.order import Order, OrderStatus, OrderType
+from ...models.production_log import ProductionLog
+from ...models.production_report import ProductionReport
+from ...models.warehouse_request import WarehouseRequest
+from ...services.export_service import ExportFormat, export_response
+from ...services.item_category_service import ItemCategoryService
+from ...services.item_search_service import ITEM, ItemSearchService
+from ...services.order_service import order_filters
+from ...services.production_report_service import production_report_filters
+from ...services.warehouse_request_service import warehouse_request_filters
+
+router = APIRouter()
+
+ORDER = Order.__table__
+PRODUCTION_LOG = ProductionLog.__table__
+PRODUCTION_REPORT = ProductionReport.__table__
+WAREHOUSE_REQUEST = WarehouseRequest.__table__
+
+# Exports take the same filters as the matching list endpoints and stream
+# every matching row; `gzip=true` downloads a compressed file.
+
+def columns(statement) -> List[str]:
+    return [column.name for column in statement.selected_columns]
+
+@router.get("/items")
+async def export_items(
+    search: Optional[str] = None,
+    category_id: Optional[int] = None,
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    gzip: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    _: Principal = Depends(get_current_principal)
+):
+    """Export the item catalog, filtered like GET /items"""
+    category_path = None
+    if category_id is not None:
+        category_path = await ItemCategoryService(db).get_path(category_id)
+    statement, ranked = ItemSearchService(db).filtered_statement(search, category_path)
+    if category_id is not None and category_path is None:
+        # Unknown category: nothing but the header
+        statement = statement.where(false())
+    if not ranked:
+        statement = statement.order_by(ITEM.c.id)
+    return export_response("items", statement, columns(statement), export_format, gzip)
+
+@router.get("/orders")
+async def export_orders(
+    order_type: Optional[OrderType] = None,
+    status: Optional[OrderStatus] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    gzip: bool = False,
+    _: Principal = Depends(require_warehouse_staff)
+):
+    """Export orders with their item codes - Requires warehouse staff, manager or admin role"""
+    statement = (
+        select(
+            ORDER.c.id,
+            ORDER.c.order_type,
+            ORDER.c.status,
+            ORDER.c.priority,
+            ORDER.c.item_id,
+            ITEM.c.item_code,
+            ORDER.c.quantity,
+            ORDER.c.warehouse_request_item_id,
+            ORDER.c.vendor_name,
+            ORDER.c.price,
+            ORDER.c.required_date,
+            ORDER.c.created_at,
+            ORDER.c.created_by_id,
+        )
+        .join(ITEM, ITEM.c.id == ORDER.c.item_id)
+        .where(*order_filters(order_type, status, start_date, end_date))
+        .order_by(ORDER.c.created_at.desc(), ORDER.c.id.desc())
+    )
+    return export_response("orders", statement, columns(statement), export_format, gzip)
+
+@router.get("/warehouse-requests")
+async def export_warehouse_requests(
+    status: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    gzip: bool = False,
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Export warehouse requests, filtered like GET /warehouse/warehouse-requests"""
+    statement = (
+        select(
+            WAREHOUSE_REQUEST.c.id,
+            WAREHOUSE_REQUEST.c.project_name,
+            WAREHOUSE_REQUEST.c.description,
+            WAREHOUSE_REQUEST.c.priority,
+            WAREHOUSE_REQUEST.c.status,
+            WAREHOUSE_REQUEST.c.request_type,
+            WAREHOUSE_REQUEST.c.requested_delivery_date,
+            WAREHOUSE_REQUEST.c.created_at,
+            WAREHOUSE_REQUEST.c.created_by_id,
+        )
+        .where(*warehouse_request_filters(current_user, status, start_date, end_date))
+        .order_by(WAREHOUSE_REQUEST.c.created_at.desc(), WAREHOUSE_REQUEST.c.id.desc())
+    )
+    return export_response("warehouse-requests", statement, columns(statement), export_format, gzip)
+
+@router.get("/production-reports")
+async def export_production_reports(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    shift: Optional[str] = None,
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    gzip: bool = False,
+    _: Principal = Depends(get_current_principal)
+):
+    """Export production logs (one row per report and item), filtered like GET /production-reports"""
+    statement = (
+        select(
+            PRODUCTION_REPORT.c.id.label("report_id"),
+            PRODUCTION_REPORT.c.report_date,
+            PRODUCTION_REPORT.c.shift,
+            ITEM.c.item_code,
+            ITEM.c.name.label("item_name"),
+            PRODUCTION_LOG.c.quantity_produced,
+            PRODUCTION_LOG.c.target_quantity,
+            PRODUCTION_LOG.c.efficiency,
+            PRODUCTION_LOG.c.remarks,
+        )
+        .join(PRODUCTION_LOG, PRODUCTION_LOG.c.report_id == PRODUCTION_REPORT.c.id)
+        .join(ITEM, ITEM.c.id == PRODUCTION_LOG.c.item_id)
+        .where(*production_report_filters(start_date, end_date, shift))
+        .order_by(
+            PRODUCTION_REPORT.c.report_date.desc(),
+            PRODUCTION_REPORT.c.shift,
+            PRODUCTION_REPORT.c.id,
+            PRODUCTION_LOG.c.id,
+        )
+    )
+    return export_response("production-reports", statement, columns(statement), export_format, gzip)
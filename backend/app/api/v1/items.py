@@ -1,110 +1,125 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import List, Optional
 
-from ...core.security import get_current_user, get_current_active_user, require_manager, require_admin
+from ...core.cache import cache, cached
+from ...core.pagination import set_next_cursor
+from ...core.query_counter import query_budget
+from ...core.security import get_current_user, get_current_active_user, get_current_principal, require_manager, require_admin
 from ...models.user import User
 from ...models.item import Item
 from ...models.item_category import ItemCategory
-from ...schemas.item import ItemResponse, ItemCreate
+from ...schemas.item import ItemResponse, ItemCreate, ItemImportReport, ItemSuggestion
 from ...schemas.item_category import ItemCategoryTree, ItemCategoryCreate
-from ...db.session import get_db
+from ...db.session import get_async_db
+from ...services.item_autocomplete_service import item_index
+from ...services.item_category_service import ItemCategoryService
+from ...services.item_import_service import ImportFormatError, ItemImportService, read_rows
+from ...services.item_search_service import ItemSearchService
 
 router = APIRouter()
 
+# Category filters cover subcategories, so new categories change results too
+@cached(prefix="items:list", tags=["items", "categories"])
+async def list_items(
+    db: AsyncSession,
+    search: Optional[str],
+    category_id: Optional[int],
+    skip: int,
+    limit: int,
+    cursor: Optional[str] = None
+) -> dict:
+    category_path = None
+    if category_id is not None:
+        category_path = await ItemCategoryService(db).get_path(category_id)
+        if category_path is None:
+            return {"items": [], "next_cursor": None}
+    rows, next_cursor = await ItemSearchService(db).search(search, category_path, skip, limit, cursor)
+    return {"items": [ItemResponse(**row) for row in rows], "next_cursor": next_cursor}
+
 @router.get("/categories", response_model=List[ItemCategoryTree])
 async def get_item_categories(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: User = Depends(get_current_active_user)
 ):
     """Get all item categories in a tree structure"""
-    # Get root categories (those without parent)
-    root_categories = db.query(ItemCategory).filter(
-        ItemCategory.parent_id.is_(None)
-    ).all()
-    
-    return [category.to_tree_dict() for category in root_categories]
+    return await ItemCategoryService(db).get_tree()
 
-@router.get("", response_model=List[ItemResponse])
+@router.get("", response_model=List[ItemResponse], dependencies=[Depends(query_budget(6))])
 async def get_items(
+    request: Request,
+    response: Response,
     search: Optional[str] = None,
     category_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     _: User = Depends(get_current_active_user)
 ):
     """
     Get all items with optional filtering
-    - search: Search in item_code, name, and description
-    - category_id: Filter by category
+    - search: Ranked search in item_code (also fuzzy), name, and description
+    - category_id: Filter by category, including its subcategories
+    - cursor: X-Next-Cursor of the previous page (preferred over skip)
     """
-    query = db.query(Item)
-    
-    # Apply category filter
-    if category_id is not None:
-        query = query.filter(Item.category_id == category_id)
-    
-    # Apply search filter
-    if search:
-        search_filter = or_(
-            Item.item_code.ilike(f"%{search}%"),
-            Item.name.ilike(f"%{search}%"),
-            Item.description.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
-    
-    # Apply pagination
-    items = query.offset(skip).limit(limit).all()
-    
-    # Enhance items with category name
-    response_items = []
-    for item in items:
-        item_dict = ItemResponse.from_orm(item).dict()
-        item_dict["category_name"] = item.category.name
-        response_items.append(ItemResponse(**item_dict))
-    
-    return response_items
+    page = await list_items(db, search, category_id, skip, limit, cursor)
+    set_next_cursor(response, request, page["next_cursor"])
+    return page["items"]
+
+@router.get("/autocomplete", response_model=List[ItemSuggestion])
+async def autocomplete_items(
+    q: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(10, ge=1, le=50),
+    _: User = Depends(get_current_principal)
+):
+    """
+    Items whose code or name starts with `q`, codes first.
+    Served from the in-memory prefix index, without a database query.
+    """
+    return await item_index.search(q, limit)
 
 @router.post("/categories", response_model=ItemCategoryTree)
 async def create_category(
     category_data: ItemCategoryCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_manager)
 ):
     """Create a new item category - Requires manager or admin role"""
     # Verify parent exists if provided
+    parent = None
     if category_data.parent_id:
-        parent = db.query(ItemCategory).filter(ItemCategory.id == category_data.parent_id).first()
+        parent = await db.get(ItemCategory, category_data.parent_id)
         if not parent:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Parent category not found"
             )
     
-    # Create category
-    db_category = ItemCategory(
+    db_category = await ItemCategoryService(db).create(
         name=category_data.name,
         description=category_data.description,
-        parent_id=category_data.parent_id
+        parent=parent
     )
     
-    db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
-    
-    return db_category.to_tree_dict()
+    # A new category has no children yet
+    return {
+        "id": db_category.id,
+        "name": db_category.name,
+        "description": db_category.description,
+        "children": [],
+    }
 
 @router.post("", response_model=ItemResponse)
 async def create_item(
     item_data: ItemCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_manager)
 ):
     """Create a new item - Requires manager or admin role"""
     # Verify category exists
-    category = db.query(ItemCategory).filter(ItemCategory.id == item_data.category_id).first()
+    category = await db.get(ItemCategory, item_data.category_id)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -112,7 +127,8 @@ async def create_item(
         )
     
     # Check if item_code is unique
-    if db.query(Item).filter(Item.item_code == item_data.item_code).first():
+    existing = await db.execute(select(Item.id).where(Item.item_code == item_data.item_code))
+    if existing.first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Item code already exists"
@@ -127,11 +143,32 @@ async def create_item(
     )
     
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    await db.commit()
+    await db.refresh(db_item)
+    await cache.invalidate_tags("items")
+    await item_index.add(db_item.id, db_item.item_code, db_item.name)
     
     # Add category name to response
     response = ItemResponse.from_orm(db_item).dict()
     response["category_name"] = category.name
     
     return ItemResponse(**response)
+
+@router.post("/import", response_model=ItemImportReport)
+async def import_items(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_manager)
+):
+    """
+    Bulk-create items from a CSV or XLSX file - Requires manager or admin role.
+    Columns: item_code, name, description (optional), category_id. Valid rows
+    are imported; the others are listed with their errors.
+    """
+    try:
+        return await ItemImportService(db).import_rows(read_rows(file.filename or "", file.file))
+    except ImportFormatError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
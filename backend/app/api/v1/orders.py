@@ -1,20 +1,85 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...db.session import get_db
+from ...core.pagination import set_next_cursor
+from ...core.principal_cache import Principal
+from ...core.query_counter import query_budget
+from ...db.session import get_async_db
+from ...models.order import OrderStatus, OrderType
 from ...services.order_service import OrderService
-from ...schemas.order import Order, OrderCreate, OrderUpdate
-from ...core.security import get_current_active_user, require_manager, require_warehouse_staff
+from ...services.order_state_machine import InvalidTransition, OrderConflict
+from ...schemas.order import (
+    Order,
+    OrderCreate,
+    OrderFacets,
+    OrderSort,
+    OrderTransitionResult,
+    OrderTransitionsRequest,
+    OrderUpdate,
+)
+from ...core.security import get_current_active_user, get_current_principal, require_manager, require_warehouse_staff
 from ...models.user import User
 
 router = APIRouter()
 
+def order_list_filters(
+    order_type: Optional[OrderType] = None,
+    status: Optional[List[OrderStatus]] = Query(None),
+    item_id: Optional[int] = None,
+    priority: Optional[str] = None,
+    vendor_name: Optional[str] = None,
+    required_from: Optional[datetime] = None,
+    required_to: Optional[datetime] = None
+) -> dict:
+    """Filters shared by the order list and its facet counts; `status` may repeat"""
+    return {
+        "order_type": order_type,
+        "status": status,
+        "item_id": item_id,
+        "priority": priority,
+        "vendor_name": vendor_name,
+        "required_from": required_from,
+        "required_to": required_to,
+    }
+
+@router.get("", response_model=List[Order], dependencies=[Depends(query_budget(2))])
+async def list_orders(
+    request: Request,
+    response: Response,
+    filters: dict = Depends(order_list_filters),
+    sort: OrderSort = OrderSort.NEWEST,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    List orders, filtered and sorted (newest, oldest or due). The next page's
+    cursor is returned in the X-Next-Cursor header.
+    """
+    orders, next_cursor = await OrderService(db).list_orders(limit, cursor, sort, **filters)
+    set_next_cursor(response, request, next_cursor)
+    return orders
+
+@router.get("/facets", response_model=OrderFacets)
+async def get_order_facets(
+    filters: dict = Depends(order_list_filters),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Order counts per type, status and priority for the list filters. Each
+    facet's counts apply all filters but its own.
+    """
+    return await OrderService(db).order_facets(**filters)
+
 @router.post("/{warehouse_request_item_id}/shortage", response_model=Order)
-def create_shortage_order(
+async def create_shortage_order(
     warehouse_request_item_id: int,
     order_data: OrderCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_warehouse_staff)
 ):
     """
@@ -22,8 +87,7 @@ def create_shortage_order(
     This endpoint is called when a warehouse request item is marked as shortage.
     """
     try:
-        order = OrderService.create_shortage_order(
-            db=db,
+        order = await OrderService(db).create_shortage_order(
             item_id=order_data.item_id,
             warehouse_request_item_id=warehouse_request_item_id,
             created_by_id=current_user.id,
@@ -36,58 +100,96 @@ def create_shortage_order(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/transitions", response_model=List[OrderTransitionResult])
+async def transition_orders(
+    request: OrderTransitionsRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_warehouse_staff)
+):
+    """
+    Change the status of several orders at once - Requires warehouse staff or manager role.
+    Each change is applied or rejected on its own; rejected ones report the order's
+    current status and version (conflict, invalid_transition) or not_found.
+    """
+    return await OrderService(db).transition_orders(request.changes, current_user.id)
+
 @router.put("/{order_id}", response_model=Order)
-def update_order(
+async def update_order(
     order_id: int,
     order_update: OrderUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_warehouse_staff)
 ):
     """
     Update an order's status and other details - Requires warehouse staff or manager role.
     When an order is marked as completed, it will automatically update the related warehouse request item.
+    Pass the order's `version` to be refused (409) if someone changed it in the meantime.
     """
+    if order_update.status is None:
+        raise HTTPException(status_code=400, detail="status is required")
     try:
-        return OrderService.update_order_status(
-            db=db,
+        return await OrderService(db).update_order_status(
             order_id=order_id,
             status=order_update.status,
-            remarks=order_update.remarks
+            user_id=current_user.id,
+            remarks=order_update.remarks,
+            expected_version=order_update.version
         )
+    except InvalidTransition as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OrderConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{warehouse_request_item_id}/orders", response_model=List[Order])
-def get_item_orders(
+async def get_item_orders(
     warehouse_request_item_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all orders related to a specific warehouse request item."""
-    return OrderService.get_related_orders(db, warehouse_request_item_id)
+    return await OrderService.get_related_orders(db, warehouse_request_item_id)
 
-@router.get("/procurement", response_model=List[Order])
-def get_procurement_orders(
-    db: Session = Depends(get_db),
+@router.get("/procurement", response_model=List[Order], dependencies=[Depends(query_budget(2))])
+async def get_procurement_orders(
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get all active procurement orders."""
-    return OrderService.get_procurement_orders(db)
+    """Get active (draft or submitted) procurement orders, newest first, a page at a time."""
+    orders, next_cursor = await OrderService(db).list_orders(
+        limit,
+        cursor,
+        order_type=OrderType.PROCUREMENT,
+        status=[OrderStatus.DRAFT, OrderStatus.SUBMITTED]
+    )
+    set_next_cursor(response, request, next_cursor)
+    return orders
 
 @router.post("/{order_id}/mark-purchased", response_model=Order)
-def mark_order_purchased(
+async def mark_order_purchased(
     order_id: int,
     purchase_data: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_manager)
 ):
     """Mark a procurement order as purchased and create a receiving task - Requires manager or admin role."""
-    return OrderService.mark_order_purchased(
-        db=db,
-        order_id=order_id,
-        vendor_name=purchase_data["vendor_name"],
-        price=purchase_data["price"],
-        user_id=current_user.id
-    )
+    try:
+        return await OrderService(db).mark_order_purchased(
+            order_id=order_id,
+            vendor_name=purchase_data["vendor_name"],
+            price=purchase_data["price"],
+            user_id=current_user.id
+        )
+    except InvalidTransition as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OrderConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
-from ...db.session import get_db
+from ...db.session import get_async_db
 from ...services.production_followup_service import ProductionFollowUpService, FollowUpStatus
 from ...core.security import get_current_user
 from ...models.user import User
@@ -19,21 +21,25 @@ class FollowUpUpdate(BaseModel):
 
 @router.get("/followup-tasks", response_model=List[TaskResponse])
 async def get_followup_tasks(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all active follow-up tasks"""
-    tasks = db.query(Task).filter(
-        Task.type == TaskType.FOLLOWUP_WITH_SUBCONTRACTOR,
-        Task.status != "completed"
-    ).all()
-    return tasks
+    result = await db.execute(
+        select(Task)
+        .options(selectinload(Task.creator), selectinload(Task.assignee))
+        .where(
+            Task.type == TaskType.FOLLOWUP_WITH_SUBCONTRACTOR,
+            Task.status != "completed"
+        )
+    )
+    return result.scalars().all()
 
 @router.post("/followup-tasks/{task_id}", response_model=TaskResponse)
 async def log_followup(
     task_id: int,
     update: FollowUpUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Log a follow-up with the subcontractor"""
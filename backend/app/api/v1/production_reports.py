@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import date, datetime, timedelta
 
+from ...core.cache import cache
+from ...core.pagination import Keyset, set_next_cursor
+from ...core.query_counter import query_budget
 from ...core.security import get_current_user, get_current_active_user, require_production_manager
 from ...models.user import User
 from ...models.production_report import ProductionReport
@@ -13,23 +18,35 @@ from ...schemas.production_report import (
     ProductionReportCreate,
     ProductionReportResponse,
 )
-from ...db.session import get_db
+from ...db.session import get_async_db
+from ...services.production_report_service import production_report_filters
+from ...services.production_rollup_service import ProductionRollupService
 
 router = APIRouter()
 
+PRODUCTION_REPORTS_KEYSET = Keyset(
+    "production-reports",
+    (ProductionReport.report_date, True),
+    (ProductionReport.shift, False),
+    (ProductionReport.id, False),
+)
+
 @router.post("", response_model=ProductionReportResponse)
 async def create_production_report(
     report_data: ProductionReportCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_production_manager)
 ):
     """Create a new production report - Requires production manager or higher role"""
     
     # Check if report for the same date and shift already exists
-    existing_report = db.query(ProductionReport).filter(
-        ProductionReport.report_date == report_data.report_date,
-        ProductionReport.shift == report_data.shift
-    ).first()
+    result = await db.execute(
+        select(ProductionReport.id).where(
+            ProductionReport.report_date == report_data.report_date,
+            ProductionReport.shift == report_data.shift
+        )
+    )
+    existing_report = result.first()
     
     if existing_report:
         raise HTTPException(
@@ -47,11 +64,14 @@ async def create_production_report(
         created_by_id=current_user.id
     )
     
+    # Verify all items exist with one query
+    item_ids = {log_data.item_id for log_data in report_data.production_logs}
+    result = await db.execute(select(Item).where(Item.id.in_(item_ids)))
+    items = {item.id: item for item in result.scalars().all()}
+    
     # Add production logs
     for log_data in report_data.production_logs:
-        # Verify item exists
-        item = db.query(Item).filter(Item.id == log_data.item_id).first()
-        if not item:
+        if log_data.item_id not in items:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Item with id {log_data.item_id} not found"
@@ -80,8 +100,10 @@ async def create_production_report(
         db_report.stoppages.append(db_stoppage)
     
     db.add(db_report)
-    db.commit()
-    db.refresh(db_report)
+    # Same transaction as the report, so the dashboard rollup can't drift from the logs
+    await ProductionRollupService(db).apply_report(db_report)
+    await db.commit()
+    await cache.invalidate_tags("dashboard")
     
     # Add created_by_name to response
     response = ProductionReportResponse.from_orm(db_report)
@@ -89,40 +111,39 @@ async def create_production_report(
     
     # Add item details to production logs
     for log in response.production_logs:
-        item = db.query(Item).filter(Item.id == log.item_id).first()
+        item = items[log.item_id]
         log.item_name = item.name
         log.item_code = item.item_code
     
     return response
 
-@router.get("", response_model=List[ProductionReportResponse])
+@router.get("", response_model=List[ProductionReportResponse], dependencies=[Depends(query_budget(8))])
 async def get_production_reports(
+    request: Request,
+    response: Response,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     shift: Optional[str] = None,
     skip: int = 0,
     limit: int = 20,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get list of production reports with optional date range and shift filter"""
-    query = db.query(ProductionReport)
-    
-    # Apply date range filter
-    if start_date:
-        query = query.filter(ProductionReport.report_date >= start_date)
-    if end_date:
-        query = query.filter(ProductionReport.report_date <= end_date)
-    
-    # Apply shift filter
-    if shift:
-        query = query.filter(ProductionReport.shift == shift)
-    
-    # Order by date and shift
-    query = query.order_by(ProductionReport.report_date.desc(), ProductionReport.shift)
+    query = select(ProductionReport).options(
+        selectinload(ProductionReport.created_by),
+        selectinload(ProductionReport.production_logs).selectinload(ProductionLog.item),
+        selectinload(ProductionReport.stoppages)
+    ).where(*production_report_filters(start_date, end_date, shift))
     
-    # Apply pagination
-    reports = query.offset(skip).limit(limit).all()
+    # Order by date and shift; the cursor (X-Next-Cursor of the previous page) is preferred over skip
+    query = PRODUCTION_REPORTS_KEYSET.apply(query, cursor, limit)
+    if skip and not cursor:
+        query = query.offset(skip)
+    result = await db.execute(query)
+    reports, next_cursor = PRODUCTION_REPORTS_KEYSET.page(result.scalars().all(), limit)
+    set_next_cursor(response, request, next_cursor)
     
     # Prepare response with additional fields
     response_reports = []
@@ -130,11 +151,10 @@ async def get_production_reports(
         report_response = ProductionReportResponse.from_orm(report)
         report_response.created_by_name = report.created_by.full_name
         
-        # Add item details to production logs
-        for log in report_response.production_logs:
-            item = db.query(Item).filter(Item.id == log.item_id).first()
-            log.item_name = item.name
-            log.item_code = item.item_code
+        # Add item details to production logs (items are loaded with the logs)
+        for log_response, log in zip(report_response.production_logs, report.production_logs):
+            log_response.item_name = log.item.name
+            log_response.item_code = log.item.item_code
         
         response_reports.append(report_response)
     
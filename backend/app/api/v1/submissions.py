@@ -34,16 +34,17 @@ def list_submissions(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1),
     creator_id: int = Query(None),
+    cursor: str = Query(None),
     current_user: User = Depends(get_current_user)
 ) -> SubmissionList:
     """
-    Retrieve submissions.
+    Retrieve submissions, newest first. Pass `next_cursor` as `cursor` for the next page.
     """
-    submissions = submission_service.get_submissions(
-        db=db, skip=skip, limit=limit, creator_id=creator_id
+    submissions, next_cursor = submission_service.get_submissions(
+        db=db, skip=skip, limit=limit, creator_id=creator_id, cursor=cursor
     )
     total = len(submissions)  # You might want to do a separate count query for better performance
-    return SubmissionList(total=total, submissions=submissions)
+    return SubmissionList(total=total, submissions=submissions, next_cursor=next_cursor)
 
 @router.get("/submissions/{submission_id}", response_model=Submission)
 def get_submission(
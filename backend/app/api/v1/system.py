@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+
+from app.core.security import require_admin, password_pool
+from app.db.session import get_pool_stats
+from app.models.user import User
+
+router = APIRouter()
+
+@router.get("/db-pool")
+async def read_db_pool_stats(_: User = Depends(require_admin)):
+    """Connection pool checkout/wait statistics per engine - Requires admin role"""
+    return get_pool_stats()
+
+@router.get("/password-pool")
+async def read_password_pool_stats(_: User = Depends(require_admin)):
+    """Password hashing pool counters - Requires admin role"""
+    return password_pool.stats()
@@ -1,14 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from app.core.security import get_current_user, get_current_active_user, get_password_hash, require_admin
+from app.core.security import (
+    get_current_user, get_current_active_user, get_password_hash_async,
+    get_password_hashes_async, require_admin
+)
+from app.core.pagination import Keyset, set_next_cursor
 from app.schemas.user import UserCreate, UserResponse
 from app.models.user import User
 from app.db.session import get_db
+from app.services import user_service
 
 router = APIRouter()
 
+USERS_KEYSET = Keyset("users", (User.id, False))
+
 @router.post("/register", response_model=UserResponse)
 async def register_user(
     user_create: UserCreate,
@@ -27,7 +34,7 @@ async def register_user(
     db_user = User(
         email=user_create.email,
         full_name=user_create.full_name,
-        hashed_password=get_password_hash(user_create.password)
+        hashed_password=await get_password_hash_async(user_create.password)
     )
     db.add(db_user)
     db.commit()
@@ -35,17 +42,75 @@ async def register_user(
     
     return db_user
 
+@router.post("/register/bulk", response_model=List[UserResponse])
+async def register_users_bulk(
+    users_create: List[UserCreate],
+    db: Session = Depends(get_db),
+    _: User = Depends(require_admin)
+):
+    """Register several users at once (e.g. provisioning a new shift) - Requires admin role"""
+    emails = [user_create.email for user_create in users_create]
+    if len(set(emails)) != len(emails):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Duplicate emails in request"
+        )
+    existing = db.query(User.email).filter(User.email.in_(emails)).all()
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Email already registered: {', '.join(email for (email,) in existing)}"
+        )
+
+    # Hash the whole batch on the password pool instead of one bcrypt call per user
+    hashed_passwords = await get_password_hashes_async(
+        [user_create.password for user_create in users_create]
+    )
+    db_users = [
+        User(
+            email=user_create.email,
+            full_name=user_create.full_name,
+            hashed_password=hashed_password
+        )
+        for user_create, hashed_password in zip(users_create, hashed_passwords)
+    ]
+    db.add_all(db_users)
+    db.commit()
+    for db_user in db_users:
+        db.refresh(db_user)
+
+    return db_users
+
 @router.get("/me", response_model=UserResponse)
 async def read_users_me(current_user = Depends(get_current_active_user)):
     return current_user
 
 @router.get("/", response_model=List[UserResponse])
 async def read_users(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     _: User = Depends(require_admin)
 ):
-    """Get all users - Requires admin role"""
-    users = db.query(User).offset(skip).limit(limit).all()
+    """
+    Get all users - Requires admin role
+    - cursor: X-Next-Cursor of the previous page (preferred over skip)
+    """
+    query = USERS_KEYSET.apply(db.query(User), cursor, limit)
+    if skip and not cursor:
+        query = query.offset(skip)
+    users, next_cursor = USERS_KEYSET.page(query.all(), limit)
+    set_next_cursor(response, request, next_cursor)
     return users
+
+@router.put("/{user_id}/deactivate", response_model=UserResponse)
+async def deactivate_user(
+    user_id: int,
+    db: Session = Depends(get_db),
+    _: User = Depends(require_admin)
+):
+    """Deactivate a user - Requires admin role"""
+    return user_service.deactivate_user(db, user_id)
@@ -1,23 +1,37 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from datetime import datetime
 
+from ...core.pagination import Keyset, set_next_cursor
+from ...core.query_counter import query_budget
 from ...core.security import get_current_user, get_current_active_user, require_warehouse_staff
 from ...db.session import get_db
 from ...models.user import User
-from ...models.item import Item
 from ...models.warehouse_request import WarehouseRequest, WarehouseRequestItem
-from ...models.order import Order
 from ...schemas.warehouse_request import (
     WarehouseRequest as WarehouseRequestSchema,
     WarehouseRequestCreate,
     WarehouseRequestUpdate,
     WarehouseRequestItemUpdate,
+    WarehouseRequestItemsUpdate,
+    WarehouseRequestItemsUpdateResult,
+)
+from ...services.warehouse_request_service import (
+    apply_item_updates,
+    request_item_query,
+    warehouse_request_filters,
+    warehouse_request_query,
 )
 
 router = APIRouter()
 
+WAREHOUSE_REQUESTS_KEYSET = Keyset(
+    "warehouse-requests",
+    (WarehouseRequest.created_at, True),
+    (WarehouseRequest.id, True),
+)
+
 @router.post("/warehouse-requests", response_model=WarehouseRequestSchema)
 def create_warehouse_request(
     *,
@@ -48,40 +62,37 @@ def create_warehouse_request(
         db.add(db_item)
     
     db.commit()
-    db.refresh(db_request)
-    return db_request
+    return warehouse_request_query(db).filter(WarehouseRequest.id == db_request.id).populate_existing().one()
 
-@router.get("/warehouse-requests", response_model=List[WarehouseRequestSchema])
+@router.get("/warehouse-requests", response_model=List[WarehouseRequestSchema], dependencies=[Depends(query_budget(6))])
 def get_warehouse_requests(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
     status: str = None,
     start_date: datetime = None,
     end_date: datetime = None
 ):
-    """Get all warehouse requests with optional filtering."""
-    query = db.query(WarehouseRequest)
-
-    # Apply filters
-    if status:
-        query = query.filter(WarehouseRequest.status == status)
-    if start_date:
-        query = query.filter(WarehouseRequest.created_at >= start_date)
-    if end_date:
-        query = query.filter(WarehouseRequest.created_at <= end_date)
-
+    """Get all warehouse requests with optional filtering, newest first."""
     # Only warehouse staff can see all requests
-    if not current_user.is_warehouse_staff:
-        query = query.filter(WarehouseRequest.created_by_id == current_user.id)
+    query = warehouse_request_query(db).filter(
+        *warehouse_request_filters(current_user, status, start_date, end_date)
+    )
 
-    # Apply pagination
-    requests = query.offset(skip).limit(limit).all()
+    # Apply pagination; the cursor (X-Next-Cursor of the previous page) is preferred over skip
+    query = WAREHOUSE_REQUESTS_KEYSET.apply(query, cursor, limit)
+    if skip and not cursor:
+        query = query.offset(skip)
+    requests, next_cursor = WAREHOUSE_REQUESTS_KEYSET.page(query.all(), limit)
+    set_next_cursor(response, request, next_cursor)
     return requests
 
-@router.get("/warehouse-requests/{request_id}", response_model=WarehouseRequestSchema)
+@router.get("/warehouse-requests/{request_id}", response_model=WarehouseRequestSchema, dependencies=[Depends(query_budget(6))])
 def get_warehouse_request(
     *,
     db: Session = Depends(get_db),
@@ -89,7 +100,7 @@ def get_warehouse_request(
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific warehouse request by ID."""
-    request = db.query(WarehouseRequest).filter(WarehouseRequest.id == request_id).first()
+    request = warehouse_request_query(db).filter(WarehouseRequest.id == request_id).first()
     if not request:
         raise HTTPException(status_code=404, detail="Warehouse request not found")
     
@@ -108,7 +119,7 @@ def update_warehouse_request(
     current_user: User = Depends(get_current_user)
 ):
     """Update a warehouse request."""
-    request = db.query(WarehouseRequest).filter(WarehouseRequest.id == request_id).first()
+    request = warehouse_request_query(db).filter(WarehouseRequest.id == request_id).first()
     if not request:
         raise HTTPException(status_code=404, detail="Warehouse request not found")
 
@@ -125,11 +136,60 @@ def update_warehouse_request(
         setattr(request, field, value)
 
     db.commit()
-    db.refresh(request)
-    return request
+    # Reload with the items in place of a refresh, which would lazy-load them per row
+    return warehouse_request_query(db).filter(WarehouseRequest.id == request_id).populate_existing().one()
+
+@router.put("/warehouse-requests/{request_id}/items", response_model=WarehouseRequestItemsUpdateResult)
+def update_warehouse_request_items(
+    *,
+    db: Session = Depends(get_db),
+    request_id: int,
+    items_update: WarehouseRequestItemsUpdate,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Update several items of a warehouse request at once, e.g. a whole kit.
+    Same shortage workflow as the single-item update, in one transaction.
+    """
+    if not current_user.is_warehouse_staff:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    item_ids = [line.id for line in items_update.items]
+    if not item_ids:
+        raise HTTPException(status_code=400, detail="No items to update")
+    if len(set(item_ids)) != len(item_ids):
+        raise HTTPException(status_code=400, detail="Each item may only be updated once per request")
+
+    # All lines with their request, items and categories in one query
+    request_items = {
+        request_item.id: request_item
+        for request_item in request_item_query(db).filter(
+            WarehouseRequestItem.request_id == request_id,
+            WarehouseRequestItem.id.in_(item_ids)
+        )
+    }
+    missing = [item_id for item_id in item_ids if item_id not in request_items]
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Warehouse request item(s) not found: {', '.join(map(str, missing))}"
+        )
+
+    request = request_items[item_ids[0]].request
+    updates = [
+        (request_items[line.id], WarehouseRequestItemUpdate(**line.dict(exclude={"id"}, exclude_unset=True)))
+        for line in items_update.items
+    ]
+    placement = apply_item_updates(db, request, updates, current_user.id)
+    return {
+        "updated": len(updates),
+        "orders_created": len(placement.created),
+        "orders_extended": len(placement.merged),
+        "request_status": request.status
+    }
 
 @router.put("/warehouse-requests/{request_id}/items/{item_id}")
-async def update_warehouse_request_item(
+def update_warehouse_request_item(
     *,
     db: Session = Depends(get_db),
     request_id: int,
@@ -144,7 +204,7 @@ async def update_warehouse_request_item(
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
     # Get the request item
-    request_item = db.query(WarehouseRequestItem).filter(
+    request_item = request_item_query(db).filter(
         WarehouseRequestItem.request_id == request_id,
         WarehouseRequestItem.id == item_id
     ).first()
@@ -152,48 +212,10 @@ async def update_warehouse_request_item(
     if not request_item:
         raise HTTPException(status_code=404, detail="Warehouse request item not found")
     
-    # If status is being updated to backordered, trigger shortage workflow
-    if item_update.status == "backordered":
-        # Get the item details
-        item = db.query(Item).filter(Item.id == request_item.item_id).first()
-        if not item:
-            raise HTTPException(status_code=404, detail="Item not found")
-        
-        # Determine order type based on item category or other business rules
-        order_type = "production" if item.category.name == "Manufactured" else "procurement"
-        
-        # Create new order
-        new_order = Order(
-            order_type=order_type,
-            status="draft",
-            priority=request_item.request.priority,  # Inherit priority from request
-            quantity=request_item.quantity_requested,
-            remarks=f"Auto-generated due to shortage in warehouse request #{request_id}",
-            required_date=datetime.now() + timedelta(days=7),  # Example: Set due date to 7 days from now
-            created_by_id=current_user.id,
-            item_id=item.id,
-            warehouse_request_item_id=item_id
-        )
-        
-        db.add(new_order)
-    
-    # Update the request item
-    for field, value in item_update.dict(exclude_unset=True).items():
-        setattr(request_item, field, value)
-    
-    # If all items are processed, update the main request status
-    request = request_item.request
-    all_items_processed = all(
-        item.status in ["ready", "backordered"]
-        for item in request.request_items
-    )
-    
-    if all_items_processed:
-        request.status = "processing"
-    
-    db.commit()
-    
+    placement = apply_item_updates(db, request_item.request, [(request_item, item_update)], current_user.id)
+
     return {
         "message": "Item updated successfully",
-        "order_created": item_update.status == "backordered"
+        "order_created": bool(placement.created),
+        "order_extended": bool(placement.merged)
     }
@@ -0,0 +1,423 @@
+"""
+Shared cache for reference data and aggregates.
+
+Values are stored JSON-encoded under `<cache_namespace>:<key>`. With REDIS_URL
+set the cache lives in Redis and is shared by all workers; otherwise (tests,
+single-process development) an in-process LRU is used. Entries can carry tags,
+and `invalidate_tags` drops every entry with any of the given tags, e.g. all
+cached item lists after an item is created.
+
+Redis errors never fail a request: reads count as misses and writes are
+skipped, with a warning in the log.
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, Set, Tuple, Type, TypeVar, Union
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, parse_obj_as
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+Tags = Union[Iterable[str], Callable[..., Iterable[str]]]
+
+
+class MemoryCacheBackend:
+    """In-process LRU with per-entry expiry and a tag index"""
+    name = "memory"
+
+    def __init__(self, maxsize: int = 2048, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, str, FrozenSet[str]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+    async def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value, _ = entry
+            if expires_at <= self._clock():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: str, ttl: int, tags: Iterable[str] = ()) -> None:
+        tags = frozenset(tags)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (self._clock() + ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    async def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._remove(key)
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        with self._lock:
+            keys = set().union(*(self._tags.get(tag, set()) for tag in tags))
+            return sum(self._remove(key) for key in keys)
+
+    async def incr(self, key: str) -> int:
+        with self._lock:
+            entry = self._entries.get(key)
+            value = int(entry[1]) + 1 if entry is not None else 1
+            self._remove(key)
+            self._entries[key] = (float("inf"), str(value), frozenset())
+            return value
+
+    async def ping(self) -> bool:
+        return True
+
+    async def clear(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self._remove(key)
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisCacheBackend:
+    """Redis storage; each tag is a set of the keys carrying it"""
+    name = "redis"
+
+    def __init__(self, url: str):
+        # Imported here so the redis package is only needed when REDIS_URL is set
+        import redis.asyncio as redis
+
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: str, ttl: int, tags: Iterable[str] = ()) -> None:
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.set(key, value, ex=ttl)
+            for tag in tags:
+                pipe.sadd(tag, key)
+                # Keep the tag set alive as long as its longest-lived key
+                # (GT/NX need Redis 7): extend an existing TTL, set a missing one
+                pipe.expire(tag, ttl, gt=True)
+                pipe.expire(tag, ttl, nx=True)
+            await pipe.execute()
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._client.delete(*keys)
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        keys = set()
+        for tag in tags:
+            keys.update(await self._client.smembers(tag))
+        removed = await self._client.delete(*keys) if keys else 0
+        await self._client.delete(*tags)
+        return removed
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(key)
+
+    async def ping(self) -> bool:
+        return await self._client.ping()
+
+    async def clear(self, prefix: str) -> None:
+        keys = [key async for key in self._client.scan_iter(match=f"{prefix}*")]
+        if keys:
+            await self._client.delete(*keys)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class Cache:
+    """Namespaced, JSON-serializing facade over a cache backend"""
+
+    def __init__(self, backend, namespace: str = "mrdpol", default_ttl: int = 300):
+        self.backend = backend
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        # Invalidations per tag seen by this process, so a result computed
+        # while its tag was invalidated isn't written back
+        self._tag_epochs: Dict[str, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Event loop used for invalidations requested from worker threads"""
+        self._loop = loop
+
+    def tag_epoch(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(self._tag_epochs.get(tag, 0) for tag in tags)
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _tag(self, tag: str) -> str:
+        return f"{self.namespace}:tag:{tag}"
+
+    async def get(self, key: str, model: Optional[Type[T]] = None) -> Optional[Any]:
+        """Cached value or None; with `model` the value is parsed into that type"""
+        try:
+            raw = await self.backend.get(self._key(key))
+        except Exception as exc:
+            logger.warning("Cache read of %s failed: %s", key, exc)
+            return None
+        if raw is None:
+            return None
+        value = json.loads(raw)
+        return parse_obj_as(model, value) if model is not None else value
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Iterable[str] = ()) -> None:
+        """Store a JSON-encodable value (pydantic models and datetimes included)"""
+        raw = json.dumps(jsonable_encoder(value), separators=(",", ":"))
+        try:
+            await self.backend.set(
+                self._key(key),
+                raw,
+                ttl or self.default_ttl,
+                [self._tag(tag) for tag in tags]
+            )
+        except Exception as exc:
+            logger.warning("Cache write of %s failed: %s", key, exc)
+
+    async def delete(self, *keys: str) -> None:
+        try:
+            await self.backend.delete(*(self._key(key) for key in keys))
+        except Exception as exc:
+            logger.warning("Cache delete of %s failed: %s", keys, exc)
+
+    async def incr(self, key: str) -> Optional[int]:
+        """
+        Atomically increment a counter that never expires, e.g. a version
+        shared by all workers; None if the backend is unavailable
+        """
+        try:
+            return await self.backend.incr(self._key(key))
+        except Exception as exc:
+            logger.warning("Cache increment of %s failed: %s", key, exc)
+            return None
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """Drop all entries carrying any of the tags; returns the number removed"""
+        for tag in tags:
+            self._tag_epochs[tag] = self._tag_epochs.get(tag, 0) + 1
+        try:
+            return await self.backend.invalidate_tags(*(self._tag(tag) for tag in tags))
+        except Exception as exc:
+            logger.warning("Cache invalidation of tags %s failed: %s", tags, exc)
+            return 0
+
+    def invalidate_tags_later(self, *tags: str) -> None:
+        """
+        invalidate_tags for synchronous code such as ORM event hooks: scheduled
+        on the running event loop, or on the bound loop from a worker thread.
+        Without a loop (scripts) only the TTL bounds staleness.
+        """
+        for tag in tags:
+            self._tag_epochs[tag] = self._tag_epochs.get(tag, 0) + 1
+        try:
+            asyncio.get_running_loop().create_task(self.invalidate_tags(*tags))
+            return
+        except RuntimeError:
+            pass
+        if self._loop is not None and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.invalidate_tags(*tags), self._loop)
+
+    def set_later(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """set for synchronous code, scheduled like invalidate_tags_later"""
+        try:
+            asyncio.get_running_loop().create_task(self.set(key, value, ttl))
+            return
+        except RuntimeError:
+            pass
+        if self._loop is not None and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.set(key, value, ttl), self._loop)
+
+    async def clear(self) -> None:
+        """Drop every entry of this namespace"""
+        await self.backend.clear(f"{self.namespace}:")
+
+    async def ping(self) -> bool:
+        return await self.backend.ping()
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+def _key_argument(value: Any) -> Any:
+    """
+    JSON form of an argument for the cache key. Sessions don't identify a call
+    and other arbitrary objects (e.g. the service instance a method is bound
+    to) only contribute their type.
+    """
+    if isinstance(value, (Session, AsyncSession)):
+        return None
+    if isinstance(value, (str, int, float, bool, type(None), list, tuple, dict, BaseModel, Enum)) or hasattr(value, "isoformat"):
+        return jsonable_encoder(value)
+    return type(value).__qualname__
+
+
+def make_key(prefix: str, args: tuple = (), kwargs: Optional[dict] = None) -> str:
+    """Cache key from a prefix and the identifying call arguments"""
+    positional = [_key_argument(arg) for arg in args]
+    named = {name: _key_argument(value) for name, value in (kwargs or {}).items()}
+    digest = hashlib.sha1(
+        json.dumps([positional, named], default=str, sort_keys=True).encode()
+    ).hexdigest()[:16]
+    return f"{prefix}:{digest}"
+
+
+# Computations in progress per cache key, shared by concurrent callers
+_in_flight: Dict[str, "asyncio.Future"] = {}
+
+
+def computation_session() -> AsyncSession:
+    """Session of a shared computation; cached results are reads, so from the replica when there is one"""
+    from ..db.session import AsyncReplicaSessionLocal
+
+    return AsyncReplicaSessionLocal()
+
+
+def _uses_session(value: Any) -> bool:
+    return isinstance(value, AsyncSession) or isinstance(getattr(value, "db", None), AsyncSession)
+
+
+def _on_session(value: Any, session: AsyncSession) -> Any:
+    """A session argument, or a service bound to one, moved to `session`"""
+    if isinstance(value, AsyncSession):
+        return session
+    if isinstance(getattr(value, "db", None), AsyncSession):
+        # Services take their session as their only constructor argument
+        return type(value)(session)
+    return value
+
+
+def cached(
+    prefix: Optional[str] = None,
+    ttl: Optional[int] = None,
+    tags: Tags = (),
+    model: Optional[Type] = None,
+):
+    """
+    Cache the JSON-encodable result of an async function or service method.
+
+    The key is built from `prefix` (default: the function's qualified name) and
+    the call's plain arguments; sessions and `self` don't take part. `tags` may
+    be a callable receiving the call's arguments. Concurrent misses for the same
+    key within a process wait for a single computation, which runs on its own
+    short-lived session (see computation_session) in place of the first
+    caller's, or of the session the service it's a method of is bound to: no
+    caller's transaction is shared or kept busy for the others. Cached results
+    come back as plain JSON data unless `model` is given.
+    """
+    def decorator(func: Callable) -> Callable:
+        if not inspect.iscoroutinefunction(func):
+            raise TypeError("@cached only supports async functions")
+        key_prefix = prefix or f"{func.__module__}.{func.__qualname__}"
+
+        async def compute(key: str, entry_tags: Tuple[str, ...], args: tuple, kwargs: dict) -> Any:
+            epoch = cache.tag_epoch(entry_tags)
+            if any(_uses_session(value) for value in (*args, *kwargs.values())):
+                async with computation_session() as session:
+                    result = await func(
+                        *(_on_session(arg, session) for arg in args),
+                        **{name: _on_session(value, session) for name, value in kwargs.items()}
+                    )
+            else:
+                result = await func(*args, **kwargs)
+            # Encoded up front so a miss returns the same shape as a hit
+            value = jsonable_encoder(result)
+            if cache.tag_epoch(entry_tags) == epoch:
+                await cache.set(key, value, ttl=ttl, tags=entry_tags)
+            return value
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = make_key(key_prefix, args, kwargs)
+            hit = await cache.get(key, model=model)
+            if hit is not None:
+                return hit
+
+            future = _in_flight.get(key)
+            if future is None:
+                entry_tags = tuple(tags(*args, **kwargs) if callable(tags) else tags)
+                future = asyncio.ensure_future(compute(key, entry_tags, args, kwargs))
+                _in_flight[key] = future
+                future.add_done_callback(lambda _: _in_flight.pop(key, None))
+            # shield: a caller that goes away doesn't cancel the others' result
+            value = await asyncio.shield(future)
+            return parse_obj_as(model, value) if model is not None else value
+
+        wrapper.cache_prefix = key_prefix
+        return wrapper
+
+    return decorator
+
+
+def invalidate_on_commit(tags: Iterable[str], *models: type) -> None:
+    """
+    Invalidate `tags` after any session commits inserts, updates or deletes of
+    the given models. Covers async sessions too, whose events fire on the
+    underlying sync Session.
+    """
+    tags = tuple(tags)
+    flag = f"invalidate:{','.join(tags)}"
+
+    @event.listens_for(Session, "after_flush")
+    def mark_changed(session, flush_context):
+        if any(isinstance(obj, models) for obj in (*session.new, *session.dirty, *session.deleted)):
+            session.info[flag] = True
+
+    @event.listens_for(Session, "after_commit")
+    def invalidate(session):
+        if session.info.pop(flag, False):
+            cache.invalidate_tags_later(*tags)
+
+    @event.listens_for(Session, "after_rollback")
+    def forget(session):
+        session.info.pop(flag, None)
+
+
+def create_backend():
+    if settings.redis_url:
+        return RedisCacheBackend(settings.redis_url)
+    return MemoryCacheBackend(maxsize=settings.cache_local_maxsize)
+
+
+cache = Cache(
+    create_backend(),
+    namespace=settings.cache_namespace,
+    default_ttl=settings.cache_default_ttl_seconds
+)
@@ -0,0 +1,167 @@
+"""
+Pub/sub for live updates pushed to browsers over Server-Sent Events.
+
+Each worker process fans messages out to its own subscribers (one per open SSE
+connection). With REDIS_URL set, messages are published through a Redis
+channel that every worker listens on, so a commit in one worker reaches
+browsers connected to any worker; without it, delivery stays in-process.
+
+Subscribers have a bounded queue. One that falls too far behind is dropped and
+its stream closed; the browser reconnects and reloads the current state.
+"""
+import asyncio
+import itertools
+import json
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """Queue of messages for one SSE connection"""
+
+    def __init__(self, broker: "EventBroker", max_queue: int):
+        self._broker = broker
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+    def deliver(self, message: Dict[str, Any]) -> None:
+        if self.overflowed:
+            return
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Wake the reader with an end-of-stream marker in place of the backlog
+            self.overflowed = True
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(None)
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        """Next message, or None once the subscription has been dropped"""
+        return await self._queue.get()
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Take the queued messages without waiting; a dropped subscription keeps its end marker"""
+        messages = []
+        while not self.overflowed and not self._queue.empty():
+            messages.append(self._queue.get_nowait())
+        return messages
+
+    def close(self) -> None:
+        self._broker.unsubscribe(self)
+
+
+class EventBroker:
+    """Fans published events out to local subscribers, optionally via Redis"""
+
+    def __init__(self, redis_url: str = "", channel: str = "events", max_queue: int = 100):
+        self.redis_url = redis_url
+        self.channel = channel
+        self.max_queue = max_queue
+        self._subscribers: Set[Subscription] = set()
+        self._ids = itertools.count(1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self, self.max_queue)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def _dispatch(self, message: Dict[str, Any]) -> None:
+        for subscription in list(self._subscribers):
+            subscription.deliver(message)
+
+    async def publish(self, event_type: str, data: Any) -> None:
+        message = {"type": event_type, "data": data}
+        if self._redis is None:
+            message["id"] = next(self._ids)
+            self._dispatch(message)
+            return
+        try:
+            await self._redis.publish(self.channel, json.dumps(message, default=str))
+        except Exception as exc:
+            logger.warning("Publishing %s to Redis failed, delivering locally: %s", event_type, exc)
+            message["id"] = next(self._ids)
+            self._dispatch(message)
+
+    def publish_later(self, event_type: str, data: Any) -> None:
+        """publish() for synchronous code such as ORM hooks"""
+        try:
+            asyncio.get_running_loop().create_task(self.publish(event_type, data))
+            return
+        except RuntimeError:
+            pass
+        if self._loop is not None and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.publish(event_type, data), self._loop)
+
+    async def _listen(self) -> None:
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(self.channel)
+        try:
+            while True:
+                try:
+                    async for raw in pubsub.listen():
+                        if raw["type"] != "message":
+                            continue
+                        message = json.loads(raw["data"])
+                        message["id"] = next(self._ids)
+                        self._dispatch(message)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    logger.warning("Redis event listener failed, retrying: %s", exc)
+                    await asyncio.sleep(1)
+                    await pubsub.subscribe(self.channel)
+        finally:
+            await pubsub.aclose()
+
+    async def start(self) -> None:
+        """Bind to the running loop and, with Redis configured, start listening"""
+        self._loop = asyncio.get_running_loop()
+        if self.redis_url and self._redis is None:
+            import redis.asyncio as redis
+
+            self._redis = redis.Redis.from_url(self.redis_url, decode_responses=True)
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+def format_sse(message: Dict[str, Any]) -> str:
+    """A message in the text/event-stream wire format"""
+    lines = []
+    if message.get("id") is not None:
+        lines.append(f"id: {message['id']}")
+    lines.append(f"event: {message['type']}")
+    lines.append(f"data: {json.dumps(message['data'], default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+broker = EventBroker(
+    redis_url=settings.redis_url,
+    channel=f"{settings.cache_namespace}:events",
+    max_queue=settings.sse_max_queue
+)
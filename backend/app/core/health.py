@@ -0,0 +1,137 @@
+"""
+Readiness checks for orchestrator probes.
+
+The report is computed at most once per `readiness_cache_seconds` and shared
+by all probes in between, so frequent probing costs a dictionary lookup rather
+than a database round trip. Components (caches, background queues) register a
+check returning a dict of details; critical checks decide the HTTP status.
+"""
+import asyncio
+import inspect
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from sqlalchemy import text
+
+from ..db.session import async_engine, get_pool_stats
+from .cache import cache
+from .config import settings
+from .principal_cache import principal_cache
+from .security import password_pool
+
+CheckResult = Dict[str, Any]
+Check = Callable[[], Union[CheckResult, Awaitable[CheckResult]]]
+
+
+@dataclass
+class RegisteredCheck:
+    name: str
+    check: Check
+    critical: bool
+
+
+class ReadinessProbe:
+    """Runs registered checks and caches the combined report"""
+
+    def __init__(self, cache_seconds: float = 5, clock: Callable[[], float] = time.monotonic):
+        self.cache_seconds = cache_seconds
+        self._clock = clock
+        self._checks: List[RegisteredCheck] = []
+        self._report: Optional[CheckResult] = None
+        self._expires_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def register(self, name: str, check: Check, critical: bool = False) -> None:
+        """
+        Add a check. It returns a dict of details and sets "ok": False when
+        unhealthy; raising counts as unhealthy too. A failing critical check
+        makes the service not ready.
+        """
+        self._checks.append(RegisteredCheck(name, check, critical))
+
+    async def _run_check(self, registered: RegisteredCheck) -> CheckResult:
+        try:
+            result = registered.check()
+            if inspect.isawaitable(result):
+                result = await result
+        except Exception as exc:
+            return {"ok": False, "error": str(exc) or exc.__class__.__name__}
+        return {"ok": True, **result}
+
+    async def _build_report(self) -> CheckResult:
+        results = await asyncio.gather(*(self._run_check(registered) for registered in self._checks))
+        checks = {registered.name: result for registered, result in zip(self._checks, results)}
+        ready = all(
+            checks[registered.name]["ok"] for registered in self._checks if registered.critical
+        )
+        return {"status": "ready" if ready else "not_ready", "checks": checks}
+
+    async def report(self) -> CheckResult:
+        """Cached readiness report; concurrent callers share one refresh"""
+        if self._report is not None and self._clock() < self._expires_at:
+            return self._report
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._report is None or self._clock() >= self._expires_at:
+                self._report = await self._build_report()
+                self._expires_at = self._clock() + self.cache_seconds
+        return self._report
+
+
+async def check_database() -> CheckResult:
+    async def ping():
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    started = time.perf_counter()
+    await asyncio.wait_for(ping(), timeout=settings.readiness_db_timeout_seconds)
+    return {"latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+def check_storage() -> CheckResult:
+    path = settings.storage_path
+    writable = os.path.isdir(path) and os.access(path, os.W_OK)
+    return {"ok": writable, "path": path}
+
+
+def check_db_pool() -> CheckResult:
+    pools = {}
+    for name, stats in get_pool_stats().items():
+        if "checked_out" not in stats:
+            continue
+        capacity = stats["size"] + stats["max_overflow"]
+        pools[name] = {
+            "checked_out": stats["checked_out"],
+            "capacity": capacity,
+            "saturation": round(stats["checked_out"] / capacity, 2) if capacity else 0.0,
+        }
+    saturated = [
+        name for name, pool in pools.items()
+        if pool["saturation"] >= settings.db_pool_saturation_threshold
+    ]
+    return {"pools": pools, "saturated": saturated}
+
+
+def check_principal_cache() -> CheckResult:
+    return {"entries": len(principal_cache), "warm": len(principal_cache) > 0}
+
+
+async def check_cache() -> CheckResult:
+    return {"backend": cache.backend.name, "ok": await cache.ping()}
+
+
+def check_password_pool() -> CheckResult:
+    stats = password_pool.stats()
+    return {"queue_depth": stats["pending"], "max_queue": stats["max_queue"]}
+
+
+readiness = ReadinessProbe(cache_seconds=settings.readiness_cache_seconds)
+readiness.register("database", check_database, critical=True)
+readiness.register("storage", check_storage, critical=True)
+readiness.register("db_pool", check_db_pool)
+readiness.register("cache", check_cache)
+readiness.register("principal_cache", check_principal_cache)
+readiness.register("password_pool", check_password_pool)
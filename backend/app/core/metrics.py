@@ -0,0 +1,113 @@
+"""
+Prometheus metrics for the API.
+
+PrometheusMiddleware records latency, status codes, in-flight requests and the
+database time/statement count of every HTTP request, labelled with the route
+template (e.g. /api/v1/tasks/{task_id}) rather than the raw path.
+
+Run with several worker processes, set PROMETHEUS_MULTIPROC_DIR before the app
+is imported: every worker then writes its samples to files in that directory
+and /metrics aggregates all of them, whichever worker serves the scrape.
+gunicorn.conf.py prepares the directory and cleans up after dead workers.
+"""
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..db.query_stats import track_queries
+
+# Label used for requests that matched no route, so unknown paths can't blow up cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+REQUEST_COUNT = Counter(
+    "http_requests_total",
+    "HTTP requests by route and status code",
+    ["method", "route", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_TIME = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL statements per request",
+    ["method", "route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+
+
+def route_label(scope: Scope) -> str:
+    """Path template of the route that handled the request"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class PrometheusMiddleware:
+    """ASGI middleware recording per-route request metrics"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            with track_queries() as query_stats:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            route = route_label(scope)
+            REQUEST_COUNT.labels(method, route, str(status_code)).inc()
+            REQUEST_LATENCY.labels(method, route).observe(elapsed)
+            DB_TIME.labels(method, route).observe(query_stats.seconds)
+            DB_QUERIES.labels(method, route).observe(query_stats.queries)
+
+
+def render_metrics() -> tuple:
+    """Metrics in the Prometheus text format, aggregated across workers in multiprocess mode"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
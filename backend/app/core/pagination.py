@@ -0,0 +1,151 @@
+"""
+Keyset (cursor) pagination.
+
+A list ordered by a unique key, e.g. (created_at DESC, id DESC), is paged by
+filtering on the last row seen instead of skipping rows with OFFSET, so every
+page costs the same index range scan however deep it is.
+
+Cursors are opaque to clients: the last row's key values, base64url-encoded
+and signed with the application secret so they can't be forged or tampered
+with. A cursor is tied to the list (scope) it was issued for.
+"""
+import base64
+import enum
+import hashlib
+import hmac
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import and_, or_
+
+from .config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# (column, descending)
+SortKey = Tuple[Any, bool]
+
+
+def invalid_cursor_exception() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+
+def _signature(payload: bytes) -> str:
+    digest = hmac.new(settings.secret_key.encode(), payload, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:16]).rstrip(b"=").decode()
+
+
+def encode_cursor(scope: str, values: Sequence[Any]) -> str:
+    payload = base64.urlsafe_b64encode(
+        json.dumps([scope, jsonable_encoder(list(values))], separators=(",", ":")).encode()
+    ).rstrip(b"=")
+    return f"{payload.decode()}.{_signature(payload)}"
+
+
+def decode_cursor(scope: str, cursor: str) -> List[Any]:
+    """Key values of a cursor issued for `scope`; 400 if it is malformed, forged or foreign"""
+    try:
+        payload, signature = cursor.split(".")
+        if not hmac.compare_digest(signature, _signature(payload.encode())):
+            raise ValueError("bad signature")
+        cursor_scope, values = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except (ValueError, TypeError):
+        raise invalid_cursor_exception()
+    if cursor_scope != scope:
+        raise invalid_cursor_exception()
+    return values
+
+
+def _coerce(column, value: Any) -> Any:
+    """JSON cursor value back to the column's Python type"""
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if issubclass(python_type, enum.Enum):
+        return python_type(value)
+    if issubclass(python_type, datetime):
+        return datetime.fromisoformat(value)
+    if issubclass(python_type, date):
+        return date.fromisoformat(value)
+    return value
+
+
+class Keyset:
+    """
+    Sort order of a list and the filter/cursor logic for paging through it.
+    Sort columns must be non-null, except those listed as `nullable`, whose
+    NULLs sort last in either direction. The last one must be unique
+    (normally the primary key).
+    """
+
+    def __init__(self, scope: str, *sort_keys: SortKey, nullable: Sequence[Any] = ()):
+        self.scope = scope
+        self.sort_keys = sort_keys
+        self.nullable = [any(column is other for other in nullable) for column, _ in sort_keys]
+
+    def order_by(self) -> List[Any]:
+        clauses = []
+        for (column, descending), nullable in zip(self.sort_keys, self.nullable):
+            clause = column.desc() if descending else column.asc()
+            clauses.append(clause.nulls_last() if nullable else clause)
+        return clauses
+
+    def after(self, values: Sequence[Any]):
+        """Rows strictly after the row with these key values, in sort order"""
+        clauses = []
+        for position, (column, descending) in enumerate(self.sort_keys):
+            value = values[position]
+            if value is None:
+                # Nothing sorts after NULL in this column; ties are broken by the next one
+                continue
+            equal_before = [
+                earlier.is_(None) if values[index] is None else earlier == values[index]
+                for index, (earlier, _) in enumerate(self.sort_keys[:position])
+            ]
+            beyond = column < value if descending else column > value
+            if self.nullable[position]:
+                beyond = or_(beyond, column.is_(None))
+            clauses.append(and_(*equal_before, beyond))
+        return or_(*clauses)
+
+    def apply(self, statement, cursor: Optional[str], limit: int):
+        """Order, filter past the cursor and fetch one extra row to detect a next page"""
+        if cursor:
+            values = decode_cursor(self.scope, cursor)
+            if len(values) != len(self.sort_keys):
+                raise invalid_cursor_exception()
+            values = [_coerce(column, value) for (column, _), value in zip(self.sort_keys, values)]
+            statement = statement.where(self.after(values))
+        return statement.order_by(*self.order_by()).limit(limit + 1)
+
+    def page(self, rows: Sequence[Any], limit: int, key=None) -> Tuple[List[Any], Optional[str]]:
+        """
+        Rows of the page and the cursor of the next one (None on the last page).
+        `key` returns a row's sort values; by default they are read as
+        attributes named like the sort columns.
+        """
+        rows = list(rows)
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        last = rows[-1]
+        if key is None:
+            values = [getattr(last, column.key) for column, _ in self.sort_keys]
+        else:
+            values = key(last)
+        return rows, encode_cursor(self.scope, values)
+
+
+def set_next_cursor(response: Response, request: Request, next_cursor: Optional[str]) -> None:
+    """Expose the next page as an X-Next-Cursor header and a Link: rel="next" URL"""
+    if next_cursor is None:
+        return
+    response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    next_url = request.url.remove_query_params("skip").include_query_params(cursor=next_cursor)
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
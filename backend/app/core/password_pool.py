@@ -0,0 +1,132 @@
+"""
+Bounded worker pool for password hashing.
+
+bcrypt is deliberately slow (~250 ms per call); running it inline in an
+`async def` endpoint stalls the event loop for every other request. The pool
+runs it on a fixed number of threads (bcrypt releases the GIL) and rejects work
+once too many calls are waiting, so a login burst degrades into fast 503s
+instead of a frozen worker.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the pool already has max_queue calls pending"""
+
+
+class PasswordHasherPool:
+    """Runs CryptContext hash/verify calls on a size-limited thread pool"""
+
+    def __init__(self, context, max_workers: int = 4, max_queue: int = 64):
+        self.context = context
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        # Workers batch jobs may hold at once, so one is always left for verify
+        self.bulk_workers = max(1, max_workers - 1)
+        self._bulk_slots = asyncio.Semaphore(self.bulk_workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hash"
+                )
+            return self._executor
+
+    async def _submit(self, fn: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self._pending >= self.max_queue:
+                self._rejected += 1
+                raise PasswordHashingBusy(
+                    f"{self._pending} password operations already pending"
+                )
+            self._pending += 1
+        submitted_at = time.perf_counter()
+
+        def run() -> T:
+            started_at = time.perf_counter()
+            with self._lock:
+                self._running += 1
+                self._wait_seconds += started_at - submitted_at
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._run_seconds += time.perf_counter() - started_at
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), run)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(self.context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(self.context.verify, plain_password, hashed_password)
+
+    async def hash_many(self, passwords: Sequence[str]) -> List[str]:
+        """
+        Hash a batch of passwords, e.g. for bulk user provisioning.
+        The batch is split into one job per bulk worker so it only takes a few
+        queue slots; batches share those workers, leaving at least one to
+        logins. Results keep the input order.
+        """
+        if not passwords:
+            return []
+        chunk_count = min(self.bulk_workers, len(passwords))
+        chunk_size = -(-len(passwords) // chunk_count)  # ceiling division
+        chunks = [
+            list(passwords[i:i + chunk_size])
+            for i in range(0, len(passwords), chunk_size)
+        ]
+
+        def hash_chunk(chunk: List[str]) -> List[str]:
+            return [self.context.hash(password) for password in chunk]
+
+        async def submit_chunk(chunk: List[str]) -> List[str]:
+            async with self._bulk_slots:
+                return await self._submit(hash_chunk, chunk)
+
+        results = await asyncio.gather(*(submit_chunk(chunk) for chunk in chunks))
+        return [hashed for chunk in results for hashed in chunk]
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of pool counters for monitoring"""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "bulk_workers": self.bulk_workers,
+                "max_queue": self.max_queue,
+                "pending": self._pending,
+                "running": self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "wait_seconds_total": self._wait_seconds,
+                "run_seconds_total": self._run_seconds,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
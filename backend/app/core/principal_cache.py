@@ -0,0 +1,176 @@
+"""
+Per-process cache of authenticated principals.
+
+get_current_user would otherwise load the user and its roles from the database
+on every request. Entries are keyed by the token's subject and issue time and
+hold an immutable snapshot of the user, so they can be shared between requests
+safely. Invalidation is local to the worker process; the TTL bounds how long
+other workers may serve a stale snapshot after a role change or deactivation.
+Role versions, which authorize role-claim tokens, are shared instead (see
+RoleVersionRegistry).
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, FrozenSet, Optional, Tuple
+
+from .cache import cache
+from .config import settings
+
+
+@dataclass(frozen=True)
+class CachedRole:
+    """Immutable copy of a Role row (id is unknown for roles taken from token claims)"""
+    id: Optional[int]
+    name: str
+    description: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Immutable snapshot of an authenticated user and its roles"""
+    id: int
+    email: str
+    full_name: Optional[str]
+    is_active: bool
+    is_warehouse_staff: bool
+    roles: Tuple[CachedRole, ...] = ()
+    role_version: int = 0
+
+    @property
+    def role_names(self) -> FrozenSet[str]:
+        return frozenset(role.name for role in self.roles)
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        """Build a snapshot from a User whose roles are already loaded"""
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            is_active=bool(user.is_active),
+            is_warehouse_staff=bool(user.is_warehouse_staff),
+            roles=tuple(
+                CachedRole(id=role.id, name=role.name, description=role.description)
+                for role in user.roles
+            ),
+            role_version=user.role_version or 0,
+        )
+
+
+class PrincipalCache:
+    """Bounded LRU cache of principals with a per-entry TTL"""
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl_seconds: float = 60,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, Optional[int]], Tuple[float, Principal]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, subject: str, issued_at: Optional[int]) -> Optional[Principal]:
+        """Return the cached principal for a token, or None if missing or expired"""
+        key = (subject, issued_at)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return principal
+
+    def set(self, subject: str, issued_at: Optional[int], principal: Principal) -> None:
+        """Cache a principal for a token, evicting the least recently used entry if full"""
+        if self.maxsize <= 0:
+            return
+        key = (subject, issued_at)
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, principal)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> int:
+        """Drop every cached token of a user; returns the number of entries removed"""
+        with self._lock:
+            stale = [key for key, (_, principal) in self._entries.items() if principal.id == user_id]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@dataclass(frozen=True)
+class RoleState:
+    """A user's current role version and whether the account is active"""
+    role_version: int
+    is_active: bool
+
+
+class RoleVersionRegistry:
+    """
+    Current role version and active flag per user, shared by all workers
+    through the cache (Redis when REDIS_URL is set).
+
+    Tokens embedding role claims are authorized without loading the user, so a
+    role change or deactivation is published here to reject tokens issued
+    before it, in every worker. A missing entry means unknown, not fresh: the
+    caller reads the state from the database and records it.
+    """
+
+    def __init__(self, ttl_seconds: int = settings.role_version_cache_ttl_seconds):
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"principal:rv:{user_id}"
+
+    async def get(self, user_id: int) -> Optional[RoleState]:
+        value = await cache.get(self._key(user_id))
+        if value is None:
+            return None
+        return RoleState(role_version=value[0], is_active=value[1])
+
+    async def record(self, user_id: int, state: RoleState) -> None:
+        """Share a state read from the database, unless a newer version is already known"""
+        known = await self.get(user_id)
+        if known is not None and known.role_version > state.role_version:
+            # Read before a revocation that was published meanwhile
+            return
+        await cache.set(self._key(user_id), [state.role_version, state.is_active], self.ttl_seconds)
+
+    def publish(self, user_id: int, state: RoleState) -> None:
+        """record for synchronous code (scheduled on the event loop)"""
+        cache.set_later(self._key(user_id), [state.role_version, state.is_active], self.ttl_seconds)
+
+    async def forget(self, user_id: int) -> None:
+        await cache.delete(self._key(user_id))
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.principal_cache_size,
+    ttl_seconds=settings.principal_cache_ttl_seconds
+)
+
+role_versions = RoleVersionRegistry()
+
+
+def revoke_user_principals(user_id: int, role_version: int, is_active: bool = True) -> None:
+    """Forget cached principals of a user and reject its tokens older than role_version everywhere"""
+    principal_cache.invalidate_user(user_id)
+    role_versions.publish(user_id, RoleState(role_version=role_version, is_active=is_active))
@@ -0,0 +1,88 @@
+"""
+N+1 query detection.
+
+QueryCounterMiddleware counts the SQL statements of every request and reports
+them in X-Query-Count/X-Query-Time-Ms headers. A statement executed at least
+`n_plus_one_threshold` times (the same SQL, different parameters) is flagged in
+an X-Query-Repeated header and a warning log line.
+
+Routes can declare a budget with `dependencies=[Depends(query_budget(n))]`.
+Exceeding it is logged; with `query_budget_enforce` on (as in tests) the
+statement over budget raises QueryBudgetExceeded instead.
+"""
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..db.query_stats import QueryStats, current_query_stats, track_queries
+from .config import settings
+from .metrics import route_label
+
+logger = logging.getLogger(__name__)
+
+# Longest SQL text included in a log line
+MAX_LOGGED_STATEMENT = 200
+
+
+def query_budget(max_queries: int):
+    """Dependency setting the statement budget of a route"""
+    def set_query_budget():
+        stats = current_query_stats()
+        if stats is not None:
+            stats.budget = max_queries
+    return set_query_budget
+
+
+def _shorten(statement: str) -> str:
+    statement = " ".join(statement.split())
+    if len(statement) > MAX_LOGGED_STATEMENT:
+        return statement[:MAX_LOGGED_STATEMENT] + "..."
+    return statement
+
+
+def report_queries(method: str, route: str, stats: QueryStats) -> None:
+    """Log repeated statements and budget overruns of a finished request"""
+    for statement, count in stats.repeated_statements(settings.n_plus_one_threshold):
+        logger.warning(
+            "Possible N+1 on %s %s: statement executed %d times (%d queries total): %s",
+            method, route, count, stats.queries, _shorten(statement)
+        )
+    if stats.over_budget:
+        logger.warning(
+            "Query budget exceeded on %s %s: %d queries, budget %d",
+            method, route, stats.queries, stats.budget
+        )
+
+
+class QueryCounterMiddleware:
+    """ASGI middleware counting SQL statements per request and flagging N+1 patterns"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.query_counter_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            stats.budget = settings.query_budget_default or None
+            stats.enforce_budget = settings.query_budget_enforce
+
+            async def send_wrapper(message: Message) -> None:
+                # Handlers have finished their queries by the time headers go out,
+                # except for streaming responses, whose later queries are only logged
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers["X-Query-Count"] = str(stats.queries)
+                    headers["X-Query-Time-Ms"] = f"{stats.seconds * 1000:.1f}"
+                    repeated = stats.repeated_statements(settings.n_plus_one_threshold)
+                    if repeated:
+                        headers["X-Query-Repeated"] = str(repeated[0][1])
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                report_queries(scope["method"], route_label(scope), stats)
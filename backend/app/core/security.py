@@ -4,9 +4,13 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from .config import settings
-from ..db.session import get_db
+from .password_pool import PasswordHasherPool, PasswordHashingBusy
+from .principal_cache import CachedRole, Principal, RoleState, principal_cache, role_versions
+from ..db.session import get_primary_async_db
 from ..models.user import User
 
 # Password hashing
@@ -21,10 +25,51 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+password_pool = PasswordHasherPool(
+    pwd_context,
+    max_workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue
+)
+
+def password_pool_busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many password operations in progress, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the password worker pool; raises 503 when the pool is saturated"""
+    try:
+        return await password_pool.verify(plain_password, hashed_password)
+    except PasswordHashingBusy:
+        raise password_pool_busy_exception()
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the password worker pool; raises 503 when the pool is saturated"""
+    try:
+        return await password_pool.hash(password)
+    except PasswordHashingBusy:
+        raise password_pool_busy_exception()
+
+async def get_password_hashes_async(passwords: List[str]) -> List[str]:
+    """Hash a batch of passwords on the worker pool, preserving order"""
+    try:
+        return await password_pool.hash_many(passwords)
+    except PasswordHashingBusy:
+        raise password_pool_busy_exception()
+
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     """Get user by email address"""
     return db.query(User).filter(User.email == email).first()
 
+async def get_user_by_email_async(db: AsyncSession, email: str) -> Optional[User]:
+    """Get user by email address with roles eagerly loaded (async sessions can't lazy-load)"""
+    result = await db.execute(
+        select(User).options(selectinload(User.roles)).where(User.email == email)
+    )
+    return result.scalars().first()
+
 def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     """Authenticate a user with email and password"""
     user = get_user_by_email(db, email)
@@ -34,34 +79,77 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
         return None
     return user
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+def role_claims(user: User) -> dict:
+    """Compact claims that let role checks authorize from the token alone"""
+    return {
+        "uid": user.id,
+        "name": user.full_name,
+        "wh": bool(user.is_warehouse_staff),
+        "roles": sorted(role.name for role in user.roles),
+        "rv": user.role_version or 0,
+    }
+
+def create_access_token(
+    data: dict,
+    expires_delta: Optional[timedelta] = None,
+    user: Optional[User] = None
+) -> str:
+    """
+    Create a signed access token.
+    If user is given, its role claims are embedded so require_roles-style
+    dependencies don't need a database lookup.
+    """
     to_encode = data.copy()
+    if user is not None:
+        to_encode.update(role_claims(user))
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
-    to_encode.update({"exp": expire})
+    # iat lets the principal cache tell tokens of the same user apart
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def credentials_exception(detail: str = "Could not validate credentials") -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
+        detail=detail,
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def decode_access_token(token: str) -> dict:
+    """Decode and verify an access token, raising 401 if it is invalid or has no subject"""
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        raise credentials_exception()
+    if payload.get("sub") is None:
+        raise credentials_exception()
+    return payload
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_primary_async_db)) -> Principal:
+    """
+    Resolve the bearer token to a Principal snapshot, served from the principal
+    cache when possible. Read on the primary: a lagging replica could still
+    show a revoked role version or a deactivated user as active.
+    """
+    payload = decode_access_token(token)
+    email: str = payload["sub"]
     
-    user = get_user_by_email(db, email)
+    issued_at = payload.get("iat")
+    principal = principal_cache.get(email, issued_at)
+    if principal is not None:
+        return principal
+    
+    user = await get_user_by_email_async(db, email)
     if user is None:
-        raise credentials_exception
-    return user
+        raise credentials_exception()
+    principal = Principal.from_user(user)
+    principal_cache.set(email, issued_at, principal)
+    # Share the current role version so older role-claim tokens get rejected in every worker
+    await role_versions.record(principal.id, RoleState(principal.role_version, principal.is_active))
+    return principal
 
 async def get_current_active_user(current_user = Depends(get_current_user)):
     """Get current active user - depends on get_current_user and checks if user is active"""
@@ -72,6 +160,56 @@ async def get_current_active_user(current_user = Depends(get_current_user)):
         )
     return current_user
 
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_primary_async_db)
+) -> Principal:
+    """
+    Principal for role checks.
+    Built from the token's role claims when present (no database access),
+    otherwise resolved like get_current_active_user.
+    """
+    payload = decode_access_token(token)
+    if "roles" not in payload:
+        return await get_current_active_user(await get_current_user(token, db))
+    
+    user_id = payload["uid"]
+    role_version = payload.get("rv", 0)
+    state = await current_role_state(db, user_id)
+    if state is None or role_version < state.role_version:
+        raise credentials_exception("Token roles are out of date, please sign in again")
+    if not state.is_active:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
+    
+    return Principal(
+        id=user_id,
+        email=payload["sub"],
+        full_name=payload.get("name"),
+        is_active=state.is_active,
+        is_warehouse_staff=payload.get("wh", False),
+        roles=tuple(CachedRole(id=None, name=name) for name in payload["roles"]),
+        role_version=role_version,
+    )
+
+async def current_role_state(db: AsyncSession, user_id: int) -> Optional[RoleState]:
+    """
+    A user's role version and active flag from the shared cache; on a miss read
+    from the database (one indexed lookup, `db` being a primary session) and
+    shared. None if the user is gone.
+    """
+    state = await role_versions.get(user_id)
+    if state is not None:
+        return state
+    users = User.__table__
+    row = (await db.execute(
+        select(users.c.role_version, users.c.is_active).where(users.c.id == user_id)
+    )).first()
+    if row is None:
+        return None
+    state = RoleState(role_version=row.role_version or 0, is_active=bool(row.is_active))
+    await role_versions.record(user_id, state)
+    return state
+
 # Role-based access control functions
 def has_role(user: User, role_name: str) -> bool:
     """Check if user has a specific role"""
@@ -90,7 +228,7 @@ def require_roles(required_roles: Union[str, List[str]]):
     if isinstance(required_roles, str):
         required_roles = [required_roles]
     
-    async def role_checker(current_user: User = Depends(get_current_active_user)):
+    async def role_checker(current_user: User = Depends(get_current_principal)):
         if not has_any_role(current_user, required_roles):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -104,7 +242,7 @@ def require_all_roles(required_roles: List[str]):
     Dependency factory for requiring ALL specified roles.
     User must have all the roles listed.
     """
-    async def role_checker(current_user: User = Depends(get_current_active_user)):
+    async def role_checker(current_user: User = Depends(get_current_principal)):
         user_role_names = {role.name for role in current_user.roles}
         missing_roles = set(required_roles) - user_role_names
         if missing_roles:
@@ -124,7 +262,7 @@ require_quality_control = require_roles(["quality_control", "manager", "admin"])
 require_supervisor = require_roles(["supervisor", "manager", "admin"])
 
 def check_permissions(required_roles: list[str]):
-    async def role_checker(current_user = Depends(get_current_user)):
+    async def role_checker(current_user = Depends(get_current_principal)):
         for role in current_user.roles:
             if role.name in required_roles:
                 return True
@@ -0,0 +1,75 @@
+"""
+Connection pool instrumentation.
+
+QueuePool has no hook that fires before a checkout starts waiting, so the
+engines use a pool subclass that times `_do_get`. Each engine gets its own
+subclass carrying its PoolStats as a class attribute, which survives the pool
+being recreated after `dispose()` or an invalidation.
+"""
+import threading
+import time
+from typing import Dict, Type
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    """Checkout counters for one engine's pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_checkout(self, wait_seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    def snapshot(self, pool) -> Dict[str, float]:
+        """Counters plus the pool's current occupancy"""
+        with self._lock:
+            stats = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "max_wait_seconds": self.max_wait_seconds,
+            }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+            })
+        return stats
+
+
+class TimedPoolMixin:
+    """Records how long each checkout waited for a connection"""
+    stats: PoolStats
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_checkout(time.perf_counter() - started, timed_out=True)
+            raise
+        self.stats.record_checkout(time.perf_counter() - started)
+        return connection
+
+
+def timed_pool_class(stats: PoolStats, use_async: bool = False) -> Type[QueuePool]:
+    """QueuePool subclass reporting into the given stats"""
+    base = AsyncAdaptedQueuePool if use_async else QueuePool
+    return type(f"Timed{base.__name__}", (TimedPoolMixin, base), {"stats": stats})
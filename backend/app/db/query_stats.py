@@ -0,0 +1,93 @@
+"""
+Request-scoped SQL statement accounting.
+
+Cursor events on every Engine (the async engines included, their events fire on
+the underlying sync engine) add to the QueryStats bound to the current context.
+The context is bound per request by the metrics and query counter middleware;
+outside a request nothing is recorded.
+"""
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when an enforced query budget is exceeded"""
+
+
+@dataclass
+class QueryStats:
+    """Statements executed and time spent in the database during one unit of work"""
+    queries: int = 0
+    seconds: float = 0.0
+    # Executions per statement text; parameters are bound separately, so a
+    # statement run once per row shows up as one entry with a high count
+    statements: Counter = field(default_factory=Counter)
+    budget: Optional[int] = None
+    enforce_budget: bool = False
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.queries > self.budget
+
+    def repeated_statements(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed at least `threshold` times, most repeated first"""
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Record every statement executed inside the block, including in threadpool
+    calls it awaits. Nested blocks share the outermost block's stats.
+    """
+    stats = _current_stats.get()
+    if stats is not None:
+        yield stats
+        return
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    if stats.enforce_budget and stats.budget is not None and stats.queries >= stats.budget:
+        raise QueryBudgetExceeded(
+            f"Query budget of {stats.budget} exceeded by: {statement}"
+        )
+    conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    start_times = conn.info.get("query_start_times")
+    if stats is None or not start_times:
+        return
+    stats.queries += 1
+    stats.seconds += time.perf_counter() - start_times.pop()
+    stats.statements[statement] += 1
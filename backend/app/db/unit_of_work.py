@@ -0,0 +1,58 @@
+"""
+Unit of work: one transaction per business operation.
+
+Services handed the same UnitOfWork stage their writes on its session - the
+operation's own rows, audit logs, notifications - and the outermost
+`async with uow:` (or `with uow:` on a sync Session) commits them together
+once, or rolls all of them back if the operation raises. Nested blocks only
+join the surrounding one, so a service method that is a complete operation
+on its own is just a step when another service calls it inside its unit of
+work.
+"""
+from typing import Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+class UnitOfWork:
+    """Reentrant transaction scope around a session"""
+
+    def __init__(self, db: Union[AsyncSession, Session]):
+        self.db = db
+        self.depth = 0
+
+    @property
+    def active(self) -> bool:
+        return self.depth > 0
+
+    def _enter(self) -> "UnitOfWork":
+        self.depth += 1
+        return self
+
+    def _leave(self) -> bool:
+        """Leave a block; True when it was the outermost"""
+        self.depth -= 1
+        return self.depth == 0
+
+    async def __aenter__(self) -> "UnitOfWork":
+        return self._enter()
+
+    async def __aexit__(self, exc_type, exc, traceback) -> bool:
+        if self._leave():
+            if exc_type is None:
+                await self.db.commit()
+            else:
+                await self.db.rollback()
+        return False
+
+    def __enter__(self) -> "UnitOfWork":
+        return self._enter()
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        if self._leave():
+            if exc_type is None:
+                self.db.commit()
+            else:
+                self.db.rollback()
+        return False
@@ -1,7 +1,17 @@
-from fastapi import FastAPI
+import asyncio
+from fastapi import FastAPI, Response, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .api.v1.api import api_router
+from .core.cache import cache
 from .core.config import settings
+from .core.events import broker
+from .core.health import readiness
+from .core.metrics import PrometheusMiddleware, render_metrics
+from .core.query_counter import QueryCounterMiddleware
+from .core.security import password_pool
+from .services.item_autocomplete_service import item_index
+from .services.outbox_service import outbox_dispatcher
 
 app = FastAPI(
     title="MRDPOL Core API",
@@ -16,12 +26,76 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Keyset pagination hands out the next page's cursor in headers
+    expose_headers=["X-Next-Cursor", "Link"],
 )
 
+# Per-request SQL statement counting and N+1 detection
+app.add_middleware(QueryCounterMiddleware)
+
+# Request metrics - added last so it wraps CORS and sees every response
+app.add_middleware(PrometheusMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
+@app.on_event("shutdown")
+def shutdown_password_pool():
+    """Let in-flight password hashing finish before the worker exits"""
+    password_pool.shutdown()
+
+@app.on_event("startup")
+async def bind_cache_loop():
+    """Lets ORM hooks in threadpool requests schedule cache invalidations"""
+    cache.bind_loop(asyncio.get_running_loop())
+
+@app.on_event("shutdown")
+async def close_cache():
+    await cache.close()
+
+@app.on_event("startup")
+async def load_item_index():
+    """Item autocomplete is served from memory; a failed load is retried on first use"""
+    await item_index.warm()
+
+@app.on_event("startup")
+async def start_event_broker():
+    """Live-update fan-out; listens on Redis when it is configured"""
+    await broker.start()
+
+@app.on_event("shutdown")
+async def stop_event_broker():
+    await broker.stop()
+
+@app.on_event("startup")
+async def start_outbox_dispatcher():
+    """Carries out staged notifications and audit logs; can run in dedicated workers instead"""
+    if settings.outbox_dispatcher_enabled:
+        await outbox_dispatcher.start()
+
+@app.on_event("shutdown")
+async def stop_outbox_dispatcher():
+    await outbox_dispatcher.stop()
+
 @app.get("/")
 async def root():
     """Root endpoint"""
     return {"message": "Welcome to MRDPOL Core API"}
+
+@app.get("/health")
+async def health():
+    """Liveness probe - answers as long as the process serves requests, never touches the DB"""
+    return {"status": "ok"}
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe - dependency checks, cached for a few seconds"""
+    report = await readiness.report()
+    status_code = status.HTTP_200_OK if report["status"] == "ready" else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(content=report, status_code=status_code)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint"""
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
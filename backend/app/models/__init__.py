@@ -6,11 +6,12 @@ from .user import User, Role
 from .item_category import ItemCategory
 from .item import Item
 from .warehouse_request import WarehouseRequest, WarehouseRequestItem
-from .order import Order
+from .order import Order, OrderRequestItem
 from .task import Task
 from .route_card import RouteCard
 from .production_report import ProductionReport
 from .production_log import ProductionLog
+from .production_daily_rollup import ProductionDailyRollup
 from .stoppage import Stoppage
 from .meeting import Meeting, MeetingAgendaItem, MeetingMinutes
 from .audit import AuditLog
@@ -18,6 +19,7 @@ from .notification import Notification
 from .chat import ChatMessage
 from .change_request_approval import ChangeRequestApproval
 from .general_submission import GeneralSubmission
+from .outbox import OutboxMessage
 
 __all__ = [
     "User",
@@ -27,10 +29,12 @@ __all__ = [
     "WarehouseRequest",
     "WarehouseRequestItem",
     "Order",
+    "OrderRequestItem",
     "Task",
     "RouteCard",
     "ProductionReport",
     "ProductionLog",
+    "ProductionDailyRollup",
     "Stoppage",
     "Meeting",
     "MeetingAgendaItem",
@@ -40,4 +44,5 @@ __all__ = [
     "ChatMessage",
     "ChangeRequestApproval",
     "GeneralSubmission",
+    "OutboxMessage",
 ]
@@ -1,5 +1,5 @@
 from typing import Optional, List
-from sqlalchemy import String, ForeignKey, Enum as SQLEnum
+from sqlalchemy import String, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base_class import Base
 import enum
@@ -40,3 +40,9 @@ class GeneralSubmission(Base):
     updated_at: Mapped[datetime] = mapped_column(
         default=datetime.utcnow, onupdate=datetime.utcnow
     )
+
+    __table_args__ = (
+        # Keyset pagination, newest first: all submissions and a creator's own
+        Index("ix_general_submission_created_at_id", "created_at", "id"),
+        Index("ix_general_submission_creator_created_at_id", "creator_id", "created_at", "id"),
+    )
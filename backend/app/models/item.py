@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 
 from ..db.base_class import Base
@@ -16,3 +16,8 @@ class Item(Base):
     category = relationship("ItemCategory", back_populates="items")
     warehouse_request_items = relationship("WarehouseRequestItem", back_populates="item")
     orders = relationship("Order", back_populates="item")
+
+    __table_args__ = (
+        # Named explicitly: the default ix_item_category_id is item_category's id index
+        Index("ix_item_by_category", "category_id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from ..db.base_class import Base
@@ -10,13 +10,21 @@ class ItemCategory(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
     description = Column(String, nullable=True)
-    parent_id = Column(Integer, ForeignKey("item_category.id"), nullable=True)
+    parent_id = Column(Integer, ForeignKey("item_category.id"), nullable=True, index=True)
+    # Materialized path of ids from the root, e.g. "/1/4/9/"; a subtree is
+    # every category whose path starts with its root's path
+    path = Column(String(500), nullable=True)
     
     # Relationships
     parent = relationship("ItemCategory", remote_side=[id], back_populates="children")
     children = relationship("ItemCategory", back_populates="parent")
     items = relationship("Item", back_populates="category")
 
+    __table_args__ = (
+        # Pattern ops so `path LIKE '/1/4/%'` can use the index on PostgreSQL
+        Index("ix_item_category_path", "path", postgresql_ops={"path": "varchar_pattern_ops"}),
+    )
+
     def to_tree_dict(self):
         """Convert category to tree structure"""
         return {
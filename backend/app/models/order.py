@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -41,9 +41,34 @@ class Order(Base):
     vendor_name = Column(String, nullable=True)
     price = Column(Integer, nullable=True)  # Store price in cents to avoid floating point issues
     
+    # Bumped by every change; status transitions compare-and-swap on it
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    
     # Relationships
     created_by = relationship("User", back_populates="orders")
     item = relationship("Item", back_populates="orders")
     warehouse_request_item = relationship("WarehouseRequestItem", back_populates="orders")
     tasks = relationship("Task", back_populates="order")
     route_card = relationship("RouteCard", back_populates="order", uselist=False)
+
+    # ORM updates of an order check and bump the version as well
+    __mapper_args__ = {"version_id_col": version}
+
+    __table_args__ = (
+        # Keyset pagination of the order list (newest/oldest, due) by its common filters
+        Index("ix_order_created_at_id", "created_at", "id"),
+        Index("ix_order_type_status_created_at_id", "order_type", "status", "created_at", "id"),
+        Index("ix_order_type_status_required_date_id", "order_type", "status", "required_date", "id"),
+        Index("ix_order_item_id_created_at_id", "item_id", "created_at", "id"),
+        Index("ix_order_vendor_name_created_at_id", "vendor_name", "created_at", "id"),
+    )
+
+class OrderRequestItem(Base):
+    """A warehouse request item line covered by an order; consolidated orders cover several"""
+    __tablename__ = "order_request_item"
+
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, ForeignKey("order.id", ondelete="CASCADE"), nullable=False, index=True)
+    warehouse_request_item_id = Column(Integer, ForeignKey("warehouse_request_item.id"), nullable=False, index=True)
+    quantity = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,34 @@
+import enum
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
+from sqlalchemy.sql import func
+
+from ..db.base_class import Base
+
+class OutboxStatus(str, enum.Enum):
+    PENDING = "pending"
+    DONE = "done"
+    DEAD = "dead"  # gave up after the maximum number of attempts
+
+class OutboxMessage(Base):
+    """
+    Side effect of a business change (notification, audit log, ...), written
+    in the same transaction as the change and carried out afterwards by the
+    outbox dispatcher.
+    """
+    __tablename__ = "outbox"
+
+    id = Column(Integer, primary_key=True)
+    topic = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(20), nullable=False, default=OutboxStatus.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Not dispatched before this time; pushed back after a failed attempt
+    available_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    processed_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # The dispatcher's scan: pending messages that are due, oldest first
+        Index("ix_outbox_status_available_at_id", "status", "available_at", "id"),
+    )
@@ -0,0 +1,24 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey, Enum as SQLEnum
+
+from ..db.base_class import Base
+from .production_report import ShiftEnum
+
+class ProductionDailyRollup(Base):
+    """
+    Production totals per report date, shift and item.
+    Maintained incrementally when reports are created; rebuilt from the logs
+    by scripts/rebuild_production_rollup.sh.
+    """
+    __tablename__ = "production_daily_rollup"
+
+    report_date = Column(Date, primary_key=True)
+    shift = Column(SQLEnum(ShiftEnum), primary_key=True)
+    item_id = Column(Integer, ForeignKey("item.id"), primary_key=True, index=True)
+    quantity_produced = Column(Float, nullable=False, default=0)
+    target_quantity = Column(Float, nullable=False, default=0)
+    # Sum of efficiency * target_quantity; divided by target_quantity gives
+    # the target-weighted average efficiency of any group of rows
+    weighted_efficiency = Column(Float, nullable=False, default=0)
+    log_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,5 +1,5 @@
 from datetime import date, datetime
-from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Text, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from enum import Enum
 
@@ -29,3 +29,8 @@ class ProductionReport(Base):
     created_by = relationship("User", back_populates="production_reports")
     production_logs = relationship("ProductionLog", back_populates="report", cascade="all, delete-orphan")
     stoppages = relationship("Stoppage", back_populates="report", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Keyset pagination order: report_date DESC, shift, id
+        Index("ix_production_report_date_shift_id", report_date.desc(), shift, id),
+    )
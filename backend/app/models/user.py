@@ -19,6 +19,8 @@ class User(Base):
     full_name = Column(String)
     hashed_password = Column(String)
     is_active = Column(Boolean, default=True)
+    # Bumped on every role change/deactivation so tokens with older role claims are rejected
+    role_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationship with roles
     roles = relationship("Role", secondary=user_roles, back_populates="users")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -51,6 +51,12 @@ class WarehouseRequest(Base):
     change_approvals = relationship("ChangeRequestApproval", back_populates="warehouse_request", cascade="all, delete-orphan")
     original_request = relationship("WarehouseRequest", remote_side=[id], backref="change_requests")
 
+    __table_args__ = (
+        # Keyset pagination, newest first: all requests and a requester's own
+        Index("ix_warehouse_request_created_at_id", "created_at", "id"),
+        Index("ix_warehouse_request_created_by_created_at_id", "created_by_id", "created_at", "id"),
+    )
+
 class WarehouseRequestItem(Base):
     __tablename__ = "warehouse_request_item"
 
@@ -72,3 +78,8 @@ class WarehouseRequestItem(Base):
     request = relationship("WarehouseRequest", back_populates="request_items")
     item = relationship("Item", back_populates="warehouse_request_items")
     orders = relationship("Order", back_populates="warehouse_request_item")
+
+    __table_args__ = (
+        # Loading a request's items and the all-processed check
+        Index("ix_warehouse_request_item_request_id_status", "request_id", "status"),
+    )
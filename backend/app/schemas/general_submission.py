@@ -35,3 +35,4 @@ class Submission(SubmissionInDBBase):
 class SubmissionList(BaseModel):
     total: int
     submissions: List[Submission]
+    next_cursor: Optional[str] = None
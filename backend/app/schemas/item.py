@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 class ItemBase(BaseModel):
     item_code: str = Field(..., min_length=1, max_length=50)
@@ -16,3 +16,19 @@ class ItemResponse(ItemBase):
 
     class Config:
         orm_mode = True
+
+class ItemSuggestion(BaseModel):
+    id: int
+    item_code: str
+    name: str
+
+class ItemImportError(BaseModel):
+    row: int
+    item_code: Optional[str] = None
+    errors: List[str]
+
+class ItemImportReport(BaseModel):
+    total_rows: int
+    imported: int
+    error_count: int
+    errors: List[ItemImportError]
@@ -1,6 +1,8 @@
-from typing import Optional
+import enum
+from typing import Dict, List, Optional
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from app.models.order import OrderStatus
 
 class OrderBase(BaseModel):
     order_type: str
@@ -14,13 +16,15 @@ class OrderCreate(OrderBase):
     warehouse_request_item_id: Optional[int] = None
 
 class OrderUpdate(BaseModel):
-    status: Optional[str] = None
+    status: Optional[OrderStatus] = None
     priority: Optional[str] = None
     quantity: Optional[int] = None
     remarks: Optional[str] = None
     required_date: Optional[datetime] = None
     vendor_name: Optional[str] = None
     price: Optional[float] = None
+    # Version the client last saw; a stale one is rejected with 409
+    version: Optional[int] = None
 
 class Order(OrderBase):
     id: int
@@ -32,6 +36,34 @@ class Order(OrderBase):
     updated_at: Optional[datetime]
     vendor_name: Optional[str] = None
     price: Optional[float] = None
+    version: int
 
     class Config:
         orm_mode = True
+
+class OrderSort(str, enum.Enum):
+    NEWEST = "newest"
+    OLDEST = "oldest"
+    DUE = "due"  # soonest required date first, orders without one last
+
+class OrderFacets(BaseModel):
+    total: int
+    order_type: Dict[str, int]
+    status: Dict[str, int]
+    priority: Dict[str, int]
+
+class OrderStatusChange(BaseModel):
+    order_id: int
+    status: OrderStatus
+    version: Optional[int] = None
+    remarks: Optional[str] = None
+
+class OrderTransitionsRequest(BaseModel):
+    changes: List[OrderStatusChange] = Field(..., min_items=1, max_items=500)
+
+class OrderTransitionResult(BaseModel):
+    order_id: int
+    outcome: str  # applied, not_found, invalid_transition or conflict
+    status: Optional[OrderStatus] = None
+    version: Optional[int] = None
+    detail: Optional[str] = None
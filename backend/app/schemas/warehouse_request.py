@@ -16,6 +16,18 @@ class WarehouseRequestItemUpdate(BaseModel):
     status: Optional[str] = None
     remarks: Optional[str] = None
 
+class WarehouseRequestItemLineUpdate(WarehouseRequestItemUpdate):
+    id: int
+
+class WarehouseRequestItemsUpdate(BaseModel):
+    items: List[WarehouseRequestItemLineUpdate]
+
+class WarehouseRequestItemsUpdateResult(BaseModel):
+    updated: int
+    orders_created: int
+    orders_extended: int = 0  # open draft orders the shortages were added to
+    request_status: str
+
 class WarehouseRequestItem(WarehouseRequestItemBase):
     id: int
     request_id: int
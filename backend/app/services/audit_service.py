@@ -1,17 +1,18 @@
 from typing import Optional, Dict, Any
-from sqlalchemy.orm import Session
-from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..db.unit_of_work import UnitOfWork
 from ..models.audit import AuditLog
-from ..models.user import User
 
 
 class AuditService:
     """Service for handling audit logging."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, uow: Optional[UnitOfWork] = None):
         self.db = db
+        self.uow = uow or UnitOfWork(db)
     
-    def log_action(
+    def stage_log(
         self,
         user_id: int,
         action: str,
@@ -20,42 +21,54 @@ class AuditService:
         details: Optional[Dict[str, Any]] = None,
         ip_address: Optional[str] = None
     ) -> AuditLog:
-        """Log an audit action."""
+        """Add an audit log to the session, written when the unit of work commits."""
+        changes = dict(details or {})
+        if ip_address:
+            changes["ip_address"] = ip_address
         audit_log = AuditLog(
             user_id=user_id,
             action=action,
-            resource_type=resource_type,
-            resource_id=resource_id,
-            details=details or {},
-            ip_address=ip_address,
-            timestamp=datetime.utcnow()
+            table_name=resource_type,
+            record_id=resource_id,
+            changes=changes
         )
-        
         self.db.add(audit_log)
-        self.db.commit()
-        self.db.refresh(audit_log)
-        
         return audit_log
     
-    def log_login(self, user_id: int, ip_address: Optional[str] = None) -> AuditLog:
+    async def log_action(
+        self,
+        user_id: int,
+        action: str,
+        resource_type: str,
+        resource_id: Optional[int] = None,
+        details: Optional[Dict[str, Any]] = None,
+        ip_address: Optional[str] = None
+    ) -> AuditLog:
+        """Log an audit action, committed with the surrounding unit of work if there is one."""
+        async with self.uow:
+            return self.stage_log(user_id, action, resource_type, resource_id, details, ip_address)
+    
+    async def log_login(self, user_id: int, ip_address: Optional[str] = None) -> AuditLog:
         """Log a user login."""
-        return self.log_action(
+        return await self.log_action(
             user_id=user_id,
             action="login",
             resource_type="auth",
+            resource_id=user_id,
             ip_address=ip_address
         )
     
-    def log_logout(self, user_id: int, ip_address: Optional[str] = None) -> AuditLog:
+    async def log_logout(self, user_id: int, ip_address: Optional[str] = None) -> AuditLog:
         """Log a user logout."""
-        return self.log_action(
+        return await self.log_action(
             user_id=user_id,
             action="logout",
             resource_type="auth",
+            resource_id=user_id,
             ip_address=ip_address
         )
     
-    def log_create(
+    async def log_create(
         self,
         user_id: int,
         resource_type: str,
@@ -63,7 +76,7 @@ class AuditService:
         details: Optional[Dict[str, Any]] = None
     ) -> AuditLog:
         """Log a resource creation."""
-        return self.log_action(
+        return await self.log_action(
             user_id=user_id,
             action="create",
             resource_type=resource_type,
@@ -71,7 +84,7 @@ class AuditService:
             details=details
         )
     
-    def log_update(
+    async def log_update(
         self,
         user_id: int,
         resource_type: str,
@@ -79,7 +92,7 @@ class AuditService:
         details: Optional[Dict[str, Any]] = None
     ) -> AuditLog:
         """Log a resource update."""
-        return self.log_action(
+        return await self.log_action(
             user_id=user_id,
             action="update",
             resource_type=resource_type,
@@ -87,7 +100,7 @@ class AuditService:
             details=details
         )
     
-    def log_delete(
+    async def log_delete(
         self,
         user_id: int,
         resource_type: str,
@@ -95,7 +108,7 @@ class AuditService:
         details: Optional[Dict[str, Any]] = None
     ) -> AuditLog:
         """Log a resource deletion."""
-        return self.log_action(
+        return await self.log_action(
             user_id=user_id,
             action="delete",
             resource_type=resource_type,
@@ -103,7 +116,7 @@ class AuditService:
             details=details
         )
     
-    def get_audit_logs(
+    async def get_audit_logs(
         self,
         user_id: Optional[int] = None,
         action: Optional[str] = None,
@@ -111,13 +124,14 @@ class AuditService:
         limit: int = 100
     ) -> list[AuditLog]:
         """Get audit logs with optional filtering."""
-        query = self.db.query(AuditLog)
+        query = select(AuditLog)
         
         if user_id:
-            query = query.filter(AuditLog.user_id == user_id)
+            query = query.where(AuditLog.user_id == user_id)
         if action:
-            query = query.filter(AuditLog.action == action)
+            query = query.where(AuditLog.action == action)
         if resource_type:
-            query = query.filter(AuditLog.resource_type == resource_type)
+            query = query.where(AuditLog.table_name == resource_type)
         
-        return query.order_by(AuditLog.timestamp.desc()).limit(limit).all()
+        result = await self.db.execute(query.order_by(AuditLog.created_at.desc()).limit(limit))
+        return list(result.scalars().all())
@@ -0,0 +1,90 @@
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import Float, String, cast, func, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.cache import cached, invalidate_on_commit
+from ..core.config import settings
+from ..models.order import Order, OrderStatus, OrderType
+from ..models.task import Task, TaskStatus
+from .production_rollup_service import ProductionRollupService
+
+EFFICIENCY_TREND_DAYS = 30
+ACTIVE_ORDER_STATUSES = (OrderStatus.SUBMITTED, OrderStatus.IN_PROGRESS)
+
+# Task and order changes committed through the ORM drop the cached summary
+invalidate_on_commit(["dashboard"], Task, Order)
+
+
+class DashboardService:
+    """Dashboard counters, computed in one statement and shared through the cache"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def count_statements():
+        """Task counts per status and active order counts per type, as (kind, key, value) selects"""
+        task_counts = (
+            select(literal("task"), cast(Task.status, String), cast(func.count(Task.id), Float))
+            .group_by(Task.status)
+        )
+        order_counts = (
+            select(literal("order"), cast(Order.order_type, String), cast(func.count(Order.id), Float))
+            .where(Order.status.in_(ACTIVE_ORDER_STATUSES))
+            .group_by(Order.order_type)
+        )
+        return task_counts, order_counts
+
+    @classmethod
+    def summary_statement(cls, start_date: date, end_date: date):
+        """
+        Task counts per status, active order counts per type and daily
+        efficiency as one UNION ALL of (kind, key, value) rows
+        """
+        daily_efficiency = ProductionRollupService.daily_efficiency_statement(start_date, end_date)
+        return union_all(*cls.count_statements(), daily_efficiency)
+
+    @staticmethod
+    def build_summary(rows: Iterable[Tuple[str, str, float]], start_date: date, end_date: date) -> Dict:
+        """Fold the (kind, key, value) rows into the DashboardSummary shape"""
+        task_summary: Dict[str, int] = {}
+        active_orders = {order_type.value: 0 for order_type in OrderType}
+        efficiency_by_date: Dict[str, float] = {}
+        for kind, key, value in rows:
+            if kind == "task":
+                # Enum columns store member names
+                task_summary[TaskStatus[key].value] = int(value)
+            elif kind == "order":
+                active_orders[OrderType[key].value] = int(value)
+            else:
+                efficiency_by_date[key[:10]] = float(value or 0)
+
+        days = (end_date - start_date).days + 1
+        efficiency_trend = []
+        for offset in range(days):
+            day = start_date + timedelta(days=offset)
+            efficiency_trend.append({
+                "date": datetime.combine(day, time.min),
+                "average_efficiency": efficiency_by_date.get(day.isoformat(), 0.0),
+            })
+        return {
+            "task_summary": task_summary,
+            "efficiency_trend": efficiency_trend,
+            "active_orders": active_orders,
+        }
+
+    async def get_counts(self) -> Dict:
+        """Task and active order counts read now, bypassing the cache: the base live update deltas apply to"""
+        result = await self.db.execute(union_all(*self.count_statements()))
+        today = date.today()
+        summary = self.build_summary(result.all(), today, today)
+        return {"task_summary": summary["task_summary"], "active_orders": summary["active_orders"]}
+
+    @cached(prefix="dashboard:summary", ttl=settings.dashboard_cache_ttl_seconds, tags=["dashboard"])
+    async def get_summary(self) -> Dict:
+        end_date = date.today()
+        start_date = end_date - timedelta(days=EFFICIENCY_TREND_DAYS)
+        result = await self.db.execute(self.summary_statement(start_date, end_date))
+        return self.build_summary(result.all(), start_date, end_date)
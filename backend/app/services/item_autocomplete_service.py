@@ -0,0 +1,157 @@
+"""
+In-memory prefix index for item code / name autocomplete.
+
+Each worker keeps every item's code and name in two sorted arrays and answers
+prefix lookups with a binary search, without touching the database. The
+index is loaded on startup and items created through the API are added as
+they commit. Other workers notice through a version counter in the shared
+cache, checked at most every `item_index_refresh_seconds`, and then load only
+the items they haven't seen yet.
+"""
+import asyncio
+import logging
+import time
+from bisect import bisect_left, insort
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from ..core.cache import cache
+from ..core.config import settings
+from ..db.session import AsyncSessionLocal
+from ..models.item import Item
+
+logger = logging.getLogger(__name__)
+
+ITEM = Item.__table__
+VERSION_KEY = "items:index-version"
+# Catch-up re-reads this many ids below the highest known one: ids are taken
+# before commit, so concurrent creates can become visible out of order
+CATCH_UP_WINDOW = 1000
+
+
+class ItemPrefixIndex:
+    """Sorted (lowercased key, item id) arrays over item codes and names"""
+
+    def __init__(
+        self,
+        session_factory: Callable = AsyncSessionLocal,
+        refresh_seconds: float = 1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.session_factory = session_factory
+        self.refresh_seconds = refresh_seconds
+        self._clock = clock
+        self._entries: Dict[int, Tuple[str, str]] = {}
+        self._codes: List[Tuple[str, int]] = []
+        self._names: List[Tuple[str, int]] = []
+        self._max_id = 0
+        # Shared version the index reflects; None until loaded
+        self.version: Optional[int] = None
+        self._checked_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def loaded(self) -> bool:
+        return self.version is not None
+
+    def _insert(self, item_id: int, item_code: str, name: str) -> None:
+        previous = self._entries.get(item_id)
+        if previous == (item_code, name):
+            return
+        if previous is not None:
+            self._codes.remove((previous[0].lower(), item_id))
+            self._names.remove((previous[1].lower(), item_id))
+        self._entries[item_id] = (item_code, name)
+        insort(self._codes, (item_code.lower(), item_id))
+        insort(self._names, (name.lower(), item_id))
+        self._max_id = max(self._max_id, item_id)
+
+    def lookup(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Items whose code, then whose name, starts with `prefix` (case-insensitive)"""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        matches: List[Dict] = []
+        seen = set()
+        for keys in (self._codes, self._names):
+            position = bisect_left(keys, (prefix,))
+            while position < len(keys) and len(matches) < limit and keys[position][0].startswith(prefix):
+                item_id = keys[position][1]
+                if item_id not in seen:
+                    seen.add(item_id)
+                    item_code, name = self._entries[item_id]
+                    matches.append({"id": item_id, "item_code": item_code, "name": name})
+                position += 1
+        return matches
+
+    async def _shared_version(self) -> int:
+        return int(await cache.get(VERSION_KEY) or 0)
+
+    async def _fetch(self, after_id: int = 0) -> List[Tuple[int, str, str]]:
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(ITEM.c.id, ITEM.c.item_code, ITEM.c.name)
+                .where(ITEM.c.id > after_id)
+                .order_by(ITEM.c.id)
+            )
+            return result.all()
+
+    async def load(self) -> None:
+        """(Re)build the whole index from the item table"""
+        # Version first: a change committed meanwhile is picked up on the next check
+        version = await self._shared_version()
+        rows = await self._fetch()
+        self._entries = {item_id: (item_code, name) for item_id, item_code, name in rows}
+        self._codes = sorted((item_code.lower(), item_id) for item_id, item_code, name in rows)
+        self._names = sorted((name.lower(), item_id) for item_id, item_code, name in rows)
+        self._max_id = rows[-1][0] if rows else 0
+        self.version = version
+        self._checked_at = self._clock()
+        logger.info("Item autocomplete index loaded with %d items", len(rows))
+
+    async def warm(self) -> None:
+        """load() for startup: failures are logged and retried on first use"""
+        try:
+            await self.load()
+        except Exception as exc:
+            logger.warning("Item autocomplete index not loaded at startup: %s", exc)
+
+    async def ensure_current(self) -> None:
+        """Catch up with items other workers created, at most once per refresh interval"""
+        if self.loaded and self._clock() - self._checked_at < self.refresh_seconds:
+            return
+        async with self._lock:
+            if not self.loaded:
+                await self.load()
+                return
+            if self._clock() - self._checked_at < self.refresh_seconds:
+                return
+            version = await self._shared_version()
+            if version != self.version:
+                for item_id, item_code, name in await self._fetch(after_id=self._max_id - CATCH_UP_WINDOW):
+                    self._insert(item_id, item_code, name)
+                self.version = version
+            self._checked_at = self._clock()
+
+    async def search(self, prefix: str, limit: int = 10) -> List[Dict]:
+        await self.ensure_current()
+        return self.lookup(prefix, limit)
+
+    async def mark_changed(self) -> None:
+        """Announce items written elsewhere (e.g. a bulk import); every worker catches up"""
+        await cache.incr(VERSION_KEY)
+
+    async def add(self, item_id: int, item_code: str, name: str) -> None:
+        """Add a committed item here and announce it to the other workers"""
+        self._insert(item_id, item_code, name)
+        version = await cache.incr(VERSION_KEY)
+        # Only skip the catch-up if nobody else bumped the version in between
+        if version is not None and self.version is not None and version == self.version + 1:
+            self.version = version
+
+
+item_index = ItemPrefixIndex(refresh_seconds=settings.item_index_refresh_seconds)
@@ -0,0 +1,79 @@
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.cache import cache, cached
+from ..models.item_category import ItemCategory
+
+CATEGORY = ItemCategory.__table__
+
+
+def category_path(category_id: int, parent_path: Optional[str] = None) -> str:
+    """Materialized path of a category below a parent (or at the root)"""
+    return f"{parent_path or '/'}{category_id}/"
+
+
+class ItemCategoryService:
+    """Item category tree: loaded in one query and shared through the cache"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @cached(prefix="items:categories", tags=["categories"])
+    async def get_categories(self) -> List[Dict]:
+        """All categories as flat rows, including their materialized paths"""
+        result = await self.db.execute(
+            select(
+                CATEGORY.c.id,
+                CATEGORY.c.name,
+                CATEGORY.c.description,
+                CATEGORY.c.parent_id,
+                CATEGORY.c.path,
+            )
+            .order_by(CATEGORY.c.id)
+        )
+        return [dict(row) for row in result.mappings()]
+
+    @staticmethod
+    def build_tree(rows: Iterable[Dict]) -> List[Dict]:
+        """Nest flat category rows under their parents, children in id order"""
+        nodes = {
+            row["id"]: {
+                "id": row["id"],
+                "name": row["name"],
+                "description": row["description"],
+                "children": [],
+            }
+            for row in rows
+        }
+        roots = []
+        for row in sorted(rows, key=lambda row: row["id"]):
+            parent = nodes.get(row["parent_id"])
+            (parent["children"] if parent is not None else roots).append(nodes[row["id"]])
+        return roots
+
+    async def get_tree(self) -> List[Dict]:
+        return self.build_tree(await self.get_categories())
+
+    async def get_path(self, category_id: int) -> Optional[str]:
+        """Materialized path of a category, None if it doesn't exist"""
+        for row in await self.get_categories():
+            if row["id"] == category_id:
+                return row["path"]
+        return None
+
+    async def create(self, name: str, description: Optional[str] = None, parent: Optional[ItemCategory] = None) -> ItemCategory:
+        """Create a category below `parent` (a root if None) with its path"""
+        category = ItemCategory(
+            name=name,
+            description=description,
+            parent_id=parent.id if parent is not None else None
+        )
+        self.db.add(category)
+        # The path ends in the category's own id
+        await self.db.flush()
+        category.path = category_path(category.id, parent.path if parent is not None else None)
+        await self.db.commit()
+        await cache.invalidate_tags("categories")
+        return category
@@ -0,0 +1,221 @@
+"""
+Bulk item import from CSV or XLSX uploads.
+
+Rows are read from the (spooled) upload a batch at a time in a worker thread
+and validated per batch: fields through the ItemCreate schema, categories
+with one IN query, item codes against the batch's existing codes (one IN
+query) and the codes already seen in the file. Valid rows are loaded with
+COPY on PostgreSQL (asyncpg) and a single executemany INSERT elsewhere, and
+each batch is committed on its own. Invalid rows are skipped and reported.
+"""
+import codecs
+import csv
+from itertools import islice
+from typing import IO, Dict, Iterator, List, Optional, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.cache import cache
+from ..models.item import Item
+from ..models.item_category import ItemCategory
+from ..schemas.item import ItemCreate
+from .item_autocomplete_service import item_index
+
+ITEM = Item.__table__
+CATEGORY = ItemCategory.__table__
+
+IMPORT_COLUMNS = ("item_code", "name", "description", "category_id")
+BATCH_SIZE = 1000
+# Errors listed in the report; the count covers all of them
+MAX_REPORTED_ERRORS = 1000
+
+Row = Tuple[int, Dict[str, Optional[str]]]
+
+
+class ImportFormatError(ValueError):
+    """The upload can't be read as an item sheet"""
+
+
+def _clean(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        # Spreadsheet numbers, e.g. a category id of 3.0
+        value = int(value)
+    value = str(value).strip()
+    return value or None
+
+
+def _check_header(header) -> List[str]:
+    columns = [(_clean(column) or "").lower() for column in header]
+    missing = [column for column in IMPORT_COLUMNS if column != "description" and column not in columns]
+    if missing:
+        raise ImportFormatError(f"Missing column(s): {', '.join(missing)}")
+    return columns
+
+
+def read_csv_rows(file: IO[bytes]) -> Iterator[Row]:
+    """(line number, row) pairs of a UTF-8 CSV with a header line"""
+    reader = csv.reader(codecs.getreader("utf-8-sig")(file))
+    try:
+        columns = _check_header(next(reader))
+    except StopIteration:
+        raise ImportFormatError("The file is empty")
+    for number, values in enumerate(reader, start=2):
+        if any(_clean(value) for value in values):
+            yield number, {column: _clean(value) for column, value in zip(columns, values)}
+
+
+def read_xlsx_rows(file: IO[bytes]) -> Iterator[Row]:
+    """(row number, row) pairs of the first sheet of an XLSX workbook"""
+    # Imported here so openpyxl is only needed for XLSX uploads
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFormatError("XLSX import is not available on this server, upload CSV instead")
+
+    try:
+        # read_only streams the sheet instead of loading it whole
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except Exception as exc:
+        raise ImportFormatError(f"Not a readable XLSX file: {exc}")
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        try:
+            columns = _check_header(next(rows))
+        except StopIteration:
+            raise ImportFormatError("The sheet is empty")
+        for number, values in enumerate(rows, start=2):
+            if any(_clean(value) for value in values):
+                yield number, {column: _clean(value) for column, value in zip(columns, values)}
+    finally:
+        workbook.close()
+
+
+def read_rows(filename: str, file: IO[bytes]) -> Iterator[Row]:
+    if filename.lower().endswith(".xlsx"):
+        return read_xlsx_rows(file)
+    if filename.lower().endswith(".csv"):
+        return read_csv_rows(file)
+    raise ImportFormatError("Upload a .csv or .xlsx file")
+
+
+class ItemImportService:
+    """Validates and loads item rows batch by batch"""
+
+    def __init__(self, db: AsyncSession, batch_size: int = BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+        self.total_rows = 0
+        self.imported = 0
+        self.error_count = 0
+        self.errors: List[Dict] = []
+        self._seen_codes: Set[str] = set()
+
+    def _reject(self, number: int, row: Dict, messages: List[str]) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": number, "item_code": row.get("item_code"), "errors": messages})
+
+    async def validate_batch(self, batch: List[Row]) -> List[Tuple[int, ItemCreate]]:
+        """Rows that can be inserted; the others are recorded as errors"""
+        parsed: List[Tuple[int, Dict, ItemCreate]] = []
+        for number, row in batch:
+            try:
+                item = ItemCreate(**{column: row.get(column) for column in IMPORT_COLUMNS})
+            except ValidationError as exc:
+                self._reject(number, row, [
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                    for error in exc.errors()
+                ])
+                continue
+            parsed.append((number, row, item))
+
+        codes = {item.item_code for _, _, item in parsed}
+        category_ids = {item.category_id for _, _, item in parsed}
+        existing_codes = set()
+        known_categories = set()
+        if codes:
+            result = await self.db.execute(select(ITEM.c.item_code).where(ITEM.c.item_code.in_(codes)))
+            existing_codes = set(result.scalars())
+            result = await self.db.execute(select(CATEGORY.c.id).where(CATEGORY.c.id.in_(category_ids)))
+            known_categories = set(result.scalars())
+
+        valid = []
+        for number, row, item in parsed:
+            messages = []
+            if item.category_id not in known_categories:
+                messages.append(f"category_id: category {item.category_id} not found")
+            if item.item_code in self._seen_codes:
+                messages.append("item_code: duplicated in file")
+            elif item.item_code in existing_codes:
+                messages.append("item_code: already exists")
+            if messages:
+                self._reject(number, row, messages)
+                continue
+            self._seen_codes.add(item.item_code)
+            valid.append((number, item))
+        return valid
+
+    async def _copy(self, items: List[ItemCreate]) -> None:
+        """COPY on the session's own connection, inside its transaction"""
+        import asyncpg
+
+        connection = await self.db.connection()
+        raw = await connection.get_raw_connection()
+        try:
+            await raw.driver_connection.copy_records_to_table(
+                ITEM.name,
+                records=[tuple(getattr(item, column) for column in IMPORT_COLUMNS) for item in items],
+                columns=list(IMPORT_COLUMNS),
+            )
+        except asyncpg.UniqueViolationError as exc:
+            # Raw driver errors aren't wrapped by SQLAlchemy
+            raise IntegrityError("COPY item", None, exc)
+
+    async def load_batch(self, valid: List[Tuple[int, ItemCreate]]) -> None:
+        if not valid:
+            return
+        items = [item for _, item in valid]
+        bind = self.db.get_bind()
+        try:
+            if bind.dialect.name == "postgresql" and bind.dialect.driver == "asyncpg":
+                await self._copy(items)
+            else:
+                await self.db.execute(insert(ITEM), [item.dict() for item in items])
+            await self.db.commit()
+        except IntegrityError:
+            # An item with one of these codes was created since validation
+            await self.db.rollback()
+            for number, item in valid:
+                self._seen_codes.discard(item.item_code)
+                self._reject(number, item.dict(), ["item_code: conflicts with an item created during the import, retry these rows"])
+            return
+        self.imported += len(items)
+
+    async def import_rows(self, rows: Iterator[Row]) -> Dict:
+        """Import all rows and return the report"""
+        while True:
+            # Parsing reads the spooled upload, so it runs off the event loop
+            batch = await run_in_threadpool(lambda: list(islice(rows, self.batch_size)))
+            if not batch:
+                break
+            self.total_rows += len(batch)
+            await self.load_batch(await self.validate_batch(batch))
+
+        if self.imported:
+            await cache.invalidate_tags("items")
+            await item_index.mark_changed()
+        return self.report()
+
+    def report(self) -> Dict:
+        return {
+            "total_rows": self.total_rows,
+            "imported": self.imported,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
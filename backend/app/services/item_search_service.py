@@ -0,0 +1,203 @@
+"""
+Ranked item search.
+
+PostgreSQL matches against `item.search_vector`, a generated tsvector column
+(item_code weighted over name over description) with a GIN index, and
+matches item codes fuzzily through pg_trgm; both are added by migration 012.
+SQLite, used in tests and local development, matches against an FTS5 table
+that triggers keep in sync with `item`; both are created along with the item
+table (`create_all`), so searching only reads.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import column, event, func, literal_column, or_, select, table
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.pagination import Keyset, decode_cursor, encode_cursor, invalid_cursor_exception
+from ..models.item import Item
+from ..models.item_category import ItemCategory
+
+ITEM = Item.__table__
+CATEGORY = ItemCategory.__table__
+
+# Generated by PostgreSQL and deliberately not mapped on Item, so the model
+# still creates plainly on SQLite
+SEARCH_VECTOR = literal_column("item.search_vector", type_=TSVECTOR)
+SEARCH_CONFIG = literal_column("'simple'::regconfig")
+
+ITEM_FTS = table("item_fts", column("rowid"))
+
+ITEMS_KEYSET = Keyset("items", (ITEM.c.id, False))
+# Relevance ranks are no stable sort key, so ranked pages carry an offset
+SEARCH_CURSOR_SCOPE = "items:search"
+
+SQLITE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS item_fts USING fts5(
+        item_code, name, description, content='item', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS item_fts_insert AFTER INSERT ON item BEGIN
+        INSERT INTO item_fts(rowid, item_code, name, description)
+        VALUES (new.id, new.item_code, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS item_fts_delete AFTER DELETE ON item BEGIN
+        INSERT INTO item_fts(item_fts, rowid, item_code, name, description)
+        VALUES ('delete', old.id, old.item_code, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS item_fts_update AFTER UPDATE ON item BEGIN
+        INSERT INTO item_fts(item_fts, rowid, item_code, name, description)
+        VALUES ('delete', old.id, old.item_code, old.name, old.description);
+        INSERT INTO item_fts(rowid, item_code, name, description)
+        VALUES (new.id, new.item_code, new.name, new.description);
+    END
+    """,
+    # Index rows that existed before the triggers
+    "INSERT INTO item_fts(item_fts) VALUES ('rebuild')",
+]
+
+
+def search_terms(search: str) -> List[str]:
+    """Word tokens of a search string; punctuation (e.g. in item codes) separates them"""
+    return re.findall(r"\w+", search.lower())
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def create_sqlite_search_index(connection) -> None:
+    """Create the FTS5 table and its triggers on a sync SQLite connection"""
+    for statement in SQLITE_SEARCH_DDL:
+        connection.exec_driver_sql(statement)
+
+
+@event.listens_for(ITEM, "after_create")
+def create_search_index(target, connection, **kw) -> None:
+    # PostgreSQL gets its index from migration 012
+    if connection.dialect.name == "sqlite":
+        create_sqlite_search_index(connection)
+
+
+class ItemSearchService:
+    """Item listing with category subtree filter, ranked when a search string is given"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def base_statement():
+        return (
+            select(
+                ITEM.c.id,
+                ITEM.c.item_code,
+                ITEM.c.name,
+                ITEM.c.description,
+                ITEM.c.category_id,
+                CATEGORY.c.name.label("category_name"),
+            )
+            .join(CATEGORY, CATEGORY.c.id == ITEM.c.category_id)
+        )
+
+    @classmethod
+    def postgresql_statement(cls, search: str):
+        terms = search_terms(search)
+        code_prefix = ITEM.c.item_code.ilike(f"{escape_like(search.strip())}%", escape="\\")
+        # Word-prefix matching (`bol:* & m8:*`) so results follow each keystroke
+        tsquery = func.to_tsquery(SEARCH_CONFIG, " & ".join(f"{term}:*" for term in terms))
+        text_rank = func.ts_rank_cd(SEARCH_VECTOR, tsquery) if terms else 0
+        matches = [code_prefix, ITEM.c.item_code.bool_op("%")(search)]
+        if terms:
+            matches.append(SEARCH_VECTOR.bool_op("@@")(tsquery))
+
+        rank = text_rank + func.similarity(ITEM.c.item_code, search)
+        return (
+            cls.base_statement()
+            .where(or_(*matches))
+            .order_by(rank.desc(), ITEM.c.id)
+        )
+
+    @classmethod
+    def sqlite_statement(cls, search: str):
+        terms = search_terms(search)
+        code_prefix = ITEM.c.item_code.ilike(f"{escape_like(search.strip())}%", escape="\\")
+        if not terms:
+            return cls.base_statement().where(code_prefix).order_by(ITEM.c.id)
+
+        match = " ".join(f'"{term}"*' for term in terms)
+        # bm25 is lower for better matches; columns weighted like the tsvector
+        rank = func.bm25(literal_column("item_fts"), 10.0, 5.0, 1.0)
+        fts_match = (
+            select(ITEM_FTS.c.rowid.label("id"), rank.label("rank"))
+            .where(literal_column("item_fts").op("MATCH")(match))
+            .subquery()
+        )
+        return (
+            cls.base_statement()
+            .outerjoin(fts_match, fts_match.c.id == ITEM.c.id)
+            .where(or_(fts_match.c.id.isnot(None), code_prefix))
+            .order_by(func.coalesce(fts_match.c.rank, 0.0), ITEM.c.id)
+        )
+
+    def filtered_statement(self, search: Optional[str] = None, category_path: Optional[str] = None):
+        """
+        Unpaged statement of the items matching `search` (ranked when given)
+        within the `category_path` subtree, and whether it is ranked
+        """
+        ranked = bool(search and search.strip())
+        if ranked:
+            dialect = self.db.get_bind().dialect.name
+            if dialect == "postgresql":
+                statement = self.postgresql_statement(search)
+            elif dialect == "sqlite":
+                statement = self.sqlite_statement(search)
+            else:
+                raise NotImplementedError(f"Item search not supported on {dialect}")
+        else:
+            statement = self.base_statement()
+
+        if category_path is not None:
+            subtree = select(CATEGORY.c.id).where(CATEGORY.c.path.like(f"{category_path}%"))
+            statement = statement.where(ITEM.c.category_id.in_(subtree))
+
+        return statement, ranked
+
+    async def search(
+        self,
+        search: Optional[str] = None,
+        category_path: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Items as dicts including `category_name`, best matches first, and the
+        cursor of the next page (None on the last). `category_path` limits
+        them to that category's subtree.
+        """
+        statement, ranked = self.filtered_statement(search, category_path)
+        if ranked:
+            offset = skip
+            if cursor:
+                offset = decode_cursor(SEARCH_CURSOR_SCOPE, cursor)[0]
+                if not isinstance(offset, int) or offset < 0:
+                    raise invalid_cursor_exception()
+            result = await self.db.execute(statement.offset(offset).limit(limit + 1))
+            rows = [dict(row) for row in result.mappings()]
+            next_cursor = encode_cursor(SEARCH_CURSOR_SCOPE, [offset + limit]) if len(rows) > limit else None
+            return rows[:limit], next_cursor
+
+        statement = ITEMS_KEYSET.apply(statement, cursor, limit)
+        if skip and not cursor:
+            statement = statement.offset(skip)
+        result = await self.db.execute(statement)
+        return ITEMS_KEYSET.page(
+            [dict(row) for row in result.mappings()], limit, key=lambda row: [row["id"]]
+        )
@@ -0,0 +1,153 @@
+"""
+Live dashboard and task-board updates.
+
+Task and order changes are collected while a session flushes and published
+once it commits, as deltas the browser applies to what it already shows:
+
+- ``tasks.counts``: change per task status, e.g. ``{"new": -1, "in_progress": 1}``
+- ``orders.active``: change in active orders per order type
+- ``task.created``: summary of a newly created task
+"""
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from ..core.events import Subscription, broker
+from .dashboard_service import ACTIVE_ORDER_STATUSES, DashboardService
+from ..models.order import Order
+from ..models.task import Task, TaskStatus
+
+PENDING_KEY = "live_updates"
+
+# Reads of the initial snapshot while deltas keep arriving during them
+SNAPSHOT_READS = 3
+
+
+def _value(enum_member) -> Optional[str]:
+    return enum_member.value if enum_member is not None else None
+
+
+def _previous(obj, attribute: str):
+    """Value before this flush, or the current value if it wasn't changed"""
+    history = inspect(obj).attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, attribute)
+
+
+def task_summary(task: Task) -> Dict:
+    return {
+        "id": task.id,
+        "title": task.title,
+        "status": _value(task.status or TaskStatus.NEW),
+        "priority": task.priority.value if task.priority is not None else None,
+        "assignee_id": task.assignee_id,
+        "creator_id": task.creator_id,
+        "order_id": task.order_id,
+    }
+
+
+class PendingUpdates:
+    """Deltas accumulated by a session until it commits"""
+
+    def __init__(self):
+        self.task_counts: Counter = Counter()
+        self.active_orders: Counter = Counter()
+        self.created_tasks: List[Dict] = []
+
+    def task_moved(self, old_status, new_status) -> None:
+        if old_status is not None:
+            self.task_counts[old_status.value] -= 1
+        if new_status is not None:
+            self.task_counts[new_status.value] += 1
+
+    def order_moved(self, old_state: Tuple, new_state: Tuple) -> None:
+        """States are (order_type, status) pairs, None when the order doesn't exist"""
+        for state, delta in ((old_state, -1), (new_state, 1)):
+            if state is not None and state[0] is not None and state[1] in ACTIVE_ORDER_STATUSES:
+                self.active_orders[state[0].value] += delta
+
+    def messages(self) -> List[Tuple[str, Dict]]:
+        messages = []
+        task_counts = {status: delta for status, delta in self.task_counts.items() if delta}
+        if task_counts:
+            messages.append(("tasks.counts", task_counts))
+        active_orders = {order_type: delta for order_type, delta in self.active_orders.items() if delta}
+        if active_orders:
+            messages.append(("orders.active", active_orders))
+        messages.extend(("task.created", task) for task in self.created_tasks)
+        return messages
+
+
+@event.listens_for(Session, "after_flush")
+def collect_updates(session, flush_context):
+    pending = None
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(obj, (Task, Order)):
+            continue
+        if pending is None:
+            pending = session.info.setdefault(PENDING_KEY, PendingUpdates())
+
+        if isinstance(obj, Task):
+            if obj in session.new:
+                pending.task_moved(None, obj.status or TaskStatus.NEW)
+                pending.created_tasks.append(task_summary(obj))
+            elif obj in session.deleted:
+                pending.task_moved(_previous(obj, "status"), None)
+            else:
+                pending.task_moved(_previous(obj, "status"), obj.status)
+        else:
+            current = (obj.order_type, obj.status)
+            if obj in session.new:
+                pending.order_moved(None, current)
+            elif obj in session.deleted:
+                pending.order_moved((_previous(obj, "order_type"), _previous(obj, "status")), None)
+            else:
+                pending.order_moved((_previous(obj, "order_type"), _previous(obj, "status")), current)
+
+
+def record_order_moved(session: Session, order_type, old_status, new_status) -> None:
+    """For status changes made with Core statements, which after_flush doesn't see"""
+    pending = session.info.setdefault(PENDING_KEY, PendingUpdates())
+    pending.order_moved((order_type, old_status), (order_type, new_status))
+
+
+@event.listens_for(Session, "after_commit")
+def publish_updates(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending is None:
+        return
+    for event_type, data in pending.messages():
+        broker.publish_later(event_type, data)
+
+
+@event.listens_for(Session, "after_rollback")
+def drop_updates(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+async def dashboard_snapshot(db) -> Dict:
+    """
+    Current counters, sent first on every (re)connect so deltas have a base.
+    Read on the stream's primary session, never from the cached summary or a
+    replica, which may predate deltas the stream then drops.
+    """
+    return await DashboardService(db).get_counts()
+
+
+async def subscribed_snapshot(db, subscription: Subscription) -> Dict:
+    """
+    Snapshot for a stream that has already subscribed, so no later delta is
+    missed. Deltas are published after their commit: those queued before a
+    read started are counted in it and dropped. One that arrived during the
+    read may not be, so the snapshot is read again; after SNAPSHOT_READS
+    reads the deltas of the last one stay queued.
+    """
+    snapshot = await dashboard_snapshot(db)
+    for _ in range(SNAPSHOT_READS - 1):
+        if not subscription.drain():
+            break
+        snapshot = await dashboard_snapshot(db)
+    return snapshot
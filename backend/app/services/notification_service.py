@@ -1,5 +1,7 @@
 from typing import Optional, List
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..db.unit_of_work import UnitOfWork
 from ..models.user import User
 from ..models.notification import Notification
 
@@ -7,85 +9,105 @@ from ..models.notification import Notification
 class NotificationService:
     """Service for handling notifications."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, uow: Optional[UnitOfWork] = None):
         self.db = db
+        self.uow = uow or UnitOfWork(db)
     
-    def create_notification(
+    def stage_notification(
         self,
         user_id: int,
-        title: str,
         message: str,
-        type: str = "info",
-        data: Optional[dict] = None
+        type: str = "INFO",
+        title: Optional[str] = None,
+        link: Optional[str] = None
     ) -> Notification:
-        """Create a new notification for a user."""
+        """Add a notification to the session, sent when the unit of work commits."""
         notification = Notification(
             user_id=user_id,
-            title=title,
-            message=message,
+            title=title or type.replace("_", " ").capitalize(),
+            content=message,
             type=type,
-            data=data or {}
+            link=link
         )
-        
         self.db.add(notification)
-        self.db.commit()
-        self.db.refresh(notification)
-        
         return notification
     
-    def get_user_notifications(
+    async def create_notification(
+        self,
+        user_id: int,
+        message: str,
+        type: str = "INFO",
+        title: Optional[str] = None,
+        link: Optional[str] = None
+    ) -> Notification:
+        """Create a new notification for a user, committed with the surrounding unit of work if there is one."""
+        async with self.uow:
+            return self.stage_notification(user_id, message, type, title, link)
+    
+    async def get_user_notifications(
         self,
         user_id: int,
         unread_only: bool = False,
         limit: int = 50
     ) -> List[Notification]:
         """Get notifications for a user."""
-        query = self.db.query(Notification).filter(Notification.user_id == user_id)
+        query = select(Notification).where(Notification.user_id == user_id)
         
         if unread_only:
-            query = query.filter(Notification.is_read == False)
+            query = query.where(Notification.read == False)
         
-        return query.order_by(Notification.created_at.desc()).limit(limit).all()
+        result = await self.db.execute(query.order_by(Notification.created_at.desc()).limit(limit))
+        return list(result.scalars().all())
     
-    def mark_as_read(self, notification_id: int, user_id: int) -> bool:
+    async def mark_as_read(self, notification_id: int, user_id: int) -> bool:
         """Mark a notification as read."""
-        notification = self.db.query(Notification).filter(
-            Notification.id == notification_id,
-            Notification.user_id == user_id
-        ).first()
+        result = await self.db.execute(
+            select(Notification).where(
+                Notification.id == notification_id,
+                Notification.user_id == user_id
+            )
+        )
+        notification = result.scalars().first()
         
         if notification:
-            notification.is_read = True
-            self.db.commit()
+            notification.read = True
+            await self.db.commit()
             return True
         
         return False
     
-    def mark_all_as_read(self, user_id: int) -> int:
+    async def mark_all_as_read(self, user_id: int) -> int:
         """Mark all notifications as read for a user."""
-        count = self.db.query(Notification).filter(
-            Notification.user_id == user_id,
-            Notification.is_read == False
-        ).update({"is_read": True})
+        result = await self.db.execute(
+            update(Notification)
+            .where(
+                Notification.user_id == user_id,
+                Notification.read == False
+            )
+            .values(read=True)
+        )
         
-        self.db.commit()
-        return count
+        await self.db.commit()
+        return result.rowcount
     
-    def delete_notification(self, notification_id: int, user_id: int) -> bool:
+    async def delete_notification(self, notification_id: int, user_id: int) -> bool:
         """Delete a notification."""
-        notification = self.db.query(Notification).filter(
-            Notification.id == notification_id,
-            Notification.user_id == user_id
-        ).first()
+        result = await self.db.execute(
+            select(Notification).where(
+                Notification.id == notification_id,
+                Notification.user_id == user_id
+            )
+        )
+        notification = result.scalars().first()
         
         if notification:
-            self.db.delete(notification)
-            self.db.commit()
+            await self.db.delete(notification)
+            await self.db.commit()
             return True
         
         return False
     
-    def send_system_notification(
+    async def send_system_notification(
         self,
         title: str,
         message: str,
@@ -97,23 +119,24 @@ class NotificationService:
         
         # Get target users
         if user_ids:
-            users = self.db.query(User).filter(User.id.in_(user_ids)).all()
+            query = select(User).where(User.id.in_(user_ids))
         elif role_names:
-            users = self.db.query(User).join(User.roles).filter(
+            query = select(User).join(User.roles).where(
                 User.roles.any(name__in=role_names)
-            ).all()
+            )
         else:
             # Send to all active users
-            users = self.db.query(User).filter(User.is_active == True).all()
+            query = select(User).where(User.is_active == True)
+        users = (await self.db.execute(query)).scalars().all()
         
-        # Create notifications
-        for user in users:
-            notification = self.create_notification(
-                user_id=user.id,
-                title=title,
-                message=message,
-                type="system"
-            )
-            notifications.append(notification)
+        # Create notifications, committed together
+        async with self.uow:
+            for user in users:
+                notifications.append(self.stage_notification(
+                    user_id=user.id,
+                    message=message,
+                    type="system",
+                    title=title
+                ))
         
         return notifications
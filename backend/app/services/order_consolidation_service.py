@@ -0,0 +1,271 @@
+"""
+Shortage order consolidation.
+
+Backordered warehouse request lines don't get an order each. Lines of the
+same item and order type share one draft order: on insert they are added to
+the newest open draft of that item created within the consolidation window,
+or start a new draft; a periodic batch (scripts/consolidate_shortage_orders.sh)
+merges drafts that still ended up side by side, e.g. from concurrent inserts.
+Every line an order covers is kept in order_request_item, so fulfilling the
+order fulfils all of them.
+
+Draft rows are locked (FOR UPDATE SKIP LOCKED) while lines are added or
+merged, so a draft being merged away is never given new lines; a locked
+draft is skipped and the line simply starts another one. The engine works on
+a sync Session; async services call it through `AsyncSession.run_sync`.
+Merges are Core updates, which the ORM commit hooks don't see, so the
+session is marked and the "orders" cache tag dropped once it commits.
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from ..core.cache import cache
+from ..core.config import settings
+from ..models.order import Order, OrderRequestItem, OrderStatus, OrderType
+from .outbox_service import Outbox
+
+ORDER = Order.__table__
+ORDER_REQUEST_ITEM = OrderRequestItem.__table__
+
+# A consolidated order is as urgent as its most urgent line
+PRIORITY_RANK = {"low": 0, "normal": 1, "high": 2, "urgent": 3}
+
+MERGED_KEY = "orders_merged"
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def highest_priority(*priorities: Optional[str]) -> str:
+    return max((priority or "normal" for priority in priorities), key=lambda priority: PRIORITY_RANK.get(priority, 1))
+
+
+def earliest(*dates: Optional[datetime]) -> Optional[datetime]:
+    dates = [value for value in dates if value is not None]
+    return min(dates) if dates else None
+
+
+@dataclass
+class ShortageLine:
+    """A backordered warehouse request item to put on an order"""
+    warehouse_request_item_id: int
+    request_id: int
+    item_id: int
+    order_type: OrderType
+    quantity: int
+    priority: str = "normal"
+    required_date: Optional[datetime] = None
+
+
+@dataclass
+class Placement:
+    """Where shortage lines went: new draft orders, or open drafts they were added to"""
+    created: List[Order] = field(default_factory=list)
+    merged: Dict[int, List[ShortageLine]] = field(default_factory=dict)
+
+
+class ShortageOrderConsolidator:
+    """Places shortage lines on draft orders and merges duplicate drafts"""
+
+    def __init__(
+        self,
+        window: timedelta = timedelta(hours=settings.order_consolidation_window_hours),
+        clock: Callable[[], datetime] = utcnow
+    ):
+        self.window = window
+        self.clock = clock
+
+    def place(self, session: Session, lines: Sequence[ShortageLine], created_by_id: int) -> Placement:
+        """
+        Put shortage lines on orders, one order per item and order type:
+        an open draft of the window if there is one, else a new draft.
+        Flushes, so new orders have their ids; nothing is committed.
+        """
+        groups: Dict[Tuple[int, OrderType], List[ShortageLine]] = defaultdict(list)
+        for line in lines:
+            groups[(line.item_id, line.order_type)].append(line)
+
+        placement = Placement()
+        new_orders = []
+        for (item_id, order_type), group in groups.items():
+            order_id = self._add_to_open_draft(session, item_id, order_type, group)
+            if order_id is None:
+                new_orders.append((self._new_order(group, created_by_id), group))
+            else:
+                placement.merged[order_id] = group
+        placement.created = [order for order, _ in new_orders]
+
+        # One multi-row INSERT for the new orders, then one for all the lines
+        session.add_all(placement.created)
+        session.flush()
+        links = [(order.id, line) for order, group in new_orders for line in group]
+        links.extend((order_id, line) for order_id, group in placement.merged.items() for line in group)
+        if links:
+            session.execute(insert(ORDER_REQUEST_ITEM), [
+                {"order_id": order_id, "warehouse_request_item_id": line.warehouse_request_item_id, "quantity": line.quantity}
+                for order_id, line in links
+            ])
+        return placement
+
+    def _new_order(self, lines: Sequence[ShortageLine], created_by_id: int) -> Order:
+        request_ids = sorted({line.request_id for line in lines})
+        if len(request_ids) == 1:
+            remarks = f"Auto-generated due to shortage in warehouse request #{request_ids[0]}"
+        else:
+            remarks = "Auto-generated due to shortages in warehouse requests " + ", ".join(f"#{id}" for id in request_ids)
+        return Order(
+            order_type=lines[0].order_type,
+            status=OrderStatus.DRAFT,
+            priority=highest_priority(*(line.priority for line in lines)),
+            quantity=sum(line.quantity for line in lines),
+            remarks=remarks,
+            required_date=earliest(*(line.required_date for line in lines)),
+            created_by_id=created_by_id,
+            item_id=lines[0].item_id,
+            # The first line; order_request_item holds all of them
+            warehouse_request_item_id=lines[0].warehouse_request_item_id
+        )
+
+    def _add_to_open_draft(
+        self,
+        session: Session,
+        item_id: int,
+        order_type: OrderType,
+        lines: Sequence[ShortageLine]
+    ) -> Optional[int]:
+        """Add the lines to the newest open draft of the window; its id, or None if there is none"""
+        draft = session.execute(
+            select(ORDER.c.id, ORDER.c.priority, ORDER.c.required_date)
+            .where(
+                ORDER.c.item_id == item_id,
+                ORDER.c.order_type == order_type,
+                ORDER.c.status == OrderStatus.DRAFT,
+                ORDER.c.created_at >= self.clock() - self.window,
+            )
+            .order_by(ORDER.c.created_at.desc(), ORDER.c.id.desc())
+            .limit(1)
+            # A draft being merged or extended elsewhere is skipped, not waited for
+            .with_for_update(skip_locked=True)
+        ).first()
+        if draft is None:
+            return None
+
+        session.info[MERGED_KEY] = True
+        session.execute(
+            update(ORDER)
+            .where(ORDER.c.id == draft.id)
+            .values(
+                quantity=ORDER.c.quantity + sum(line.quantity for line in lines),
+                priority=highest_priority(draft.priority, *(line.priority for line in lines)),
+                required_date=earliest(draft.required_date, *(line.required_date for line in lines)),
+                version=ORDER.c.version + 1,
+                updated_at=func.now()
+            )
+        )
+        return draft.id
+
+    def consolidate(self, session: Session, user_id: Optional[int] = None) -> Dict[int, List[int]]:
+        """
+        Merge open drafts of the same item and order type created within the
+        window of the group's first draft into that one: quantities add up,
+        their lines move over and the others are cancelled. Returns the
+        merged-away order ids per surviving order; nothing is committed, and
+        the "orders" cache tag is invalidated when the session commits.
+        The merge is audited as `user_id`'s when given; the cancelled drafts'
+        remarks name the order they went into either way.
+        """
+        drafts = session.execute(
+            select(
+                ORDER.c.id,
+                ORDER.c.item_id,
+                ORDER.c.order_type,
+                ORDER.c.created_at,
+                ORDER.c.quantity,
+                ORDER.c.priority,
+                ORDER.c.required_date,
+            )
+            .where(ORDER.c.status == OrderStatus.DRAFT)
+            .order_by(ORDER.c.item_id, ORDER.c.order_type, ORDER.c.created_at, ORDER.c.id)
+            .with_for_update(skip_locked=True)
+        ).all()
+
+        merges: Dict[int, List] = {}
+        survivor = None
+        for draft in drafts:
+            if (
+                survivor is not None
+                and (draft.item_id, draft.order_type) == (survivor.item_id, survivor.order_type)
+                and draft.created_at - survivor.created_at <= self.window
+            ):
+                merges[survivor.id].append(draft)
+            else:
+                survivor = draft
+                merges[survivor.id] = []
+
+        drafts_by_id = {draft.id: draft for draft in drafts}
+        merged = {}
+        outbox = Outbox(session)
+        for survivor_id, absorbed in merges.items():
+            if not absorbed:
+                continue
+            survivor = drafts_by_id[survivor_id]
+            absorbed_ids = [draft.id for draft in absorbed]
+            group = [survivor, *absorbed]
+            session.info[MERGED_KEY] = True
+            session.execute(
+                update(ORDER)
+                .where(ORDER.c.id == survivor_id)
+                .values(
+                    quantity=sum(draft.quantity for draft in group),
+                    priority=highest_priority(*(draft.priority for draft in group)),
+                    required_date=earliest(*(draft.required_date for draft in group)),
+                    version=ORDER.c.version + 1,
+                    updated_at=func.now()
+                )
+            )
+            session.execute(
+                update(ORDER_REQUEST_ITEM)
+                .where(ORDER_REQUEST_ITEM.c.order_id.in_(absorbed_ids))
+                .values(order_id=survivor_id)
+            )
+            session.execute(
+                update(ORDER)
+                .where(ORDER.c.id.in_(absorbed_ids))
+                .values(
+                    status=OrderStatus.CANCELLED,
+                    remarks=f"Consolidated into order #{survivor_id}",
+                    version=ORDER.c.version + 1,
+                    updated_at=func.now()
+                )
+            )
+            if user_id is not None:
+                outbox.audit(
+                    user_id=user_id,
+                    action="CONSOLIDATE",
+                    resource_type="Order",
+                    resource_id=survivor_id,
+                    details={"merged_order_ids": absorbed_ids}
+                )
+            merged[survivor_id] = absorbed_ids
+        return merged
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_merged_orders(session):
+    if session.info.pop(MERGED_KEY, False):
+        cache.invalidate_tags_later("orders")
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_merged_orders(session):
+    session.info.pop(MERGED_KEY, None)
+
+
+shortage_order_consolidator = ShortageOrderConsolidator()
@@ -1,24 +1,185 @@
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from ..models.order import Order, OrderType, OrderStatus
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from ..core.cache import cache, cached, invalidate_on_commit
+from ..core.config import settings
+from ..core.pagination import Keyset
+from ..db.unit_of_work import UnitOfWork
+from ..models.order import Order, OrderRequestItem, OrderType, OrderStatus
 from ..models.item import Item
 from ..models.warehouse_request import WarehouseRequestItem
-from ..models.task import Task, TaskType, TaskStatus
-from ..schemas.order import OrderCreate
-from ..services.notification_service import NotificationService
-from ..services.audit_service import AuditService
+from ..models.task import Task, TaskStatus
+from ..schemas.order import OrderCreate, OrderSort, OrderStatusChange
+from ..services.live_update_service import record_order_moved
+from ..services.order_consolidation_service import Placement, ShortageLine, shortage_order_consolidator
+from ..services.order_state_machine import (
+    InvalidTransition,
+    OrderConflict,
+    OrderTransition,
+    compare_and_swap_status,
+    order_state_machine,
+)
+from ..services.outbox_service import Outbox
 from ..services.user_role_service import UserRoleService
 
+ORDER = Order.__table__
+ORDER_REQUEST_ITEM = OrderRequestItem.__table__
+
+# Order changes committed through the ORM drop cached order facets
+invalidate_on_commit(["orders"], Order)
+
+# Keyset per list sort; orders without a required date come last
+ORDER_KEYSETS = {
+    OrderSort.NEWEST: Keyset("orders", (ORDER.c.created_at, True), (ORDER.c.id, True)),
+    OrderSort.OLDEST: Keyset("orders-oldest", (ORDER.c.created_at, False), (ORDER.c.id, False)),
+    OrderSort.DUE: Keyset(
+        "orders-due", (ORDER.c.required_date, False), (ORDER.c.id, False), nullable=[ORDER.c.required_date]
+    ),
+}
+
+FACETS = ("order_type", "status", "priority")
+
+async def invalidate_order_caches() -> None:
+    """Status changes made with Core statements bypass the ORM commit hooks"""
+    await cache.invalidate_tags("dashboard", "orders")
+
+def stage_placement_events(db: Session, placement: Placement, created_by_id: int) -> None:
+    """
+    Stage the outbox messages of placed shortage lines: an audit log per line
+    added to an open draft (nobody is notified of a bigger draft), and per new
+    order an audit log and a notification to the team that handles it
+    """
+    outbox = Outbox(db)
+    for order_id, lines in placement.merged.items():
+        for line in lines:
+            outbox.audit(
+                user_id=created_by_id,
+                action="UPDATE",
+                resource_type="Order",
+                resource_id=order_id,
+                details={
+                    "consolidated": {
+                        "warehouse_request_item_id": line.warehouse_request_item_id,
+                        "quantity": line.quantity
+                    }
+                }
+            )
+
+    for order in placement.created:
+        outbox.audit(
+            user_id=created_by_id,
+            action="CREATE",
+            resource_type="Order",
+            resource_id=order.id,
+            details={
+                "type": order.order_type,
+                "item_id": order.item_id,
+                "quantity": order.quantity,
+                "warehouse_request_item_id": order.warehouse_request_item_id
+            }
+        )
+        if order.order_type == OrderType.PROCUREMENT:
+            recipient = UserRoleService(db).get_procurement_team_lead()
+        else:  # PRODUCTION
+            recipient = UserRoleService(db).get_production_planner()
+        if recipient:
+            outbox.notify(
+                user_id=recipient.id,
+                message=f"New {order.order_type.value} order #{order.id} created for {order.quantity} units of item #{order.item_id}",
+                type="ORDER",
+                link=f"/orders/{order.id}"
+            )
+
+def order_filters(
+    order_type: Optional[OrderType] = None,
+    status: Union[OrderStatus, Sequence[OrderStatus], None] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    item_id: Optional[int] = None,
+    priority: Optional[str] = None,
+    vendor_name: Optional[str] = None,
+    required_from: Optional[datetime] = None,
+    required_to: Optional[datetime] = None
+) -> list:
+    """
+    WHERE clauses of an order listing by type, status (one or several),
+    creation date, item, priority, vendor and required date
+    """
+    filters = []
+    if order_type:
+        filters.append(ORDER.c.order_type == order_type)
+    if status:
+        statuses = [status] if isinstance(status, OrderStatus) else list(status)
+        filters.append(ORDER.c.status.in_(statuses))
+    if start_date:
+        filters.append(ORDER.c.created_at >= start_date)
+    if end_date:
+        filters.append(ORDER.c.created_at <= end_date)
+    if item_id:
+        filters.append(ORDER.c.item_id == item_id)
+    if priority:
+        filters.append(ORDER.c.priority == priority)
+    if vendor_name:
+        filters.append(ORDER.c.vendor_name == vendor_name)
+    if required_from:
+        filters.append(ORDER.c.required_date >= required_from)
+    if required_to:
+        filters.append(ORDER.c.required_date <= required_to)
+    return filters
+
+def build_order_facets(
+    rows: Iterable[Tuple],
+    order_type: Optional[OrderType] = None,
+    status: Optional[Sequence[OrderStatus]] = None,
+    priority: Optional[str] = None
+) -> Dict:
+    """
+    Fold (order_type, status, priority, count) rows into counts per facet
+    value. Each facet ignores its own filter but applies the others, so a
+    count is how many orders choosing that value would list.
+    """
+    selected = {
+        "order_type": {order_type.value} if order_type else None,
+        "status": {value.value for value in status} if status else None,
+        "priority": {priority} if priority else None,
+    }
+    facets = {
+        "order_type": {value.value: 0 for value in OrderType},
+        "status": {value.value: 0 for value in OrderStatus},
+        "priority": {},
+    }
+    total = 0
+    for row_type, row_status, row_priority, count in rows:
+        values = {
+            "order_type": row_type.value if row_type else None,
+            "status": row_status.value if row_status else None,
+            "priority": row_priority,
+        }
+        matches = {name: selected[name] is None or values[name] in selected[name] for name in FACETS}
+        if all(matches.values()):
+            total += count
+        for name in FACETS:
+            if values[name] is not None and all(matches[other] for other in FACETS if other != name):
+                facets[name][values[name]] = facets[name].get(values[name], 0) + count
+    return {"total": total, **facets}
+
 class OrderService:
-    def __init__(self, db: Session):
+    """
+    Order workflows. Each operation is one unit of work: the order changes
+    are committed together with outbox messages for their audit logs and
+    notifications, which the outbox dispatcher carries out afterwards. Pass
+    a shared `uow` to make an operation part of a larger one.
+    """
+
+    def __init__(self, db: AsyncSession, uow: Optional[UnitOfWork] = None):
         self.db = db
-        self.notification_service = NotificationService(db)
-        self.audit_service = AuditService(db)
-        self.user_role_service = UserRoleService(db)
-        self.audit_service = AuditService(db)
+        self.uow = uow or UnitOfWork(db)
+        self.outbox = Outbox(db)
 
-    def create_shortage_order(
+    async def create_shortage_order(
         self,
         item_id: int,
         warehouse_request_item_id: int,
@@ -27,186 +188,242 @@ class OrderService:
         priority: str = "normal"
     ) -> Order:
         """
-        Create a new order for a shortage item.
-        Automatically determines if it should be a procurement or production order.
+        Put a shortage item on an order: added to the item's open draft order
+        when there is a recent one, else a new order. Automatically determines
+        if it should be a procurement or production order.
         """
-        # Get the item details to determine order type
-        item = self.db.query(Item).filter(Item.id == item_id).first()
-        if not item:
-            raise ValueError("Item not found")
-
-        # Get the request item for context
-        request_item = self.db.query(WarehouseRequestItem).filter(
-            WarehouseRequestItem.id == warehouse_request_item_id
-        ).first()
-        if not request_item:
-            raise ValueError("Warehouse request item not found")
-
-        # Determine order type based on item category
-        # You might want to add more sophisticated logic here
-        order_type = (
-            OrderType.PRODUCTION
-            if item.category.name.lower() in ["manufactured", "production", "internal"]
-            else OrderType.PROCUREMENT
-        )
+        async with self.uow:
+            # Get the item details to determine order type
+            result = await self.db.execute(
+                select(Item).options(selectinload(Item.category)).where(Item.id == item_id)
+            )
+            item = result.scalars().first()
+            if not item:
+                raise ValueError("Item not found")
 
-        # Create the order
-        order = Order(
-            order_type=order_type,
-            status=OrderStatus.DRAFT,
-            priority=priority,
-            quantity=quantity,
-            remarks=f"Auto-generated due to shortage in warehouse request #{request_item.request_id}",
-            required_date=datetime.now() + timedelta(days=7),  # Default to 7 days
-            created_by_id=created_by_id,
-            item_id=item_id,
-            warehouse_request_item_id=warehouse_request_item_id
-        )
+            # Get the request item for context
+            result = await self.db.execute(
+                select(WarehouseRequestItem).where(
+                    WarehouseRequestItem.id == warehouse_request_item_id
+                )
+            )
+            request_item = result.scalars().first()
+            if not request_item:
+                raise ValueError("Warehouse request item not found")
 
-        self.db.add(order)
-        self.db.commit()
-        self.db.refresh(order)
+            # Determine order type based on item category
+            # You might want to add more sophisticated logic here
+            order_type = (
+                OrderType.PRODUCTION
+                if item.category.name.lower() in ["manufactured", "production", "internal"]
+                else OrderType.PROCUREMENT
+            )
 
-        # Log the creation
-        self.audit_service.create_log(
-            user_id=created_by_id,
-            action="CREATE",
-            target_entity="Order",
-            target_id=str(order.id),
-            details={
-                "type": order_type,
-                "item_id": item_id,
-                "quantity": quantity,
-                "warehouse_request_item_id": warehouse_request_item_id
-            }
-        )
+            # Add the shortage to an open draft of the item, or start one
+            # (the consolidator is sync, so it runs on this session's connection)
+            line = ShortageLine(
+                warehouse_request_item_id=warehouse_request_item_id,
+                request_id=request_item.request_id,
+                item_id=item_id,
+                order_type=order_type,
+                quantity=quantity,
+                priority=priority,
+                required_date=datetime.now() + timedelta(days=7)  # Default to 7 days
+            )
+            placement = await self.db.run_sync(
+                lambda session: shortage_order_consolidator.place(session, [line], created_by_id)
+            )
 
-        # Notify based on order type
-        if order_type == OrderType.PROCUREMENT:
-            # Notify procurement team
-            procurement_lead = self.user_role_service.get_procurement_team_lead()
-            if procurement_lead:
-                self.notification_service.create_notification(
-                    user_id=procurement_lead.id,
-                    message=f"New procurement order #{order.id} created for {quantity} units of item #{item_id}",
-                    type="ORDER",
-                    link=f"/orders/{order.id}"
-                )
-        else:  # PRODUCTION
-            # Notify production planning
-            production_planner = self.user_role_service.get_production_planner()
-            if production_planner:
-                self.notification_service.create_notification(
-                    user_id=production_planner.id,
-                    message=f"New production order #{order.id} created for {quantity} units of item #{item_id}",
-                    type="ORDER",
-                    link=f"/orders/{order.id}"
-                )
+            # Audit logs and the new order's notification, as for any other shortage
+            await self.db.run_sync(
+                lambda session: stage_placement_events(session, placement, created_by_id)
+            )
+            if placement.merged:
+                order = await self.db.get(Order, next(iter(placement.merged)), populate_existing=True)
+            else:
+                order = placement.created[0]
 
+        await self.db.refresh(order)
         return order
 
-    def update_order_status(
+    async def update_order_status(
         self,
         order_id: int,
         status: str,
         user_id: int,
-        remarks: str = None
+        remarks: str = None,
+        expected_version: Optional[int] = None
     ) -> Order:
         """
-        Update an order's status and optionally add remarks.
-        Also updates the related warehouse request item if needed.
+        Move an order to a new status and optionally add remarks.
+        Raises InvalidTransition if the current status doesn't allow it and
+        OrderConflict if the order isn't at `expected_version` (when given)
+        or changes concurrently.
         """
-        order = self.db.query(Order).filter(Order.id == order_id).first()
-        if not order:
+        change = OrderStatusChange(
+            order_id=order_id, status=OrderStatus(status), version=expected_version, remarks=remarks
+        )
+        async with self.uow:
+            await self.apply_status_change(change, user_id)
+
+        await invalidate_order_caches()
+        return await self.db.get(Order, order_id, populate_existing=True)
+
+    async def apply_status_change(self, change: OrderStatusChange, user_id: int) -> OrderTransition:
+        """
+        Validate and compare-and-swap one status change within the caller's
+        unit of work, running its hooks. Raises ValueError if the order
+        doesn't exist, InvalidTransition or OrderConflict; the caller
+        invalidates the order caches once it has committed.
+        """
+        orders = await self._load_states([change.order_id])
+        if change.order_id not in orders:
             raise ValueError("Order not found")
+        return await self._apply(orders, change, user_id)
+
+    async def transition_orders(self, changes: Sequence[OrderStatusChange], user_id: int) -> List[Dict]:
+        """
+        Apply several status changes in one transaction. Each order succeeds
+        or fails on its own; the result per change is "applied" (with the new
+        version), "not_found", "invalid_transition" or "conflict" (with the
+        current status and version to retry from).
+        """
+        results = []
+        async with self.uow:
+            orders = await self._load_states({change.order_id for change in changes})
+            for change in changes:
+                result = {"order_id": change.order_id}
+                if change.order_id not in orders:
+                    result.update(outcome="not_found", detail="Order not found")
+                    results.append(result)
+                    continue
+                try:
+                    transition = await self._apply(orders, change, user_id)
+                    result.update(outcome="applied", status=transition.new_status, version=transition.version)
+                except (InvalidTransition, OrderConflict) as exc:
+                    current = orders[change.order_id]
+                    result.update(
+                        outcome="invalid_transition" if isinstance(exc, InvalidTransition) else "conflict",
+                        status=current["status"],
+                        version=current["version"],
+                        detail=str(exc)
+                    )
+                results.append(result)
+
+        if any(result["outcome"] == "applied" for result in results):
+            await invalidate_order_caches()
+        return results
 
-        old_status = order.status
-        order.status = status
-        if remarks:
-            order.remarks = remarks
+    async def _load_states(self, order_ids: Iterable[int]) -> Dict[int, Dict]:
+        """Current state of the orders, by id, read in one query"""
+        result = await self.db.execute(
+            select(
+                ORDER.c.id,
+                ORDER.c.order_type,
+                ORDER.c.status,
+                ORDER.c.version,
+                ORDER.c.created_by_id,
+                ORDER.c.quantity,
+                ORDER.c.warehouse_request_item_id,
+            ).where(ORDER.c.id.in_(list(order_ids)))
+        )
+        return {row["id"]: dict(row) for row in result.mappings()}
 
-        # If order is completed, update the warehouse request item
-        if status == OrderStatus.COMPLETED and order.warehouse_request_item_id:
-            request_item = self.db.query(WarehouseRequestItem).filter(
-                WarehouseRequestItem.id == order.warehouse_request_item_id
-            ).first()
-            if request_item:
-                request_item.status = "ready"
-                request_item.quantity_fulfilled = order.quantity
-                request_item.remarks = f"Fulfilled via {order.order_type} order #{order.id}"
+    async def _apply(self, orders: Dict[int, Dict], change: OrderStatusChange, user_id: int) -> OrderTransition:
+        """Validate and compare-and-swap one change, then run its hooks"""
+        current = orders[change.order_id]
+        expected_version = current["version"] if change.version is None else change.version
+        if expected_version != current["version"]:
+            raise OrderConflict(change.order_id, expected_version, current["version"])
+        order_state_machine.check(current["status"], change.status)
 
-        self.db.commit()
-        self.db.refresh(order)
+        if not await compare_and_swap_status(self.db, change.order_id, expected_version, change.status, change.remarks):
+            # Changed by another transaction since it was read
+            current.update((await self._load_states([change.order_id])).get(change.order_id, {}))
+            raise OrderConflict(change.order_id, expected_version, current["version"])
+
+        transition = OrderTransition(
+            order_id=change.order_id,
+            order_type=current["order_type"],
+            old_status=current["status"],
+            new_status=change.status,
+            version=expected_version + 1,
+            user_id=user_id,
+            created_by_id=current["created_by_id"],
+            quantity=current["quantity"],
+            warehouse_request_item_id=current["warehouse_request_item_id"],
+            remarks=change.remarks
+        )
+        # A later change of the same order in this batch starts from here
+        current.update(status=transition.new_status, version=transition.version)
+
+        # Core updates aren't seen by the ORM flush hooks, so report the move to live updates
+        record_order_moved(self.db.sync_session, transition.order_type, transition.old_status, transition.new_status)
 
         # Log the status change
-        self.audit_service.create_log(
+        self.outbox.audit(
             user_id=user_id,
             action="UPDATE",
-            target_entity="Order",
-            target_id=str(order_id),
+            resource_type="Order",
+            resource_id=change.order_id,
             details={
                 "status_change": {
-                    "from": old_status,
-                    "to": status
+                    "from": transition.old_status,
+                    "to": transition.new_status
                 },
-                "remarks": remarks
+                "version": transition.version,
+                "remarks": change.remarks
             }
         )
-
-        # Send notifications based on the new status
-        if status == OrderStatus.COMPLETED:
-            # Notify the creator
-            self.notification_service.create_notification(
-                user_id=order.created_by_id,
-                message=f"Order #{order.id} has been completed",
-                type="ORDER",
-                link=f"/orders/{order.id}"
-            )
-
-            # If this was for a warehouse request, notify the requestor
-            if order.warehouse_request_item_id and request_item:
-                self.notification_service.create_notification(
-                    user_id=request_item.request.created_by_id,
-                    message=f"Your warehouse request #{request_item.request_id} has been fulfilled",
-                    type="WAREHOUSE_REQUEST",
-                    link=f"/warehouse-requests/{request_item.request_id}"
-                )
-
-        elif status == OrderStatus.CANCELLED:
-            # Notify relevant parties about cancellation
-            stakeholders = [order.created_by_id]
-            if order.assigned_to_id:
-                stakeholders.append(order.assigned_to_id)
-            
-            for user_id in stakeholders:
-                self.notification_service.create_notification(
-                    user_id=user_id,
-                    message=f"Order #{order.id} has been cancelled",
-                    type="ORDER",
-                    link=f"/orders/{order.id}"
-                )
-
-        return order
+        await order_state_machine.run_hooks(self.db, transition)
+        return transition
 
     @staticmethod
-    def get_related_orders(
-        db: Session,
+    async def get_related_orders(
+        db: AsyncSession,
         warehouse_request_item_id: int
     ) -> list[Order]:
-        """Get all orders related to a specific warehouse request item."""
-        return db.query(Order).filter(
-            Order.warehouse_request_item_id == warehouse_request_item_id
-        ).all()
+        """Get all orders covering a specific warehouse request item."""
+        result = await db.execute(
+            select(Order)
+            .join(ORDER_REQUEST_ITEM, ORDER_REQUEST_ITEM.c.order_id == Order.id)
+            .where(ORDER_REQUEST_ITEM.c.warehouse_request_item_id == warehouse_request_item_id)
+            .distinct()
+        )
+        return list(result.scalars().all())
     
-    @staticmethod
-    def get_procurement_orders(db: Session) -> list[Order]:
-        """Get all active procurement orders."""
-        return db.query(Order).filter(
-            Order.order_type == OrderType.PROCUREMENT,
-            Order.status.in_([OrderStatus.DRAFT, OrderStatus.SUBMITTED])
-        ).all()
-
-    def mark_order_purchased(
+    async def list_orders(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort: OrderSort = OrderSort.NEWEST,
+        **filters
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """A page of orders matching `filters` (see order_filters), with the cursor of the next page"""
+        keyset = ORDER_KEYSETS[sort]
+        result = await self.db.execute(
+            keyset.apply(select(ORDER).where(*order_filters(**filters)), cursor, limit)
+        )
+        rows, next_cursor = keyset.page(result.all(), limit)
+        return [dict(row._mapping) for row in rows], next_cursor
+
+    @cached(prefix="orders:facets", ttl=settings.order_facets_cache_ttl_seconds, tags=["orders"])
+    async def order_facets(
+        self,
+        order_type: Optional[OrderType] = None,
+        status: Optional[Sequence[OrderStatus]] = None,
+        priority: Optional[str] = None,
+        **filters
+    ) -> Dict:
+        """Order counts per type, status and priority, in one GROUP BY; see build_order_facets"""
+        result = await self.db.execute(
+            select(ORDER.c.order_type, ORDER.c.status, ORDER.c.priority, func.count())
+            .where(*order_filters(**filters))
+            .group_by(ORDER.c.order_type, ORDER.c.status, ORDER.c.priority)
+        )
+        return build_order_facets(result.all(), order_type, status, priority)
+
+    async def mark_order_purchased(
         self,
         order_id: int,
         vendor_name: str,
@@ -215,57 +432,122 @@ class OrderService:
     ) -> Order:
         """
         Mark a procurement order as purchased and create a receiving task.
+        Raises InvalidTransition if the order can't be started, and
+        OrderConflict if it changes concurrently.
         """
-        order = self.db.query(Order).filter(Order.id == order_id).first()
-        if not order:
-            raise ValueError("Order not found")
-        
-        if order.order_type != OrderType.PROCUREMENT:
-            raise ValueError("Only procurement orders can be marked as purchased")
-        
-        # Update order with purchase details
-        order.vendor_name = vendor_name
-        order.price = int(price * 100)  # Convert to cents
-        order.status = OrderStatus.IN_PROGRESS
-        
-        # Create a receiving task for the warehouse
-        task = Task(
-            type=TaskType.RECEIVING,
-            status=TaskStatus.PENDING,
-            title=f"Receive order #{order.id} from {vendor_name}",
-            description=f"Receive {order.quantity} units of item #{order.item_id}",
-            assigned_to_id=None,  # Will be assigned by warehouse manager
-            created_by_id=user_id,
-            order_id=order.id
-        )
-        
-        self.db.add(task)
-        
-        # Log the purchase
-        self.audit_service.create_log(
-            user_id=user_id,
-            action="PURCHASE",
-            target_entity="Order",
-            target_id=str(order_id),
-            details={
-                "vendor": vendor_name,
-                "price": price,
-                "quantity": order.quantity,
-                "item_id": order.item_id
-            }
-        )
-        
-        # Notify warehouse team about incoming delivery
-        warehouse_manager = self.user_role_service.get_warehouse_manager()
-        if warehouse_manager:
-            self.notification_service.create_notification(
-                user_id=warehouse_manager.id,
-                message=f"New delivery expected: Order #{order.id} from {vendor_name}",
-                type="RECEIVING",
-                link=f"/tasks/{task.id}"
-            )
-        
-        self.db.commit()
-        self.db.refresh(order)
-        
+        expected_version = None
+        try:
+            async with self.uow:
+                order = await self.db.get(Order, order_id)
+                if not order:
+                    raise ValueError("Order not found")
+
+                if order.order_type != OrderType.PROCUREMENT:
+                    raise ValueError("Only procurement orders can be marked as purchased")
+
+                order_state_machine.check(order.status, OrderStatus.IN_PROGRESS)
+                expected_version = order.version
+
+                # Update order with purchase details
+                order.vendor_name = vendor_name
+                order.price = int(price * 100)  # Convert to cents
+                order.status = OrderStatus.IN_PROGRESS
+
+                # Create a receiving task for the warehouse
+                task = Task(
+                    status=TaskStatus.NEW,
+                    title=f"Receive order #{order.id} from {vendor_name}",
+                    description=f"Receive {order.quantity} units of item #{order.item_id}",
+                    assignee_id=None,  # Will be assigned by warehouse manager
+                    creator_id=user_id,
+                    order_id=order.id
+                )
+
+                self.db.add(task)
+                # Assigns task.id for the notification link, without committing
+                await self.db.flush()
+
+                # Log the purchase
+                self.outbox.audit(
+                    user_id=user_id,
+                    action="PURCHASE",
+                    resource_type="Order",
+                    resource_id=order_id,
+                    details={
+                        "vendor": vendor_name,
+                        "price": price,
+                        "quantity": order.quantity,
+                        "item_id": order.item_id
+                    }
+                )
+
+                # Notify warehouse team about incoming delivery
+                warehouse_manager = await self.db.run_sync(
+                    lambda session: UserRoleService(session).get_warehouse_manager()
+                )
+                if warehouse_manager:
+                    self.outbox.notify(
+                        user_id=warehouse_manager.id,
+                        message=f"New delivery expected: Order #{order.id} from {vendor_name}",
+                        type="RECEIVING",
+                        link=f"/tasks/{task.id}"
+                    )
+        except StaleDataError:
+            # The version check on flush found the order changed since it was loaded
+            raise OrderConflict(order_id, expected_version)
+
+        await self.db.refresh(order)
         return order
+
+
+@order_state_machine.on_enter(OrderStatus.COMPLETED)
+async def fulfil_request_item(db: AsyncSession, transition: OrderTransition) -> None:
+    """Mark the warehouse request items the order was for as ready and notify"""
+    outbox = Outbox(db)
+    # Notify the creator
+    outbox.notify(
+        user_id=transition.created_by_id,
+        message=f"Order #{transition.order_id} has been completed",
+        type="ORDER",
+        link=f"/orders/{transition.order_id}"
+    )
+
+    # Every line the order covers; consolidated orders cover several
+    result = await db.execute(
+        select(WarehouseRequestItem, ORDER_REQUEST_ITEM.c.quantity)
+        .join(ORDER_REQUEST_ITEM, ORDER_REQUEST_ITEM.c.warehouse_request_item_id == WarehouseRequestItem.id)
+        .options(selectinload(WarehouseRequestItem.request))
+        .where(ORDER_REQUEST_ITEM.c.order_id == transition.order_id)
+    )
+    fulfilled: Dict[int, int] = {}
+    request_items = {}
+    for request_item, quantity in result.all():
+        fulfilled[request_item.id] = fulfilled.get(request_item.id, 0) + quantity
+        request_items[request_item.id] = request_item
+
+    notified = set()
+    for request_item in request_items.values():
+        request_item.status = "ready"
+        request_item.quantity_fulfilled = fulfilled[request_item.id]
+        request_item.remarks = f"Fulfilled via {transition.order_type.value} order #{transition.order_id}"
+
+        # Notify each requestor once
+        if request_item.request_id in notified:
+            continue
+        notified.add(request_item.request_id)
+        outbox.notify(
+            user_id=request_item.request.created_by_id,
+            message=f"Your warehouse request #{request_item.request_id} has been fulfilled",
+            type="WAREHOUSE_REQUEST",
+            link=f"/warehouse-requests/{request_item.request_id}"
+        )
+
+
+@order_state_machine.on_enter(OrderStatus.CANCELLED)
+async def notify_cancellation(db: AsyncSession, transition: OrderTransition) -> None:
+    Outbox(db).notify(
+        user_id=transition.created_by_id,
+        message=f"Order #{transition.order_id} has been cancelled",
+        type="ORDER",
+        link=f"/orders/{transition.order_id}"
+    )
@@ -0,0 +1,120 @@
+"""
+Order status state machine with optimistic concurrency control.
+
+Allowed status changes are declared in ORDER_TRANSITIONS; hooks registered
+with `on_enter` run in the same transaction after an order enters a status.
+
+Every order carries a `version`, bumped by each change. A transition is a
+compare-and-swap: UPDATE ... WHERE id = :id AND version = :expected, which
+matches nothing if someone else changed the order since it was read. The
+caller gets a conflict to retry from the current state instead of a lost
+update, and no row stays locked while a user looks at it.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, FrozenSet, List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from ..models.order import Order, OrderStatus, OrderType
+
+ORDER = Order.__table__
+
+ORDER_TRANSITIONS: Dict[OrderStatus, FrozenSet[OrderStatus]] = {
+    # Shortage orders are drafts, started directly when bought or put into production
+    OrderStatus.DRAFT: frozenset({OrderStatus.SUBMITTED, OrderStatus.IN_PROGRESS, OrderStatus.CANCELLED}),
+    OrderStatus.SUBMITTED: frozenset({OrderStatus.DRAFT, OrderStatus.IN_PROGRESS, OrderStatus.CANCELLED}),
+    OrderStatus.IN_PROGRESS: frozenset({OrderStatus.COMPLETED, OrderStatus.CANCELLED}),
+    OrderStatus.COMPLETED: frozenset(),
+    OrderStatus.CANCELLED: frozenset(),
+}
+
+
+class InvalidTransition(Exception):
+    """The order's current status doesn't allow the requested one"""
+
+    def __init__(self, old_status: OrderStatus, new_status: OrderStatus):
+        self.old_status = old_status
+        self.new_status = new_status
+        super().__init__(f"Cannot change an order from {old_status.value} to {new_status.value}")
+
+
+class OrderConflict(Exception):
+    """The order was changed by someone else since the given version"""
+
+    def __init__(self, order_id: int, expected_version: int, current_version: Optional[int] = None):
+        self.order_id = order_id
+        self.expected_version = expected_version
+        self.current_version = current_version
+        super().__init__(
+            f"Order #{order_id} was changed by someone else (version {current_version or 'newer'}, "
+            f"expected {expected_version}); reload it and retry"
+        )
+
+
+@dataclass
+class OrderTransition:
+    """An applied status change, as passed to hooks"""
+    order_id: int
+    order_type: OrderType
+    old_status: OrderStatus
+    new_status: OrderStatus
+    version: int  # after the change
+    user_id: int
+    created_by_id: int
+    quantity: int
+    warehouse_request_item_id: Optional[int] = None
+    remarks: Optional[str] = None
+
+
+Hook = Callable[[AsyncSession, OrderTransition], Awaitable[None]]
+
+
+class OrderStateMachine:
+    """Allowed transitions and on-enter hooks of order statuses"""
+
+    def __init__(self, transitions: Dict[OrderStatus, FrozenSet[OrderStatus]]):
+        self.transitions = transitions
+        self._hooks: Dict[OrderStatus, List[Hook]] = defaultdict(list)
+
+    def allowed(self, status: OrderStatus) -> FrozenSet[OrderStatus]:
+        return self.transitions.get(status, frozenset())
+
+    def check(self, old_status: OrderStatus, new_status: OrderStatus) -> None:
+        if new_status not in self.allowed(old_status):
+            raise InvalidTransition(old_status, new_status)
+
+    def on_enter(self, status: OrderStatus):
+        """Register a hook run after an order enters `status`"""
+        def register(hook: Hook) -> Hook:
+            self._hooks[status].append(hook)
+            return hook
+        return register
+
+    async def run_hooks(self, db: AsyncSession, transition: OrderTransition) -> None:
+        for hook in self._hooks[transition.new_status]:
+            await hook(db, transition)
+
+
+async def compare_and_swap_status(
+    db: AsyncSession,
+    order_id: int,
+    expected_version: int,
+    new_status: OrderStatus,
+    remarks: Optional[str] = None
+) -> bool:
+    """Set the status if the order is still at `expected_version`; False if it isn't"""
+    values = {"status": new_status, "version": expected_version + 1, "updated_at": func.now()}
+    if remarks:
+        values["remarks"] = remarks
+    result = await db.execute(
+        update(ORDER)
+        .where(ORDER.c.id == order_id, ORDER.c.version == expected_version)
+        .values(**values)
+    )
+    return result.rowcount == 1
+
+
+order_state_machine = OrderStateMachine(ORDER_TRANSITIONS)
@@ -0,0 +1,212 @@
+"""
+Transactional outbox.
+
+Workflow services don't send notifications or write audit logs on the request
+path. They stage an outbox message on their session instead, so it commits
+(or rolls back) atomically with the business change. The OutboxDispatcher
+drains the outbox afterwards: it claims a batch of due messages with
+SELECT ... FOR UPDATE SKIP LOCKED, so any number of dispatchers (API workers
+or scripts/run_outbox_dispatcher.sh processes) can run side by side without
+claiming the same message twice.
+
+Each message runs its topic's handler in a savepoint. A failed message is
+retried with exponential backoff and dead-lettered (status "dead", kept with
+its last error) after `outbox_max_attempts` attempts. Delivery is at least
+once: a dispatcher that dies mid-batch leaves its messages to be claimed again.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..db.session import AsyncSessionLocal
+from ..models.outbox import OutboxMessage, OutboxStatus
+from .audit_service import AuditService
+from .notification_service import NotificationService
+
+logger = logging.getLogger(__name__)
+
+OUTBOX = OutboxMessage.__table__
+
+# Longest handler error kept on a message
+MAX_ERROR_LENGTH = 2000
+
+Handler = Callable[[AsyncSession, Dict[str, Any]], Awaitable[None]]
+
+OUTBOX_HANDLERS: Dict[str, Handler] = {}
+
+
+def outbox_handler(topic: str):
+    """Register the coroutine carrying out messages of a topic"""
+    def register(handler: Handler) -> Handler:
+        OUTBOX_HANDLERS[topic] = handler
+        return handler
+    return register
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class Outbox:
+    """Stages outbox messages on a session, sync or async; they commit with it"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def stage(self, topic: str, payload: Dict[str, Any]) -> OutboxMessage:
+        message = OutboxMessage(
+            topic=topic,
+            payload=jsonable_encoder(payload),
+            status=OutboxStatus.PENDING.value,
+            attempts=0
+        )
+        self.db.add(message)
+        return message
+
+    def notify(
+        self,
+        user_id: int,
+        message: str,
+        type: str = "INFO",
+        title: Optional[str] = None,
+        link: Optional[str] = None
+    ) -> OutboxMessage:
+        """Send a notification once the transaction commits"""
+        return self.stage("notification", {
+            "user_id": user_id, "message": message, "type": type, "title": title, "link": link
+        })
+
+    def audit(
+        self,
+        user_id: int,
+        action: str,
+        resource_type: str,
+        resource_id: Optional[int] = None,
+        details: Optional[Dict[str, Any]] = None
+    ) -> OutboxMessage:
+        """Write an audit log once the transaction commits"""
+        return self.stage("audit", {
+            "user_id": user_id,
+            "action": action,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "details": details,
+        })
+
+
+@outbox_handler("notification")
+async def send_notification(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    NotificationService(db).stage_notification(**payload)
+
+
+@outbox_handler("audit")
+async def write_audit_log(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    AuditService(db).stage_log(**payload)
+
+
+class OutboxDispatcher:
+    """Claims due outbox messages in batches and runs their handlers"""
+
+    def __init__(
+        self,
+        session_factory: Callable = AsyncSessionLocal,
+        handlers: Optional[Dict[str, Handler]] = None,
+        batch_size: int = settings.outbox_batch_size,
+        poll_seconds: float = settings.outbox_poll_seconds,
+        max_attempts: int = settings.outbox_max_attempts,
+        retry_base_seconds: float = settings.outbox_retry_base_seconds,
+        retry_max_seconds: float = settings.outbox_retry_max_seconds,
+        clock: Callable[[], datetime] = utcnow
+    ):
+        self.session_factory = session_factory
+        self.handlers = OUTBOX_HANDLERS if handlers is None else handlers
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.clock = clock
+        self._task: Optional[asyncio.Task] = None
+
+    def retry_delay(self, attempts: int) -> timedelta:
+        """Backoff after the given number of failed attempts"""
+        seconds = self.retry_base_seconds * 2 ** (attempts - 1)
+        return timedelta(seconds=min(seconds, self.retry_max_seconds))
+
+    async def _carry_out(self, db: AsyncSession, message, now: datetime) -> Dict[str, Any]:
+        """Run one message's handler; the column values recording the outcome"""
+        attempts = message.attempts + 1
+        try:
+            handler = self.handlers.get(message.topic)
+            if handler is None:
+                raise LookupError(f"No outbox handler for topic '{message.topic}'")
+            # A failing handler only rolls back its own writes, not the batch
+            async with db.begin_nested():
+                await handler(db, message.payload)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"[:MAX_ERROR_LENGTH]
+            if attempts >= self.max_attempts:
+                logger.error("Outbox message %s (%s) dead-lettered after %d attempts: %s",
+                             message.id, message.topic, attempts, error)
+                return {"status": OutboxStatus.DEAD.value, "attempts": attempts,
+                        "last_error": error, "processed_at": now}
+            logger.warning("Outbox message %s (%s) failed, attempt %d: %s",
+                           message.id, message.topic, attempts, error)
+            return {"attempts": attempts, "last_error": error,
+                    "available_at": now + self.retry_delay(attempts)}
+        return {"status": OutboxStatus.DONE.value, "attempts": attempts,
+                "last_error": None, "processed_at": now}
+
+    async def dispatch_batch(self) -> int:
+        """Carry out one batch of due messages in one transaction; the number claimed"""
+        now = self.clock()
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(OUTBOX.c.id, OUTBOX.c.topic, OUTBOX.c.payload, OUTBOX.c.attempts)
+                .where(OUTBOX.c.status == OutboxStatus.PENDING.value, OUTBOX.c.available_at <= now)
+                .order_by(OUTBOX.c.id)
+                .limit(self.batch_size)
+                # Rows claimed by another dispatcher are skipped, not waited for
+                .with_for_update(skip_locked=True)
+            )
+            messages = result.all()
+            for message in messages:
+                outcome = await self._carry_out(db, message, now)
+                await db.execute(update(OUTBOX).where(OUTBOX.c.id == message.id).values(**outcome))
+            await db.commit()
+        return len(messages)
+
+    async def run(self) -> None:
+        """Dispatch until cancelled; back-to-back while batches come back full"""
+        while True:
+            try:
+                claimed = await self.dispatch_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Outbox dispatch failed, retrying: %s", exc)
+                claimed = 0
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_seconds)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+outbox_dispatcher = OutboxDispatcher()
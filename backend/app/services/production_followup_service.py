@@ -1,10 +1,12 @@
 from datetime import datetime
 from enum import Enum
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..models.route_card import RouteCard, RouteStatus
 from ..models.task import Task, TaskStatus, TaskType
-from ..services.notification_service import NotificationService
+from ..services.outbox_service import Outbox
 from ..services.user_role_service import UserRoleService
 
 class FollowUpStatus(str, Enum):
@@ -13,10 +15,9 @@ class FollowUpStatus(str, Enum):
     READY_FOR_PICKUP = "ready_for_pickup"
 
 class ProductionFollowUpService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
-        self.notification_service = NotificationService(db)
-        self.user_role_service = UserRoleService(db)
+        self.outbox = Outbox(db)
 
     async def log_followup(
         self,
@@ -27,7 +28,16 @@ class ProductionFollowUpService:
         user_id: int = None
     ):
         # Get the task and associated route card
-        task = self.db.query(Task).filter(Task.id == task_id).first()
+        result = await self.db.execute(
+            select(Task)
+            .options(
+                selectinload(Task.route_card),
+                selectinload(Task.creator),
+                selectinload(Task.assignee)
+            )
+            .where(Task.id == task_id)
+        )
+        task = result.scalars().first()
         if not task or task.type != TaskType.FOLLOWUP_WITH_SUBCONTRACTOR:
             raise ValueError("Invalid follow-up task")
 
@@ -61,7 +71,7 @@ class ProductionFollowUpService:
             route_card.estimated_completion_date = revised_completion_date
             
             # Send notifications to managers
-            self._notify_managers(route_card, revised_completion_date)
+            await self._notify_managers(route_card, revised_completion_date)
             
             # Create new follow-up task for the new date
             self._create_followup_task(route_card, revised_completion_date)
@@ -78,15 +88,17 @@ class ProductionFollowUpService:
             )
             self.db.add(pickup_task)
 
-        self.db.commit()
+        await self.db.commit()
         return task
 
-    def _notify_managers(self, route_card: RouteCard, revised_completion_date: datetime):
+    async def _notify_managers(self, route_card: RouteCard, revised_completion_date: datetime):
         """Send notifications to managers about production delays"""
-        managers = self.user_role_service.get_managers()
+        managers = await self.db.run_sync(
+            lambda session: UserRoleService(session).get_managers()
+        )
         
         for manager in managers:
-            self.notification_service.create_notification(
+            self.outbox.notify(
                 user_id=manager.id,
                 message=f"Production delay reported for Route Card #{route_card.id}. "
                        f"New estimated completion: {revised_completion_date.strftime('%Y-%m-%d')}",
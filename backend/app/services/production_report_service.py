@@ -0,0 +1,22 @@
+from datetime import date
+from typing import List, Optional
+
+from ..models.production_report import ProductionReport
+
+PRODUCTION_REPORT = ProductionReport.__table__
+
+
+def production_report_filters(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    shift: Optional[str] = None
+) -> List:
+    """WHERE clauses of the production report list, shared by the list endpoint and its export"""
+    filters = []
+    if start_date:
+        filters.append(PRODUCTION_REPORT.c.report_date >= start_date)
+    if end_date:
+        filters.append(PRODUCTION_REPORT.c.report_date <= end_date)
+    if shift:
+        filters.append(PRODUCTION_REPORT.c.shift == shift)
+    return filters
@@ -0,0 +1,123 @@
+from datetime import date
+from typing import Dict, List, Optional
+
+from sqlalchemy import String, case, cast, delete, func, insert, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.production_daily_rollup import ProductionDailyRollup
+from ..models.production_log import ProductionLog
+from ..models.production_report import ProductionReport
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+SUMMED_COLUMNS = ("quantity_produced", "target_quantity", "weighted_efficiency", "log_count")
+
+
+class ProductionRollupService:
+    """Maintains and reads the production_daily_rollup table"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def rollup_rows(report: ProductionReport) -> List[Dict]:
+        """A report's logs summed per item, as production_daily_rollup rows"""
+        totals: Dict[int, Dict] = {}
+        for log in report.production_logs:
+            row = totals.setdefault(log.item_id, {
+                "report_date": report.report_date,
+                "shift": report.shift,
+                "item_id": log.item_id,
+                "quantity_produced": 0.0,
+                "target_quantity": 0.0,
+                "weighted_efficiency": 0.0,
+                "log_count": 0,
+            })
+            row["quantity_produced"] += log.quantity_produced
+            row["target_quantity"] += log.target_quantity
+            row["weighted_efficiency"] += (log.efficiency or 0) * log.target_quantity
+            row["log_count"] += 1
+        return list(totals.values())
+
+    async def apply_report(self, report: ProductionReport) -> None:
+        """
+        Add a new report's logs to the rollup. Runs in the caller's transaction,
+        so the report and its rollup rows are committed together.
+        """
+        rows = self.rollup_rows(report)
+        if not rows:
+            return
+        dialect = self.db.get_bind().dialect.name
+        if dialect not in UPSERT_INSERTS:
+            raise NotImplementedError(f"Rollup upsert not supported on {dialect}")
+
+        table = ProductionDailyRollup.__table__
+        statement = UPSERT_INSERTS[dialect](table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.report_date, table.c.shift, table.c.item_id],
+            set_={
+                **{
+                    column: table.c[column] + statement.excluded[column]
+                    for column in SUMMED_COLUMNS
+                },
+                "updated_at": func.now(),
+            }
+        )
+        await self.db.execute(statement)
+
+    async def rebuild(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> int:
+        """Recompute the rollup from the logs for a date range (all dates by default)"""
+        delete_statement = delete(ProductionDailyRollup)
+        source = (
+            select(
+                ProductionReport.report_date,
+                ProductionReport.shift,
+                ProductionLog.item_id,
+                func.sum(ProductionLog.quantity_produced),
+                func.sum(ProductionLog.target_quantity),
+                func.sum(func.coalesce(ProductionLog.efficiency, 0) * ProductionLog.target_quantity),
+                func.count(ProductionLog.id),
+                func.now(),
+            )
+            .join(ProductionReport, ProductionReport.id == ProductionLog.report_id)
+            .group_by(ProductionReport.report_date, ProductionReport.shift, ProductionLog.item_id)
+        )
+        if start_date:
+            delete_statement = delete_statement.where(ProductionDailyRollup.report_date >= start_date)
+            source = source.where(ProductionReport.report_date >= start_date)
+        if end_date:
+            delete_statement = delete_statement.where(ProductionDailyRollup.report_date <= end_date)
+            source = source.where(ProductionReport.report_date <= end_date)
+
+        await self.db.execute(delete_statement)
+        result = await self.db.execute(
+            insert(ProductionDailyRollup).from_select(
+                ["report_date", "shift", "item_id", *SUMMED_COLUMNS, "updated_at"],
+                source
+            )
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    @staticmethod
+    def daily_efficiency_statement(start_date: date, end_date: date):
+        """
+        Target-weighted efficiency per day with production, as ("efficiency",
+        day, efficiency) rows for the dashboard summary's UNION ALL
+        """
+        table = ProductionDailyRollup.__table__
+        target = func.sum(table.c.target_quantity)
+        return (
+            select(
+                literal("efficiency"),
+                cast(table.c.report_date, String),
+                case((target > 0, func.sum(table.c.weighted_efficiency) / target), else_=0.0),
+            )
+            .where(table.c.report_date >= start_date, table.c.report_date <= end_date)
+            .group_by(table.c.report_date)
+        )
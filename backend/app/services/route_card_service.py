@@ -1,122 +1,152 @@
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+from ..db.unit_of_work import UnitOfWork
 from ..models.route_card import RouteCard, RouteStatus
 from ..models.order import Order, OrderStatus
-from ..models.task import Task, TaskType, TaskStatus
+from ..models.task import Task, TaskStatus
+from ..schemas.order import OrderStatusChange
 from ..schemas.route_card import RouteCardCreate
-from ..services.notification_service import NotificationService
-from ..services.audit_service import AuditService
+from ..services.order_service import OrderService, invalidate_order_caches
+from ..services.outbox_service import Outbox
 
 class RouteCardService:
-    def __init__(self, db: Session):
+    """Route card workflows, each committed as one unit of work (see OrderService)"""
+
+    def __init__(self, db: AsyncSession, uow: Optional[UnitOfWork] = None):
         self.db = db
-        self.notification_service = NotificationService(db)
-        self.audit_service = AuditService(db)
+        self.uow = uow or UnitOfWork(db)
+        self.outbox = Outbox(db)
+
+    async def get_route_card(self, route_card_id: int) -> Optional[RouteCard]:
+        """Load a route card together with its order."""
+        result = await self.db.execute(
+            select(RouteCard)
+            .options(selectinload(RouteCard.order))
+            .where(RouteCard.id == route_card_id)
+        )
+        return result.scalars().first()
 
-    def create_route_card(
+    async def create_route_card(
         self,
         route_card_data: RouteCardCreate,
         user_id: int
     ) -> RouteCard:
         """Create a new route card and generate initial tasks."""
-        # Get the order
-        order = self.db.query(Order).filter(Order.id == route_card_data.order_id).first()
-        if not order:
-            raise ValueError("Order not found")
-
-        # Create route card
-        route_card = RouteCard(
-            order_id=route_card_data.order_id,
-            materials=route_card_data.materials,
-            workstations=route_card_data.workstations,
-            estimated_time=route_card_data.estimated_time,
-            created_by_id=user_id,
-            status=RouteStatus.DRAFT
-        )
-        
-        self.db.add(route_card)
-        self.db.commit()
-        self.db.refresh(route_card)
-
-        # Log the creation
-        self.audit_service.create_log(
-            user_id=user_id,
-            action="CREATE",
-            target_entity="RouteCard",
-            target_id=str(route_card.id),
-            details={
-                "order_id": route_card_data.order_id,
-                "status": RouteStatus.DRAFT
-            }
-        )
+        async with self.uow:
+            # Get the order
+            order = await self.db.get(Order, route_card_data.order_id)
+            if not order:
+                raise ValueError("Order not found")
+
+            # Create route card
+            route_card = RouteCard(
+                order_id=route_card_data.order_id,
+                materials=route_card_data.materials,
+                workstations=route_card_data.workstations,
+                estimated_time=route_card_data.estimated_time,
+                created_by_id=user_id,
+                status=RouteStatus.DRAFT
+            )
+
+            self.db.add(route_card)
+            # Assigns route_card.id for the audit log, without committing
+            await self.db.flush()
+
+            # Log the creation
+            self.outbox.audit(
+                user_id=user_id,
+                action="CREATE",
+                resource_type="RouteCard",
+                resource_id=route_card.id,
+                details={
+                    "order_id": route_card_data.order_id,
+                    "status": RouteStatus.DRAFT
+                }
+            )
 
+        await self.db.refresh(route_card)
         return route_card
 
-    def confirm_route_card(
+    async def confirm_route_card(
         self,
         route_card_id: int,
         user_id: int
     ) -> RouteCard:
-        """Confirm route card and create material preparation task."""
-        route_card = self.db.query(RouteCard).filter(RouteCard.id == route_card_id).first()
-        if not route_card:
-            raise ValueError("Route card not found")
-
-        # Update route card status
-        old_status = route_card.status
-        route_card.status = RouteStatus.CONFIRMED
-        
-        # Update order status
-        route_card.order.status = OrderStatus.IN_PROGRESS
-
-        # Create material preparation task
-        materials_list = "\n".join([
-            f"- {m['quantity']} {m['unit']} of Item #{m['item_id']}"
-            for m in route_card.materials
-        ])
-
-        task = Task(
-            type=TaskType.MATERIAL_PREPARATION,
-            status=TaskStatus.PENDING,
-            title=f"Prepare materials for Production Order #{route_card.order_id}",
-            description=f"Please prepare the following materials:\n{materials_list}",
-            assigned_to_id=None,  # Will be assigned by warehouse manager
-            created_by_id=user_id,
-            order_id=route_card.order_id,
-            route_card_id=route_card.id
-        )
+        """
+        Confirm route card, start its order and create material preparation task.
+        The order moves through the state machine: InvalidTransition if its
+        status doesn't allow starting, OrderConflict if it changed since loaded.
+        """
+        async with self.uow:
+            route_card = await self.get_route_card(route_card_id)
+            if not route_card:
+                raise ValueError("Route card not found")
+
+            # Update route card status
+            old_status = route_card.status
+            route_card.status = RouteStatus.CONFIRMED
+
+            # Start the order, unless another route card already did
+            order = route_card.order
+            if order.status != OrderStatus.IN_PROGRESS:
+                await OrderService(self.db, self.uow).apply_status_change(
+                    OrderStatusChange(order_id=order.id, status=OrderStatus.IN_PROGRESS, version=order.version),
+                    user_id
+                )
+
+            # Create material preparation task
+            materials_list = "\n".join([
+                f"- {m['quantity']} {m['unit']} of Item #{m['item_id']}"
+                for m in route_card.materials
+            ])
+
+            task = Task(
+                status=TaskStatus.NEW,
+                title=f"Prepare materials for Production Order #{route_card.order_id}",
+                description=f"Please prepare the following materials:\n{materials_list}",
+                assignee_id=None,  # Will be assigned by warehouse manager
+                creator_id=user_id,
+                order_id=route_card.order_id,
+                route_card_id=route_card.id
+            )
 
-        self.db.add(task)
-        self.db.commit()
-        self.db.refresh(route_card)
-
-        # Log the status change
-        self.audit_service.create_log(
-            user_id=user_id,
-            action="UPDATE",
-            target_entity="RouteCard",
-            target_id=str(route_card_id),
-            details={
-                "status_change": {
-                    "from": old_status,
-                    "to": RouteStatus.CONFIRMED
-                },
-                "order_id": route_card.order_id
-            }
-        )
+            self.db.add(task)
+            # Assigns task.id for the notification link, without committing
+            await self.db.flush()
+
+            # Log the status change
+            self.outbox.audit(
+                user_id=user_id,
+                action="UPDATE",
+                resource_type="RouteCard",
+                resource_id=route_card_id,
+                details={
+                    "status_change": {
+                        "from": old_status,
+                        "to": RouteStatus.CONFIRMED
+                    },
+                    "order_id": route_card.order_id
+                }
+            )
 
-        # Notify warehouse manager about material preparation task
-        self.notification_service.create_notification(
-            user_id=task.assigned_to_id if task.assigned_to_id else user_id,  # If no specific assignee, notify creator
-            message=f"New material preparation task for Production Order #{route_card.order_id}",
-            type="TASK",
-            link=f"/tasks/{task.id}"
-        )
+            # Notify warehouse manager about material preparation task
+            self.outbox.notify(
+                user_id=task.assignee_id if task.assignee_id else user_id,  # If no specific assignee, notify creator
+                message=f"New material preparation task for Production Order #{route_card.order_id}",
+                type="TASK",
+                link=f"/tasks/{task.id}"
+            )
 
+        # The order's status changed through Core statements
+        await invalidate_order_caches()
+        await self.db.refresh(order)
+        await self.db.refresh(route_card)
         return route_card
 
-    def update_route_card_status(
+    async def update_route_card_status(
         self,
         route_card_id: int,
         new_status: str,
@@ -124,41 +154,41 @@ class RouteCardService:
         notes: Optional[str] = None
     ) -> RouteCard:
         """Update the status of a route card."""
-        route_card = self.db.query(RouteCard).filter(RouteCard.id == route_card_id).first()
-        if not route_card:
-            raise ValueError("Route card not found")
-
-        old_status = route_card.status
-        route_card.status = new_status
-        if notes:
-            route_card.notes = notes
-
-        self.db.commit()
-        self.db.refresh(route_card)
-
-        # Log the status change
-        self.audit_service.create_log(
-            user_id=user_id,
-            action="UPDATE",
-            target_entity="RouteCard",
-            target_id=str(route_card_id),
-            details={
-                "status_change": {
-                    "from": old_status,
-                    "to": new_status
-                },
-                "notes": notes
-            }
-        )
-
-        # Notify relevant users based on the new status
-        if new_status == RouteStatus.COMPLETED:
-            # Notify order creator
-            self.notification_service.create_notification(
-                user_id=route_card.order.created_by_id,
-                message=f"Route Card #{route_card_id} for Order #{route_card.order_id} has been completed",
-                type="STATUS_UPDATE",
-                link=f"/route-cards/{route_card_id}"
+        async with self.uow:
+            route_card = await self.get_route_card(route_card_id)
+            if not route_card:
+                raise ValueError("Route card not found")
+
+            old_status = route_card.status
+            order = route_card.order
+            route_card.status = new_status
+            if notes:
+                route_card.notes = notes
+
+            # Log the status change
+            self.outbox.audit(
+                user_id=user_id,
+                action="UPDATE",
+                resource_type="RouteCard",
+                resource_id=route_card_id,
+                details={
+                    "status_change": {
+                        "from": old_status,
+                        "to": new_status
+                    },
+                    "notes": notes
+                }
             )
 
+            # Notify relevant users based on the new status
+            if new_status == RouteStatus.COMPLETED:
+                # Notify order creator
+                self.outbox.notify(
+                    user_id=order.created_by_id,
+                    message=f"Route Card #{route_card_id} for Order #{route_card.order_id} has been completed",
+                    type="STATUS_UPDATE",
+                    link=f"/route-cards/{route_card_id}"
+                )
+
+        await self.db.refresh(route_card)
         return route_card
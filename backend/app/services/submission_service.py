@@ -1,11 +1,18 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
 from fastapi.encoders import jsonable_encoder
+from app.core.pagination import Keyset
 from app.models.general_submission import GeneralSubmission, ImportanceLevel
 from app.models.task import Task
 from app.schemas.general_submission import SubmissionCreate, SubmissionUpdate
 from datetime import datetime
 
+SUBMISSIONS_KEYSET = Keyset(
+    "submissions",
+    (GeneralSubmission.created_at, True),
+    (GeneralSubmission.id, True),
+)
+
 class SubmissionService:
     def create_submission(self, db: Session, *, obj_in: SubmissionCreate, creator_id: int) -> GeneralSubmission:
         obj_in_data = jsonable_encoder(obj_in)
@@ -37,12 +44,17 @@ class SubmissionService:
         *, 
         skip: int = 0, 
         limit: int = 100,
-        creator_id: Optional[int] = None
-    ) -> List[GeneralSubmission]:
+        creator_id: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[GeneralSubmission], Optional[str]]:
+        """Newest submissions first, with the cursor of the next page (None on the last)"""
         query = db.query(GeneralSubmission)
         if creator_id:
             query = query.filter(GeneralSubmission.creator_id == creator_id)
-        return query.offset(skip).limit(limit).all()
+        query = SUBMISSIONS_KEYSET.apply(query, cursor, limit)
+        if skip and not cursor:
+            query = query.offset(skip)
+        return SUBMISSIONS_KEYSET.page(query.all(), limit)
 
     def get_submission(self, db: Session, submission_id: int) -> Optional[GeneralSubmission]:
         return db.query(GeneralSubmission).filter(GeneralSubmission.id == submission_id).first()
@@ -1,6 +1,7 @@
 from typing import Optional, List
 from sqlalchemy.orm import Session
 from ..models.user import User, Role
+from ..core.principal_cache import revoke_user_principals
 
 
 class UserRoleService:
@@ -151,7 +152,9 @@ class UserRoleService:
             
             if user and role and role not in user.roles:
                 user.roles.append(role)
+                user.role_version = (user.role_version or 0) + 1
                 self.db.commit()
+                revoke_user_principals(user.id, user.role_version, bool(user.is_active))
                 return True
             return False
         except Exception:
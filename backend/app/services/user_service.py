@@ -5,6 +5,7 @@ from passlib.context import CryptContext
 
 from ..models.user import User, Role
 from ..schemas.user import UserCreate
+from ..core.principal_cache import revoke_user_principals
 
 # Password context setup
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -54,3 +55,21 @@ def create_user(db: Session, user_data: UserCreate) -> User:
     db.refresh(db_user)
     
     return db_user
+
+def deactivate_user(db: Session, user_id: int) -> User:
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    user.is_active = False
+    user.role_version = (user.role_version or 0) + 1
+    db.commit()
+    db.refresh(user)
+    
+    # Cached principals and role-claim tokens would otherwise keep the user active
+    revoke_user_principals(user.id, user.role_version, is_active=False)
+    
+    return user
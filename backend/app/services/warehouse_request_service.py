@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import exists, or_, select
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from ..models.item import Item
+from ..models.order import OrderType
+from ..models.user import User
+from ..models.warehouse_request import WarehouseRequest, WarehouseRequestItem, WarehouseRequestItemStatus
+from ..schemas.warehouse_request import WarehouseRequestItemUpdate
+from .order_consolidation_service import Placement, ShortageLine, shortage_order_consolidator
+from .order_service import stage_placement_events
+
+WAREHOUSE_REQUEST = WarehouseRequest.__table__
+REQUEST_ITEM = WarehouseRequestItem.__table__
+
+# Item statuses after which the warehouse is done with an item
+PROCESSED_ITEM_STATUSES = (WarehouseRequestItemStatus.READY.value, WarehouseRequestItemStatus.BACKORDERED.value)
+# Due date of the order auto-created for a backordered item
+SHORTAGE_ORDER_LEAD_TIME = timedelta(days=7)
+
+# Loader profiles: each endpoint loads up front exactly the relationships it
+# serializes or reads, one SELECT ... IN per level instead of a lazy load per row
+
+def warehouse_request_query(db: Session):
+    """Warehouse requests with the request items and items WarehouseRequestSchema serializes"""
+    return db.query(WarehouseRequest).options(
+        selectinload(WarehouseRequest.request_items).selectinload(WarehouseRequestItem.item)
+    )
+
+def request_item_query(db: Session):
+    """Request items with their request and item category, as read by the shortage workflow"""
+    return db.query(WarehouseRequestItem).options(
+        joinedload(WarehouseRequestItem.request),
+        joinedload(WarehouseRequestItem.item).joinedload(Item.category),
+    )
+
+def all_items_processed(db: Session, request_id: int) -> bool:
+    """Whether every item of the request is processed, checked in SQL without loading the items"""
+    unprocessed = select(REQUEST_ITEM.c.id).where(
+        REQUEST_ITEM.c.request_id == request_id,
+        or_(REQUEST_ITEM.c.status.is_(None), REQUEST_ITEM.c.status.notin_(PROCESSED_ITEM_STATUSES)),
+    )
+    return not db.execute(select(exists(unprocessed))).scalar()
+
+
+def warehouse_request_filters(
+    user: User,
+    status: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> List:
+    """
+    WHERE clauses of the warehouse request list, shared by the list endpoint
+    and its export. Only warehouse staff see every requester's requests.
+    """
+    filters = []
+    if status:
+        filters.append(WAREHOUSE_REQUEST.c.status == status)
+    if start_date:
+        filters.append(WAREHOUSE_REQUEST.c.created_at >= start_date)
+    if end_date:
+        filters.append(WAREHOUSE_REQUEST.c.created_at <= end_date)
+    if not user.is_warehouse_staff:
+        filters.append(WAREHOUSE_REQUEST.c.created_by_id == user.id)
+    return filters
+
+def shortage_line(request_item: WarehouseRequestItem) -> ShortageLine:
+    """Shortage of a backordered request item (its request, item and category must be loaded)"""
+    # Determine order type based on item category or other business rules
+    manufactured = request_item.item.category.name == "Manufactured"
+    return ShortageLine(
+        warehouse_request_item_id=request_item.id,
+        request_id=request_item.request_id,
+        item_id=request_item.item_id,
+        order_type=OrderType.PRODUCTION if manufactured else OrderType.PROCUREMENT,
+        quantity=request_item.quantity_requested,
+        priority=request_item.request.priority,  # Inherit priority from request
+        required_date=datetime.now() + SHORTAGE_ORDER_LEAD_TIME
+    )
+
+def apply_item_updates(
+    db: Session,
+    request: WarehouseRequest,
+    updates: Sequence[Tuple[WarehouseRequestItem, WarehouseRequestItemUpdate]],
+    user_id: int
+) -> Placement:
+    """
+    Apply line updates to items of one request in a single transaction.
+    Backordered lines are put on shortage orders, consolidated per item with
+    each other and with recent open drafts; new orders are flushed together
+    (one multi-row INSERT), their audit logs and notifications are staged in
+    the outbox as for a single shortage order, and the request status is
+    recomputed once.
+    Request items must come from request_item_query.
+    """
+    lines = []
+    for request_item, item_update in updates:
+        if item_update.status == WarehouseRequestItemStatus.BACKORDERED.value:
+            lines.append(shortage_line(request_item))
+        for field, value in item_update.dict(exclude_unset=True).items():
+            setattr(request_item, field, value)
+
+    placement = shortage_order_consolidator.place(db, lines, user_id)
+    stage_placement_events(db, placement, user_id)
+    # The status check reads item rows in SQL, so the updates must be flushed first
+    db.flush()
+    # If all items are processed, update the main request status
+    if all_items_processed(db, request.id):
+        request.status = "processing"
+    db.commit()
+    return placement
@@ -0,0 +1,20 @@
+# Loaded automatically by gunicorn from the working directory.
+# Worker settings stay on the command line (see Dockerfile); this file only
+# manages the shared directory Prometheus multiprocess metrics are written to.
+import os
+import shutil
+
+
+def on_starting(server):
+    """Start every deployment with an empty metrics directory"""
+    metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Drop live gauges of a worker that exited so they aren't summed forever"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,24 @@
+"""Add role version to users
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column(
+        'user',
+        sa.Column('role_version', sa.Integer(), nullable=False, server_default='0')
+    )
+
+def downgrade():
+    op.drop_column('user', 'role_version')
@@ -0,0 +1,54 @@
+"""Add production daily rollup
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'production_daily_rollup',
+        sa.Column('report_date', sa.Date(), nullable=False),
+        # Reuses the enum type of production_report.shift
+        sa.Column(
+            'shift',
+            postgresql.ENUM('MORNING', 'AFTERNOON', 'NIGHT', name='shiftenum', create_type=False),
+            nullable=False
+        ),
+        sa.Column('item_id', sa.Integer(), sa.ForeignKey('item.id'), nullable=False),
+        sa.Column('quantity_produced', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('target_quantity', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('weighted_efficiency', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('log_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('report_date', 'shift', 'item_id')
+    )
+    op.create_index('ix_production_daily_rollup_item_id', 'production_daily_rollup', ['item_id'])
+
+    # Backfill from the existing logs
+    op.execute("""
+        INSERT INTO production_daily_rollup
+            (report_date, shift, item_id, quantity_produced, target_quantity,
+             weighted_efficiency, log_count, updated_at)
+        SELECT r.report_date, r.shift, l.item_id,
+               SUM(l.quantity_produced), SUM(l.target_quantity),
+               SUM(COALESCE(l.efficiency, 0) * l.target_quantity), COUNT(*),
+               CURRENT_TIMESTAMP
+        FROM production_log l
+        JOIN production_report r ON r.id = l.report_id
+        GROUP BY r.report_date, r.shift, l.item_id
+    """)
+
+def downgrade():
+    op.drop_index('ix_production_daily_rollup_item_id', table_name='production_daily_rollup')
+    op.drop_table('production_daily_rollup')
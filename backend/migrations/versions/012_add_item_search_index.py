@@ -0,0 +1,36 @@
+"""Add item search index
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Generated column: kept current by PostgreSQL on every insert/update,
+    # including writes that bypass the ORM
+    op.execute("""
+        ALTER TABLE item ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple'::regconfig, coalesce(item_code, '')), 'A') ||
+            setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'B') ||
+            setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'C')
+        ) STORED
+    """)
+    op.execute("CREATE INDEX ix_item_search_vector ON item USING gin (search_vector)")
+    # Fuzzy (%) and substring (ILIKE) matching on item codes
+    op.execute("CREATE INDEX ix_item_item_code_trgm ON item USING gin (item_code gin_trgm_ops)")
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_item_item_code_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_item_search_vector")
+    op.execute("ALTER TABLE item DROP COLUMN IF EXISTS search_vector")
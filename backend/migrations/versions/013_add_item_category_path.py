@@ -0,0 +1,45 @@
+"""Add item category materialized path
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('item_category', sa.Column('path', sa.String(length=500), nullable=True))
+
+    # Backfill "/root/.../id/" paths top-down
+    op.execute("""
+        WITH RECURSIVE tree (id, path) AS (
+            SELECT id, '/' || id::text || '/'
+            FROM item_category
+            WHERE parent_id IS NULL
+            UNION ALL
+            SELECT child.id, tree.path || child.id::text || '/'
+            FROM item_category child
+            JOIN tree ON child.parent_id = tree.id
+        )
+        UPDATE item_category
+        SET path = tree.path
+        FROM tree
+        WHERE item_category.id = tree.id
+    """)
+
+    op.execute("CREATE INDEX ix_item_category_path ON item_category (path varchar_pattern_ops)")
+    op.create_index('ix_item_category_parent_id', 'item_category', ['parent_id'])
+    op.create_index('ix_item_by_category', 'item', ['category_id'])
+
+def downgrade():
+    op.drop_index('ix_item_by_category', table_name='item')
+    op.drop_index('ix_item_category_parent_id', table_name='item_category')
+    op.drop_index('ix_item_category_path', table_name='item_category')
+    op.drop_column('item_category', 'path')
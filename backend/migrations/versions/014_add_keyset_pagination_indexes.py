@@ -0,0 +1,42 @@
+"""Add keyset pagination indexes
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # One index per list order (and per common filter), so each page is a range scan
+    op.create_index('ix_warehouse_request_created_at_id', 'warehouse_request', ['created_at', 'id'])
+    op.create_index(
+        'ix_warehouse_request_created_by_created_at_id',
+        'warehouse_request',
+        ['created_by_id', 'created_at', 'id']
+    )
+    op.create_index(
+        'ix_production_report_date_shift_id',
+        'production_report',
+        [sa.text('report_date DESC'), 'shift', 'id']
+    )
+    op.create_index('ix_general_submission_created_at_id', 'general_submission', ['created_at', 'id'])
+    op.create_index(
+        'ix_general_submission_creator_created_at_id',
+        'general_submission',
+        ['creator_id', 'created_at', 'id']
+    )
+
+def downgrade():
+    op.drop_index('ix_general_submission_creator_created_at_id', table_name='general_submission')
+    op.drop_index('ix_general_submission_created_at_id', table_name='general_submission')
+    op.drop_index('ix_production_report_date_shift_id', table_name='production_report')
+    op.drop_index('ix_warehouse_request_created_by_created_at_id', table_name='warehouse_request')
+    op.drop_index('ix_warehouse_request_created_at_id', table_name='warehouse_request')
@@ -0,0 +1,26 @@
+"""Add warehouse request item index
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-16 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '015'
+down_revision = '014'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Request items are loaded per request (selectinload) and checked per request and status
+    op.create_index(
+        'ix_warehouse_request_item_request_id_status',
+        'warehouse_request_item',
+        ['request_id', 'status']
+    )
+
+def downgrade():
+    op.drop_index('ix_warehouse_request_item_request_id_status', table_name='warehouse_request_item')
@@ -0,0 +1,35 @@
+"""Add outbox
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '016'
+down_revision = '015'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'outbox',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('topic', sa.String(length=100), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('available_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    # The dispatcher's scan: pending messages that are due, oldest first
+    op.create_index('ix_outbox_status_available_at_id', 'outbox', ['status', 'available_at', 'id'])
+
+def downgrade():
+    op.drop_index('ix_outbox_status_available_at_id', table_name='outbox')
+    op.drop_table('outbox')
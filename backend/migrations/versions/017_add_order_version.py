@@ -0,0 +1,22 @@
+"""Add order version
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-16 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '017'
+down_revision = '016'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Optimistic concurrency control of order updates
+    op.add_column('order', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+def downgrade():
+    op.drop_column('order', 'version')
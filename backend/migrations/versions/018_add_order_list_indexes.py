@@ -0,0 +1,32 @@
+"""Add order list indexes
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-16 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '018'
+down_revision = '017'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_order_created_at_id', ['created_at', 'id']),
+    ('ix_order_type_status_created_at_id', ['order_type', 'status', 'created_at', 'id']),
+    ('ix_order_type_status_required_date_id', ['order_type', 'status', 'required_date', 'id']),
+    ('ix_order_item_id_created_at_id', ['item_id', 'created_at', 'id']),
+    ('ix_order_vendor_name_created_at_id', ['vendor_name', 'created_at', 'id']),
+]
+
+def upgrade():
+    # Keyset pagination of the order list by its common filters
+    for name, columns in INDEXES:
+        op.create_index(name, 'order', columns)
+
+def downgrade():
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='order')
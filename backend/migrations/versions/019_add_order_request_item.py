@@ -0,0 +1,41 @@
+"""Add order request item links
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-16 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '019'
+down_revision = '018'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Warehouse request item lines covered by an order; consolidated shortage orders cover several
+    op.create_table(
+        'order_request_item',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('order_id', sa.Integer(), sa.ForeignKey('order.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('warehouse_request_item_id', sa.Integer(), sa.ForeignKey('warehouse_request_item.id'), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_order_request_item_order_id', 'order_request_item', ['order_id'])
+    op.create_index(
+        'ix_order_request_item_warehouse_request_item_id', 'order_request_item', ['warehouse_request_item_id']
+    )
+    # Existing orders cover the one line they were created for
+    op.execute(
+        'INSERT INTO order_request_item (order_id, warehouse_request_item_id, quantity, created_at) '
+        'SELECT id, warehouse_request_item_id, quantity, created_at FROM "order" '
+        'WHERE warehouse_request_item_id IS NOT NULL'
+    )
+
+def downgrade():
+    op.drop_index('ix_order_request_item_warehouse_request_item_id', table_name='order_request_item')
+    op.drop_index('ix_order_request_item_order_id', table_name='order_request_item')
+    op.drop_table('order_request_item')
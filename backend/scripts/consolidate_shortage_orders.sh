@@ -0,0 +1,36 @@
+#!/bin/bash
+
+# Merge open draft shortage orders of the same item and order type
+# Usage: scripts/consolidate_shortage_orders.sh
+# Run periodically (e.g. from cron every 15 minutes). Drafts created within
+# ORDER_CONSOLIDATION_WINDOW_HOURS of each other are merged into the oldest.
+
+echo "Consolidating shortage orders..."
+
+python3 << 'EOF_PY'
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.getcwd())
+
+from app.db.session import AsyncSessionLocal
+from app.core.cache import cache
+from app.services.order_consolidation_service import shortage_order_consolidator
+
+async def consolidate():
+    async with AsyncSessionLocal() as db:
+        merged = await db.run_sync(shortage_order_consolidator.consolidate)
+        await db.commit()
+    # The commit hook only schedules the invalidation; awaited here before the loop closes
+    if merged:
+        await cache.invalidate_tags("orders")
+    absorbed = sum(len(order_ids) for order_ids in merged.values())
+    print(f"✅ Merged {absorbed} draft orders into {len(merged)} orders")
+
+try:
+    asyncio.run(consolidate())
+except Exception as e:
+    print(f"❌ Error consolidating shortage orders: {e}")
+    sys.exit(1)
+EOF_PY
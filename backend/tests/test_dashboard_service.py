@@ -0,0 +1,111 @@
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import cache as cache_module
+from app.core.cache import Cache, MemoryCacheBackend, cached
+from app.services.dashboard_service import DashboardService
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    test_cache = Cache(MemoryCacheBackend(), namespace="test")
+    monkeypatch.setattr(cache_module, "cache", test_cache)
+    return test_cache
+
+
+@pytest.mark.unit
+class TestDashboardSummary:
+    """Test folding the single summary statement into the dashboard shape."""
+
+    def test_build_summary(self):
+        """Test task, order and efficiency rows land in their sections."""
+        rows = [
+            ("task", "NEW", 3.0),
+            ("task", "IN_PROGRESS", 2.0),
+            ("order", "PROCUREMENT", 4.0),
+            ("efficiency", "2026-01-05", 87.5),
+        ]
+        summary = DashboardService.build_summary(rows, date(2026, 1, 4), date(2026, 1, 5))
+
+        assert summary["task_summary"] == {"new": 3, "in_progress": 2}
+        assert summary["active_orders"] == {"procurement": 4, "production": 0}
+        assert [point["average_efficiency"] for point in summary["efficiency_trend"]] == [0.0, 87.5]
+
+
+@pytest.mark.unit
+class TestCoalescing:
+    """Test concurrent cache misses share one computation."""
+
+    def test_concurrent_misses_compute_once(self, memory_cache):
+        """Test identical concurrent calls run the function once."""
+        calls = []
+
+        @cached(prefix="test:summary", tags=["dashboard"])
+        async def summary():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"tasks": 3}
+
+        async def run():
+            return await asyncio.gather(*(summary() for _ in range(10)))
+
+        assert asyncio.run(run()) == [{"tasks": 3}] * 10
+        assert len(calls) == 1
+
+    def test_shared_computation_runs_on_its_own_session(self, memory_cache, monkeypatch):
+        """Test coalesced callers don't share one caller's session, bound or passed."""
+        computation = AsyncSession()
+        monkeypatch.setattr(cache_module, "computation_session", lambda: computation)
+        sessions = []
+
+        class SummaryService:
+            def __init__(self, db):
+                self.db = db
+
+            @cached(prefix="test:summary", tags=["dashboard"])
+            async def summary(self):
+                sessions.append(self.db)
+                await asyncio.sleep(0.01)
+                return {"tasks": 3}
+
+        @cached(prefix="test:facets", tags=["orders"])
+        async def facets(db, status):
+            sessions.append(db)
+            return {"status": status}
+
+        async def run():
+            callers = [AsyncSession(), AsyncSession()]
+            summaries = await asyncio.gather(*(SummaryService(db).summary() for db in callers))
+            return summaries, await facets(callers[0], status="draft")
+
+        assert asyncio.run(run()) == ([{"tasks": 3}] * 2, {"status": "draft"})
+        assert sessions == [computation, computation]
+
+    def test_result_computed_during_invalidation_is_not_stored(self, memory_cache):
+        """Test a result that raced an invalidation isn't cached."""
+        calls = []
+
+        @cached(prefix="test:summary", tags=["dashboard"])
+        async def summary():
+            calls.append(1)
+            await memory_cache.invalidate_tags("dashboard")
+            return {"tasks": len(calls)}
+
+        async def run():
+            await summary()
+            return await summary()
+
+        assert asyncio.run(run()) == {"tasks": 2}
+
+    def test_invalidate_tags_later_from_sync_code(self, memory_cache):
+        """Test sync hooks can schedule an invalidation on the running loop."""
+        async def run():
+            await memory_cache.set("summary", 1, tags=["dashboard"])
+            memory_cache.invalidate_tags_later("dashboard")
+            await asyncio.sleep(0)
+            return await memory_cache.get("summary")
+
+        assert asyncio.run(run()) is None
@@ -0,0 +1,114 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import exc
+from app.core.config import settings
+from app.db.pool import PoolStats, timed_pool_class
+from app.db.session import engine_options, get_async_database_url, is_read_only_request
+
+
+@pytest.mark.unit
+class TestAsyncDatabaseUrl:
+    """Test mapping of sync database URLs to their asyncio drivers."""
+
+    def test_postgresql_uses_asyncpg(self):
+        """Test plain postgresql URLs are switched to asyncpg."""
+        url = get_async_database_url("postgresql://user:secret@db:5432/mrdpol_core_db")
+        assert url == "postgresql+asyncpg://user:secret@db:5432/mrdpol_core_db"
+
+    def test_explicit_sync_driver_is_replaced(self):
+        """Test an explicit psycopg2 driver is replaced rather than appended to."""
+        url = get_async_database_url("postgresql+psycopg2://user:secret@db/mrdpol_core_db")
+        assert url == "postgresql+asyncpg://user:secret@db/mrdpol_core_db"
+
+    def test_sqlite_uses_aiosqlite(self):
+        """Test sqlite URLs are switched to aiosqlite."""
+        assert get_async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+
+    def test_unknown_backend_raises(self):
+        """Test backends without an async driver are rejected."""
+        with pytest.raises(ValueError):
+            get_async_database_url("mssql+pyodbc://user:secret@db/mrdpol_core_db")
+
+
+class MockRequest:
+    """Mock request exposing only the HTTP method."""
+    def __init__(self, method: str):
+        self.method = method
+
+
+@pytest.mark.unit
+class TestEngineOptions:
+    """Test pool and connection options built from settings."""
+
+    def test_pool_settings_come_from_settings(self, monkeypatch):
+        """Test pool sizing is taken from Settings."""
+        monkeypatch.setattr(settings, "db_pool_size", 20)
+        monkeypatch.setattr(settings, "db_pool_recycle", 600)
+        options = engine_options("postgresql://user:secret@db/mrdpol_core_db", PoolStats("test"))
+
+        assert options["pool_size"] == 20
+        assert options["pool_recycle"] == 600
+        assert "connect_args" not in options
+
+    def test_statement_timeout_per_driver(self, monkeypatch):
+        """Test the statement timeout is passed the way each driver expects."""
+        monkeypatch.setattr(settings, "db_statement_timeout_ms", 5000)
+        url = "postgresql://user:secret@db/mrdpol_core_db"
+
+        sync_options = engine_options(url, PoolStats("test"))
+        async_options = engine_options(url, PoolStats("test"), use_async=True)
+
+        assert sync_options["connect_args"] == {"options": "-c statement_timeout=5000"}
+        assert async_options["connect_args"] == {"server_settings": {"statement_timeout": "5000"}}
+
+    def test_sqlite_keeps_default_pool(self):
+        """Test SQLite engines are left with SQLAlchemy's own pool choice."""
+        assert engine_options("sqlite:///./test.db", PoolStats("test")) == {}
+
+    def test_only_reads_are_routed_to_replica(self):
+        """Test only GET/HEAD requests count as read-only."""
+        assert is_read_only_request(MockRequest("GET")) is True
+        assert is_read_only_request(MockRequest("HEAD")) is True
+        assert is_read_only_request(MockRequest("POST")) is False
+        assert is_read_only_request(None) is False
+
+
+@pytest.mark.unit
+class TestTimedPool:
+    """Test pool checkout instrumentation."""
+
+    def test_checkouts_and_occupancy_are_recorded(self):
+        """Test checkouts are counted and occupancy is reported."""
+        stats = PoolStats("test")
+        pool = timed_pool_class(stats)(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0)
+
+        connection = pool.connect()
+        snapshot = stats.snapshot(pool)
+        assert snapshot["checkouts"] == 1
+        assert snapshot["checked_out"] == 1
+
+        connection.close()
+        assert stats.snapshot(pool)["checked_out"] == 0
+
+    def test_timeouts_are_recorded(self):
+        """Test a checkout that times out is counted and re-raised."""
+        stats = PoolStats("test")
+        pool = timed_pool_class(stats)(
+            lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=0.01
+        )
+        connection = pool.connect()
+
+        with pytest.raises(exc.TimeoutError):
+            pool.connect()
+        assert stats.timeouts == 1
+        assert stats.max_wait_seconds >= 0.01
+        connection.close()
+
+    def test_stats_survive_pool_recreate(self):
+        """Test a recreated pool keeps reporting into the same stats."""
+        stats = PoolStats("test")
+        pool = timed_pool_class(stats)(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0)
+
+        pool.recreate().connect().close()
+        assert stats.checkouts == 1
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from app.core.health import ReadinessProbe, check_storage
+from app.core.config import settings
+
+
+class FakeClock:
+    """Manually advanced clock for cache tests."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+class TestReadinessProbe:
+    """Test the cached readiness report."""
+
+    def test_failing_critical_check_makes_service_not_ready(self):
+        """Test only critical checks decide readiness."""
+        probe = ReadinessProbe()
+        probe.register("database", lambda: {"ok": False}, critical=True)
+        probe.register("cache", lambda: {"warm": False})
+
+        report = asyncio.run(probe.report())
+        assert report["status"] == "not_ready"
+        assert report["checks"]["cache"] == {"ok": True, "warm": False}
+
+    def test_non_critical_failure_keeps_service_ready(self):
+        """Test a failing optional check is reported without failing readiness."""
+        def broken():
+            raise RuntimeError("queue unavailable")
+
+        probe = ReadinessProbe()
+        probe.register("database", lambda: {}, critical=True)
+        probe.register("queue", broken)
+
+        report = asyncio.run(probe.report())
+        assert report["status"] == "ready"
+        assert report["checks"]["queue"] == {"ok": False, "error": "queue unavailable"}
+
+    def test_async_checks_are_awaited(self):
+        """Test coroutine checks are supported."""
+        async def ping():
+            return {"latency_ms": 1.0}
+
+        probe = ReadinessProbe()
+        probe.register("database", ping, critical=True)
+
+        report = asyncio.run(probe.report())
+        assert report["checks"]["database"] == {"ok": True, "latency_ms": 1.0}
+
+    def test_report_is_cached(self):
+        """Test checks run once per cache period."""
+        calls = []
+        clock = FakeClock()
+        probe = ReadinessProbe(cache_seconds=5, clock=clock)
+        probe.register("database", lambda: calls.append(1) or {}, critical=True)
+
+        async def probe_three_times():
+            for _ in range(3):
+                await probe.report()
+
+        asyncio.run(probe_three_times())
+        assert len(calls) == 1
+
+        clock.now = 5
+        asyncio.run(probe.report())
+        assert len(calls) == 2
+
+
+@pytest.mark.unit
+class TestStorageCheck:
+    """Test the storage readiness check."""
+
+    def test_missing_storage_path_is_not_ok(self, monkeypatch, tmp_path):
+        """Test a missing storage directory fails and an existing one passes."""
+        monkeypatch.setattr(settings, "storage_path", str(tmp_path / "missing"))
+        assert check_storage()["ok"] is False
+
+        monkeypatch.setattr(settings, "storage_path", str(tmp_path))
+        assert check_storage()["ok"] is True
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.cache import Cache, MemoryCacheBackend
+from app.db.base_class import Base
+from app.services import item_autocomplete_service
+from app.services.item_autocomplete_service import ITEM, ItemPrefixIndex
+
+CATEGORY = Base.metadata.tables["item_category"]
+
+
+class FakeClock:
+    """Manually advanced clock for refresh interval tests."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    test_cache = Cache(MemoryCacheBackend(), namespace="test")
+    monkeypatch.setattr(item_autocomplete_service, "cache", test_cache)
+    return test_cache
+
+
+async def make_engine():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(
+            lambda sync_connection: Base.metadata.create_all(sync_connection, tables=[CATEGORY, ITEM])
+        )
+        await connection.execute(insert(CATEGORY).values(id=1, name="Fasteners"))
+        await connection.execute(insert(ITEM), [
+            {"id": 1, "item_code": "BLT-M8-40", "name": "Hex bolt M8x40", "category_id": 1},
+            {"id": 2, "item_code": "BLT-M10-50", "name": "Hex bolt M10x50", "category_id": 1},
+            {"id": 3, "item_code": "NUT-M8", "name": "Blind nut M8", "category_id": 1},
+        ])
+    return engine
+
+
+async def add_row(engine, **values):
+    async with engine.begin() as connection:
+        await connection.execute(insert(ITEM).values(category_id=1, **values))
+
+
+def codes(matches):
+    return [match["item_code"] for match in matches]
+
+
+@pytest.mark.unit
+class TestItemPrefixIndex:
+    """Test the in-memory item autocomplete index."""
+
+    def test_code_matches_come_before_name_matches(self, memory_cache):
+        """Test lookups are case-insensitive and codes rank ahead of names."""
+        async def run():
+            index = ItemPrefixIndex(async_sessionmaker(await make_engine()))
+            await index.load()
+            return index.lookup("bl"), index.lookup("blt-m8"), index.lookup("bl", limit=1), index.lookup(" ")
+
+        prefix_bl, prefix_code, limited, blank = asyncio.run(run())
+        assert codes(prefix_bl) == ["BLT-M10-50", "BLT-M8-40", "NUT-M8"]
+        assert codes(prefix_code) == ["BLT-M8-40"]
+        assert len(limited) == 1
+        assert blank == []
+
+    def test_added_item_is_found_without_reload(self, memory_cache):
+        """Test items created in this worker are searchable immediately."""
+        async def run():
+            index = ItemPrefixIndex(async_sessionmaker(await make_engine()))
+            await index.load()
+            await index.add(4, "WSH-M8", "Washer M8")
+            return index.lookup("wsh"), index.version
+
+        matches, version = asyncio.run(run())
+        assert codes(matches) == ["WSH-M8"]
+        assert version == 1
+
+    def test_other_workers_catch_up_through_version(self, memory_cache):
+        """Test a version bump makes another worker load only the new items."""
+        clock = FakeClock()
+
+        async def run():
+            engine = await make_engine()
+            writer = ItemPrefixIndex(async_sessionmaker(engine), clock=clock)
+            reader = ItemPrefixIndex(async_sessionmaker(engine), clock=clock)
+            await writer.load()
+            await reader.load()
+
+            await add_row(engine, id=4, item_code="WSH-M8", name="Washer M8")
+            await writer.add(4, "WSH-M8", "Washer M8")
+            before_interval = await reader.search("wsh")
+            clock.now = 5
+            after_interval = await reader.search("wsh")
+            return before_interval, after_interval, len(reader)
+
+        before_interval, after_interval, size = asyncio.run(run())
+        assert before_interval == []
+        assert codes(after_interval) == ["WSH-M8"]
+        assert size == 4
+
+    def test_search_loads_lazily(self, memory_cache):
+        """Test a worker whose startup load failed builds the index on first use."""
+        async def run():
+            index = ItemPrefixIndex(async_sessionmaker(await make_engine()))
+            return await index.search("nut"), index.loaded
+
+        matches, loaded = asyncio.run(run())
+        assert codes(matches) == ["NUT-M8"]
+        assert loaded
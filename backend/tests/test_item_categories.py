@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core import cache as cache_module
+from app.core.cache import Cache, MemoryCacheBackend
+from app.db.base_class import Base
+from app.services.item_category_service import CATEGORY, ItemCategoryService, category_path
+
+ROWS = [
+    {"id": 1, "name": "Fasteners", "description": None, "parent_id": None, "path": "/1/"},
+    {"id": 2, "name": "Bolts", "description": "Metric", "parent_id": 1, "path": "/1/2/"},
+    {"id": 3, "name": "Sheet metal", "description": None, "parent_id": None, "path": "/3/"},
+    {"id": 4, "name": "Hex bolts", "description": None, "parent_id": 2, "path": "/1/2/4/"},
+]
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    test_cache = Cache(MemoryCacheBackend(), namespace="test")
+    monkeypatch.setattr(cache_module, "cache", test_cache)
+    return test_cache
+
+
+class CountingSession:
+    """Wraps an AsyncSession and counts executed statements."""
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.statements = 0
+
+    async def execute(self, statement):
+        self.statements += 1
+        return await self.session.execute(statement)
+
+
+async def make_session() -> AsyncSession:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(lambda sync_connection: Base.metadata.create_all(sync_connection, tables=[CATEGORY]))
+        await connection.execute(insert(CATEGORY), ROWS)
+    return AsyncSession(engine)
+
+
+@pytest.mark.unit
+class TestItemCategoryService:
+    """Test the single-query, cached category tree."""
+
+    def test_category_path(self):
+        """Test paths append the category id to the parent's path."""
+        assert category_path(1) == "/1/"
+        assert category_path(4, "/1/2/") == "/1/2/4/"
+
+    def test_build_tree_nests_children(self):
+        """Test flat rows become the nested tree, whatever their order."""
+        tree = ItemCategoryService.build_tree(list(reversed(ROWS)))
+
+        assert [root["name"] for root in tree] == ["Fasteners", "Sheet metal"]
+        bolts = tree[0]["children"][0]
+        assert bolts["description"] == "Metric"
+        assert [child["name"] for child in bolts["children"]] == ["Hex bolts"]
+        assert tree[1]["children"] == []
+
+    def test_tree_and_paths_come_from_one_cached_query(self, memory_cache):
+        """Test repeated tree and path lookups reuse a single query."""
+        async def run():
+            async with await make_session() as session:
+                db = CountingSession(session)
+                service = ItemCategoryService(db)
+                tree = await service.get_tree()
+                paths = [await service.get_path(4), await service.get_path(99)]
+                await service.get_tree()
+                return tree, paths, db.statements
+
+        tree, paths, statements = asyncio.run(run())
+        assert len(tree) == 2
+        assert paths == ["/1/2/4/", None]
+        assert statements == 1
@@ -0,0 +1,87 @@
+import asyncio
+import io
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.cache import Cache, MemoryCacheBackend
+from app.db.base_class import Base
+from app.services import item_autocomplete_service, item_import_service
+from app.services.item_import_service import CATEGORY, ITEM, ImportFormatError, ItemImportService, read_rows
+
+CSV = """item_code,name,description,category_id
+BLT-M8-40,Hex bolt M8x40,Zinc plated,1
+NUT-M8,Hex nut M8,,1
+EXISTING-1,Duplicate of a stored item,,1
+BLT-M8-40,Duplicate within the file,,1
+PNL-2,Steel panel,,99
+,Missing code,,1
+
+WSH-M8,Washer M8,,not-a-number
+SPR-M8,Spring washer M8,,1
+"""
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    test_cache = Cache(MemoryCacheBackend(), namespace="test")
+    monkeypatch.setattr(item_import_service, "cache", test_cache)
+    monkeypatch.setattr(item_autocomplete_service, "cache", test_cache)
+    return test_cache
+
+
+async def make_session() -> AsyncSession:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(
+            lambda sync_connection: Base.metadata.create_all(sync_connection, tables=[CATEGORY, ITEM])
+        )
+        await connection.execute(insert(CATEGORY).values(id=1, name="Fasteners"))
+        await connection.execute(insert(ITEM).values(id=1, item_code="EXISTING-1", name="Stored", category_id=1))
+    return AsyncSession(engine)
+
+
+def upload(text: str) -> io.BytesIO:
+    return io.BytesIO(text.encode("utf-8-sig"))
+
+
+@pytest.mark.unit
+class TestItemImportService:
+    """Test batched validation and loading of item sheets."""
+
+    def test_valid_rows_are_imported_and_others_reported(self, memory_cache):
+        """Test each rejected row is reported with its line number and reason."""
+        async def run():
+            async with await make_session() as db:
+                report = await ItemImportService(db, batch_size=3).import_rows(read_rows("items.csv", upload(CSV)))
+                codes = (await db.execute(select(ITEM.c.item_code).order_by(ITEM.c.id))).scalars().all()
+                return report, codes
+
+        report, codes = asyncio.run(run())
+        assert codes == ["EXISTING-1", "BLT-M8-40", "NUT-M8", "SPR-M8"]
+        assert report["total_rows"] == 8
+        assert report["imported"] == 3
+        assert report["error_count"] == 5
+        errors = {error["row"]: error["errors"] for error in report["errors"]}
+        assert errors[4] == ["item_code: already exists"]
+        assert errors[5] == ["item_code: duplicated in file"]
+        assert errors[6] == ["category_id: category 99 not found"]
+        assert errors[7][0].startswith("item_code:")
+        assert errors[9][0].startswith("category_id:")
+
+    def test_import_announces_new_items(self, memory_cache):
+        """Test the item autocomplete version is bumped after an import."""
+        async def run():
+            async with await make_session() as db:
+                await ItemImportService(db).import_rows(read_rows("items.csv", upload(CSV)))
+            return await memory_cache.get(item_autocomplete_service.VERSION_KEY)
+
+        assert asyncio.run(run()) == 1
+
+    def test_missing_columns_and_unknown_formats_are_rejected(self):
+        """Test unreadable uploads fail as a whole before anything is imported."""
+        with pytest.raises(ImportFormatError, match="category_id"):
+            next(read_rows("items.csv", upload("item_code,name\nA,B\n")))
+        with pytest.raises(ImportFormatError):
+            read_rows("items.json", upload("[]"))
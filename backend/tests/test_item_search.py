@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+from sqlalchemy import insert, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.base_class import Base
+from app.services.item_search_service import CATEGORY, ITEM, ItemSearchService, escape_like, search_terms
+
+ITEMS = [
+    {"id": 1, "item_code": "BLT-M8-40", "name": "Hex bolt M8x40", "description": "Zinc plated", "category_id": 1},
+    {"id": 2, "item_code": "NUT-M8", "name": "Hex nut M8", "description": "For bolt BLT-M8-40", "category_id": 1},
+    {"id": 3, "item_code": "PNL-STEEL-2", "name": "Steel panel 2mm", "description": None, "category_id": 2},
+    {"id": 4, "item_code": "BLT-M10-50", "name": "Hex bolt M10x50", "description": None, "category_id": 1},
+    {"id": 5, "item_code": "WSH-M8", "name": "Hex washer M8", "description": None, "category_id": 3},
+]
+
+
+async def make_session() -> AsyncSession:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(
+            lambda sync_connection: Base.metadata.create_all(sync_connection, tables=[CATEGORY, ITEM])
+        )
+        await connection.execute(insert(CATEGORY), [
+            {"id": 1, "name": "Fasteners", "path": "/1/"},
+            {"id": 2, "name": "Sheet metal", "path": "/2/"},
+            {"id": 3, "name": "Washers", "parent_id": 1, "path": "/1/3/"},
+        ])
+        await connection.execute(insert(ITEM), ITEMS)
+    return AsyncSession(engine)
+
+
+def codes(page):
+    rows = page[0] if isinstance(page, tuple) else page
+    return [row["item_code"] for row in rows]
+
+
+@pytest.mark.unit
+class TestItemSearchService:
+    """Test ranked item search on the SQLite FTS5 fallback."""
+
+    def test_search_terms_split_item_codes(self):
+        """Test punctuation in codes separates search words."""
+        assert search_terms("BLT-M8 bolt") == ["blt", "m8", "bolt"]
+        assert escape_like("50%_") == "50\\%\\_"
+
+    def test_word_prefixes_match_and_code_hits_rank_first(self):
+        """Test partial words match and an item code outranks a description mention."""
+        async def run():
+            async with await make_session() as db:
+                return await ItemSearchService(db).search("blt-m8")
+
+        rows, next_cursor = asyncio.run(run())
+        assert next_cursor is None
+        assert codes(rows) == ["BLT-M8-40", "NUT-M8"]
+        assert rows[0]["category_name"] == "Fasteners"
+
+    def test_category_filter_and_pagination(self):
+        """Test search combines with the category filter and paging."""
+        async def run():
+            async with await make_session() as db:
+                service = ItemSearchService(db)
+                return (
+                    await service.search("hex", category_path="/1/", limit=2),
+                    await service.search("steel", category_path="/1/"),
+                    await service.search(None, skip=2, limit=5),
+                    await service.search("hex", category_path="/1/3/"),
+                    await service.search("washer", category_path="/1/"),
+                )
+
+        hex_items, steel_in_fasteners, unfiltered, hex_washers, washers_in_fasteners = asyncio.run(run())
+        assert len(hex_items[0]) == 2
+        assert steel_in_fasteners == ([], None)
+        assert codes(unfiltered) == ["PNL-STEEL-2", "BLT-M10-50", "WSH-M8"]
+        assert codes(hex_washers) == ["WSH-M8"]
+        # Subcategories are part of the parent's results
+        assert codes(washers_in_fasteners) == ["WSH-M8"]
+
+    def test_cursors_page_through_listing_and_search(self):
+        """Test following next cursors visits every item exactly once."""
+        async def collect(service, search):
+            codes_seen, cursor = [], None
+            while True:
+                rows, cursor = await service.search(search, limit=2, cursor=cursor)
+                codes_seen.extend(codes(rows))
+                if cursor is None:
+                    return codes_seen
+
+        async def run():
+            async with await make_session() as db:
+                service = ItemSearchService(db)
+                return await collect(service, None), await collect(service, "hex")
+
+        listing, hex_items = asyncio.run(run())
+        assert listing == [item["item_code"] for item in ITEMS]
+        assert sorted(hex_items) == ["BLT-M10-50", "BLT-M8-40", "NUT-M8", "WSH-M8"]
+
+    def test_index_follows_inserts_and_updates(self):
+        """Test the triggers keep the FTS table in sync with item."""
+        async def run():
+            async with await make_session() as db:
+                service = ItemSearchService(db)
+                await service.search("bolt")
+                await db.execute(insert(ITEM).values(
+                    id=6, item_code="SPR-M8", name="Spring washer M8", category_id=1
+                ))
+                await db.execute(update(ITEM).where(ITEM.c.id == 3).values(name="Aluminium panel 2mm"))
+                await db.commit()
+                return await service.search("spring"), await service.search("steel"), await service.search("aluminium")
+
+        spring, steel, aluminium = asyncio.run(run())
+        assert codes(spring) == ["SPR-M8"]
+        # Still found through its item code
+        assert codes(steel) == ["PNL-STEEL-2"]
+        assert codes(aluminium) == ["PNL-STEEL-2"]
+
+    def test_search_does_not_commit(self):
+        """Test a search only reads, leaving the caller's transaction to the caller."""
+        async def run():
+            async with await make_session() as db:
+                await db.execute(insert(ITEM).values(id=6, item_code="SPR-M8", name="Spring washer M8", category_id=1))
+                found = await ItemSearchService(db).search("spring")
+                await db.rollback()
+                return found, await ItemSearchService(db).search("spring")
+
+        found, after_rollback = asyncio.run(run())
+        assert codes(found) == ["SPR-M8"]
+        assert codes(after_rollback) == []
+
+    def test_postgresql_statement_uses_tsvector_and_trigram(self):
+        """Test the PostgreSQL query goes through the indexed operators."""
+        sql = str(ItemSearchService.postgresql_statement("blt m8").compile(dialect=postgresql.dialect()))
+        assert "item.search_vector @@ to_tsquery('simple'::regconfig" in sql
+        assert "item.item_code %% " in sql
+        assert "ts_rank_cd" in sql and "similarity" in sql
@@ -0,0 +1,176 @@
+import asyncio
+
+import pytest
+from sqlalchemy import insert
+
+from app.core import cache as cache_module
+from app.core.cache import Cache, MemoryCacheBackend
+from app.core.events import EventBroker, format_sse
+from app.models.order import Order, OrderStatus, OrderType
+from app.models.task import Task, TaskStatus
+from app.services import live_update_service
+from app.services.dashboard_service import DashboardService
+from app.services.live_update_service import PendingUpdates, subscribed_snapshot
+
+
+@pytest.mark.unit
+class TestEventBroker:
+    """Test in-process fan-out of live update events."""
+
+    def test_published_events_reach_every_subscriber(self):
+        """Test each open stream receives each event, numbered in order."""
+        broker = EventBroker()
+
+        async def run():
+            first, second = broker.subscribe(), broker.subscribe()
+            await broker.publish("tasks.counts", {"new": 1})
+            await broker.publish("tasks.counts", {"new": -1, "completed": 1})
+            return [await first.get(), await first.get()], await second.get()
+
+        first_messages, second_message = asyncio.run(run())
+        assert [message["id"] for message in first_messages] == [1, 2]
+        assert first_messages[1]["data"] == {"new": -1, "completed": 1}
+        assert second_message == first_messages[0]
+
+    def test_closed_subscription_stops_receiving(self):
+        """Test a disconnected stream is removed from the fan-out."""
+        broker = EventBroker()
+
+        async def run():
+            subscription = broker.subscribe()
+            subscription.close()
+            await broker.publish("tasks.counts", {"new": 1})
+
+        asyncio.run(run())
+        assert broker.subscriber_count == 0
+
+    def test_slow_subscriber_is_dropped(self):
+        """Test a full queue ends that stream instead of growing without bound."""
+        broker = EventBroker(max_queue=2)
+
+        async def run():
+            slow, fast = broker.subscribe(), broker.subscribe()
+            for count in range(3):
+                await broker.publish("tasks.counts", {"new": count})
+                await fast.get()
+            return await slow.get(), slow.overflowed
+
+        assert asyncio.run(run()) == (None, True)
+
+    def test_publish_later_schedules_on_running_loop(self):
+        """Test ORM hooks running inside the loop can publish synchronously."""
+        broker = EventBroker()
+
+        async def run():
+            subscription = broker.subscribe()
+            broker.publish_later("task.created", {"id": 7})
+            return await asyncio.wait_for(subscription.get(), timeout=1)
+
+        assert asyncio.run(run())["data"] == {"id": 7}
+
+    def test_format_sse(self):
+        """Test the text/event-stream framing."""
+        message = {"id": 3, "type": "orders.active", "data": {"production": 1}}
+        assert format_sse(message) == 'id: 3\nevent: orders.active\ndata: {"production": 1}\n\n'
+
+
+@pytest.mark.unit
+class TestPendingUpdates:
+    """Test the deltas collected from flushed task and order changes."""
+
+    def test_task_status_change_is_a_count_delta(self):
+        """Test a created task and a moved task net out per status."""
+        pending = PendingUpdates()
+        pending.task_moved(None, TaskStatus.NEW)
+        pending.task_moved(TaskStatus.NEW, TaskStatus.IN_PROGRESS)
+        pending.task_moved(TaskStatus.IN_PROGRESS, TaskStatus.IN_PROGRESS)
+
+        assert pending.messages() == [("tasks.counts", {"in_progress": 1})]
+
+    def test_only_active_orders_are_counted(self):
+        """Test orders count while submitted or in progress."""
+        pending = PendingUpdates()
+        pending.order_moved(None, (OrderType.PRODUCTION, OrderStatus.DRAFT))
+        pending.order_moved(
+            (OrderType.PRODUCTION, OrderStatus.DRAFT),
+            (OrderType.PRODUCTION, OrderStatus.SUBMITTED)
+        )
+        pending.order_moved((OrderType.PROCUREMENT, OrderStatus.IN_PROGRESS), None)
+
+        assert pending.messages() == [("orders.active", {"production": 1, "procurement": -1})]
+
+
+@pytest.mark.unit
+class TestSubscribedSnapshot:
+    """Test the first snapshot of a stream against deltas arriving meanwhile."""
+
+    def snapshot(self, monkeypatch, publish_during_reads):
+        """subscribed_snapshot over a fake read that publishes a delta during each of its first reads"""
+        broker = EventBroker()
+        reads = []
+
+        async def dashboard_snapshot(db):
+            reads.append(len(reads) + 1)
+            if len(reads) <= publish_during_reads:
+                await broker.publish("tasks.counts", {"new": 1})
+            return {"reads": len(reads)}
+
+        monkeypatch.setattr(live_update_service, "dashboard_snapshot", dashboard_snapshot)
+
+        async def run():
+            subscription = broker.subscribe()
+            # Committed after subscribing but before the snapshot was read
+            await broker.publish("tasks.counts", {"new": 1})
+            snapshot = await subscribed_snapshot(None, subscription)
+            return snapshot, subscription.drain()
+
+        return asyncio.run(run())
+
+    def test_deltas_counted_in_the_snapshot_are_dropped(self, monkeypatch):
+        """Test deltas queued before a read are dropped and a read that raced a commit is repeated."""
+        snapshot, queued = self.snapshot(monkeypatch, publish_during_reads=1)
+        assert snapshot == {"reads": 2}
+        assert queued == []
+
+    def test_reads_are_bounded(self, monkeypatch):
+        """Test a steady write load gets the last read, with the deltas that arrived during it."""
+        snapshot, queued = self.snapshot(monkeypatch, publish_during_reads=10)
+        assert snapshot == {"reads": live_update_service.SNAPSHOT_READS}
+        assert [message["data"] for message in queued] == [{"new": 1}]
+
+    def test_dropped_subscription_keeps_its_end_marker(self):
+        """Test draining an overflowed subscription leaves the marker that ends its stream."""
+        broker = EventBroker(max_queue=1)
+
+        async def run():
+            subscription = broker.subscribe()
+            for count in range(2):
+                await broker.publish("tasks.counts", {"new": count})
+            return subscription.drain(), await subscription.get()
+
+        assert asyncio.run(run()) == ([], None)
+
+    def test_snapshot_bypasses_a_stale_cached_summary(self, monkeypatch, orm_session_factory):
+        """Test the snapshot counts what is committed now, not the cached summary it would drift from."""
+        monkeypatch.setattr(cache_module, "cache", Cache(MemoryCacheBackend(), namespace="test"))
+        task = {"title": "Cut", "status": TaskStatus.NEW.name, "priority": "MEDIUM"}
+        order = {
+            "order_type": OrderType.PRODUCTION.name, "status": OrderStatus.IN_PROGRESS.name,
+            "created_by_id": 1, "item_id": 1, "quantity": 1,
+        }
+
+        async def run():
+            session_factory = await orm_session_factory({Task.__table__: [task], Order.__table__: [order]})
+            monkeypatch.setattr(cache_module, "computation_session", session_factory)
+            async with session_factory() as db:
+                await DashboardService(db).get_summary()
+                # Committed past the ORM, so the cached summary is now stale
+                await db.execute(insert(Task.__table__), [task])
+                await db.commit()
+                subscription = EventBroker().subscribe()
+                return await DashboardService(db).get_summary(), await subscribed_snapshot(db, subscription)
+
+        stale, snapshot = asyncio.run(run())
+        assert stale["task_summary"] == {TaskStatus.NEW.value: 1}
+        assert snapshot["task_summary"] == {TaskStatus.NEW.value: 2}
+        assert snapshot["active_orders"][OrderType.PRODUCTION.value] == 1
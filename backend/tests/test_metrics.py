@@ -0,0 +1,86 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from app.core.metrics import PrometheusMiddleware, render_metrics
+from app.db.query_stats import current_query_stats, track_queries
+
+engine = create_engine("sqlite://")
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(PrometheusMiddleware)
+
+    @app.get("/metrics-test/items/{item_id}")
+    def read_item(item_id: int):
+        with engine.connect() as connection:
+            for _ in range(3):
+                connection.execute(text("SELECT 1"))
+        if item_id == 0:
+            raise HTTPException(status_code=404, detail="Item not found")
+        return {"id": item_id}
+
+    return app
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.unit
+class TestQueryStats:
+    """Test request-scoped SQL statement accounting."""
+
+    def test_statements_are_counted_inside_block(self):
+        """Test statements are counted only while tracking is active."""
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            with track_queries() as stats:
+                connection.execute(text("SELECT 1"))
+                connection.execute(text("SELECT 2"))
+            connection.execute(text("SELECT 3"))
+
+        assert stats.queries == 2
+        assert stats.seconds >= 0
+        assert current_query_stats() is None
+
+
+@pytest.mark.unit
+class TestPrometheusMiddleware:
+    """Test per-route request metrics."""
+
+    def test_requests_are_labelled_by_route_template(self):
+        """Test metrics use the route template and record status and query count."""
+        route = "/metrics-test/items/{item_id}"
+        before_ok = sample("http_requests_total", method="GET", route=route, status="200")
+        before_missing = sample("http_requests_total", method="GET", route=route, status="404")
+        before_queries = sample("http_request_db_queries_sum", method="GET", route=route)
+
+        client = TestClient(build_app())
+        assert client.get("/metrics-test/items/1").status_code == 200
+        assert client.get("/metrics-test/items/2").status_code == 200
+        assert client.get("/metrics-test/items/0").status_code == 404
+
+        assert sample("http_requests_total", method="GET", route=route, status="200") == before_ok + 2
+        assert sample("http_requests_total", method="GET", route=route, status="404") == before_missing + 1
+        assert sample("http_request_db_queries_sum", method="GET", route=route) == before_queries + 9
+        assert sample("http_requests_in_progress", method="GET") == 0
+
+    def test_unknown_paths_share_one_label(self):
+        """Test unmatched paths don't create a label per path."""
+        before = sample("http_requests_total", method="GET", route="unmatched", status="404")
+
+        client = TestClient(build_app())
+        client.get("/no-such-page-1")
+        client.get("/no-such-page-2")
+
+        assert sample("http_requests_total", method="GET", route="unmatched", status="404") == before + 2
+
+    def test_render_metrics_text_format(self):
+        """Test the scrape output is Prometheus text format."""
+        content, content_type = render_metrics()
+        assert content_type.startswith("text/plain")
+        assert b"http_request_duration_seconds_bucket" in content
@@ -0,0 +1,167 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import Cache, MemoryCacheBackend
+from app.db.base_class import Base
+from app.models.order import OrderStatus, OrderType
+from app.services import order_consolidation_service
+from app.services.order_consolidation_service import (
+    ORDER,
+    ORDER_REQUEST_ITEM,
+    ShortageLine,
+    ShortageOrderConsolidator,
+    earliest,
+    highest_priority,
+)
+
+NOW = datetime(2026, 5, 4, 12)
+
+
+def draft(id, created_hours_ago, item_id=1, order_type=OrderType.PROCUREMENT, quantity=5, **values):
+    return {
+        "id": id,
+        "order_type": order_type,
+        "status": OrderStatus.DRAFT,
+        "priority": "normal",
+        "created_by_id": 1,
+        "item_id": item_id,
+        "quantity": quantity,
+        "version": 1,
+        "created_at": NOW - timedelta(hours=created_hours_ago),
+        "required_date": NOW + timedelta(days=7),
+        **values,
+    }
+
+
+def make_session(orders, links=()):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[ORDER, ORDER_REQUEST_ITEM])
+    with engine.begin() as connection:
+        connection.execute(insert(ORDER), orders)
+        if links:
+            connection.execute(insert(ORDER_REQUEST_ITEM), list(links))
+    return Session(engine)
+
+
+def order_rows(session):
+    return {row["id"]: row for row in session.execute(select(ORDER)).mappings()}
+
+
+def line(request_item_id, quantity=3, **values):
+    return ShortageLine(
+        warehouse_request_item_id=request_item_id,
+        request_id=10,
+        item_id=1,
+        order_type=OrderType.PROCUREMENT,
+        quantity=quantity,
+        **values
+    )
+
+
+@pytest.mark.unit
+class TestShortagePlacement:
+    """Test shortage lines joining an open draft order of their item."""
+
+    def test_lines_join_the_newest_open_draft_of_the_window(self):
+        """Test one update adds up the lines and links each to the draft."""
+        session = make_session([
+            draft(1, created_hours_ago=30),
+            draft(2, created_hours_ago=2),
+            draft(3, created_hours_ago=1, order_type=OrderType.PRODUCTION),
+            draft(4, created_hours_ago=1, status=OrderStatus.SUBMITTED),
+        ])
+        consolidator = ShortageOrderConsolidator(window=timedelta(hours=24), clock=lambda: NOW)
+        placement = consolidator.place(session, [
+            line(100),
+            line(101, quantity=4, priority="urgent", required_date=NOW + timedelta(days=2)),
+        ], created_by_id=1)
+
+        assert placement.created == []
+        assert list(placement.merged) == [2]
+        orders = order_rows(session)
+        assert orders[2]["quantity"] == 12
+        assert orders[2]["priority"] == "urgent"
+        assert orders[2]["required_date"] == NOW + timedelta(days=2)
+        assert orders[2]["version"] == 2
+        assert all(orders[id]["quantity"] == 5 for id in (1, 3, 4))
+        links = session.execute(
+            select(ORDER_REQUEST_ITEM.c.order_id, ORDER_REQUEST_ITEM.c.warehouse_request_item_id, ORDER_REQUEST_ITEM.c.quantity)
+            .order_by(ORDER_REQUEST_ITEM.c.id)
+        ).all()
+        assert [tuple(link) for link in links] == [(2, 100, 3), (2, 101, 4)]
+
+    def test_no_open_draft_in_the_window(self):
+        """Test drafts that are too old, of another type or no longer drafts aren't extended."""
+        session = make_session([
+            draft(1, created_hours_ago=30),
+            draft(3, created_hours_ago=1, order_type=OrderType.PRODUCTION),
+            draft(4, created_hours_ago=1, status=OrderStatus.SUBMITTED),
+        ])
+        consolidator = ShortageOrderConsolidator(window=timedelta(hours=24), clock=lambda: NOW)
+        assert consolidator._add_to_open_draft(session, 1, OrderType.PROCUREMENT, [line(100)]) is None
+
+    def test_merge_values(self):
+        """Test priority and due date of merged lines."""
+        assert highest_priority("normal", None, "high", "low") == "high"
+        assert highest_priority(None) == "normal"
+        assert earliest(None, NOW, NOW - timedelta(days=1)) == NOW - timedelta(days=1)
+        assert earliest(None) is None
+
+
+@pytest.mark.unit
+class TestDraftConsolidation:
+    """Test the periodic merge of open drafts of the same item and order type."""
+
+    def test_drafts_within_the_window_are_merged_into_the_oldest(self):
+        """Test quantities and lines move to the oldest draft and the others are cancelled."""
+        session = make_session(
+            [
+                draft(1, created_hours_ago=40),
+                draft(2, created_hours_ago=30, quantity=2, priority="high"),
+                draft(3, created_hours_ago=10, quantity=1),
+                draft(4, created_hours_ago=5, order_type=OrderType.PRODUCTION),
+                draft(5, created_hours_ago=5, item_id=2),
+                draft(6, created_hours_ago=4, status=OrderStatus.SUBMITTED),
+            ],
+            links=[
+                {"order_id": order_id, "warehouse_request_item_id": 100 + order_id, "quantity": 1}
+                for order_id in range(1, 7)
+            ]
+        )
+        consolidator = ShortageOrderConsolidator(window=timedelta(hours=24), clock=lambda: NOW)
+        merged = consolidator.consolidate(session)
+
+        # Draft 3 is more than a day younger than draft 1, so it starts its own group
+        assert merged == {1: [2]}
+        orders = order_rows(session)
+        assert orders[1]["quantity"] == 7
+        assert orders[1]["priority"] == "high"
+        assert orders[1]["version"] == 2
+        assert orders[2]["status"] == OrderStatus.CANCELLED
+        assert orders[2]["remarks"] == "Consolidated into order #1"
+        assert all(orders[id]["status"] != OrderStatus.CANCELLED for id in (3, 4, 5, 6))
+        links = dict(session.execute(
+            select(ORDER_REQUEST_ITEM.c.warehouse_request_item_id, ORDER_REQUEST_ITEM.c.order_id)
+        ).all())
+        assert links[102] == 1
+        assert links[103] == 3
+
+    def test_merges_invalidate_orders_once_committed(self, monkeypatch):
+        """Test the Core merges drop the "orders" cache tag on commit, not before and not on rollback."""
+        test_cache = Cache(MemoryCacheBackend(), namespace="test")
+        monkeypatch.setattr(order_consolidation_service, "cache", test_cache)
+        session = make_session([draft(1, created_hours_ago=3), draft(2, created_hours_ago=2)])
+        consolidator = ShortageOrderConsolidator(window=timedelta(hours=24), clock=lambda: NOW)
+        epoch = test_cache.tag_epoch(["orders"])
+
+        consolidator.place(session, [line(100)], created_by_id=1)
+        session.rollback()
+        assert test_cache.tag_epoch(["orders"]) == epoch
+
+        assert consolidator.consolidate(session) == {1: [2]}
+        assert test_cache.tag_epoch(["orders"]) == epoch
+        session.commit()
+        assert test_cache.tag_epoch(["orders"]) != epoch
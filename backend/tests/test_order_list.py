@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.order import OrderStatus, OrderType
+from app.schemas.order import OrderSort
+from app.services.order_service import ORDER, OrderService, build_order_facets
+
+START = datetime(2026, 3, 1, tzinfo=timezone.utc)
+STATUSES = list(OrderStatus)
+
+# Ten orders alternating type and cycling through statuses; every third has no required date
+ROWS = [
+    {
+        "id": index + 1,
+        "order_type": OrderType.PROCUREMENT if index % 2 else OrderType.PRODUCTION,
+        "status": STATUSES[index % len(STATUSES)],
+        "priority": "high" if index < 3 else "normal",
+        "created_by_id": 1,
+        "item_id": 1 + index % 2,
+        "quantity": 1,
+        "version": 1,
+        "created_at": START + timedelta(hours=index),
+        "required_date": None if index % 3 == 0 else START + timedelta(days=10 - index),
+    }
+    for index in range(10)
+]
+
+
+@pytest.fixture
+def list_all(sqlite_session_factory):
+    """Ids of every page of an order listing of ROWS, following the cursors"""
+    async def list_all(**kwargs):
+        session_factory = await sqlite_session_factory({ORDER: ROWS})
+        async with session_factory() as db:
+            service = OrderService(db)
+            seen, cursor = [], None
+            while True:
+                orders, cursor = await service.list_orders(3, cursor, **kwargs)
+                seen.extend(order["id"] for order in orders)
+                if cursor is None:
+                    return seen
+
+    return list_all
+
+
+@pytest.mark.unit
+class TestOrderList:
+    """Test the filtered, cursor-paginated order list."""
+
+    def test_sorts(self, list_all):
+        """Test each sort pages through every order once, in order."""
+        assert asyncio.run(list_all()) == list(range(10, 0, -1))
+        assert asyncio.run(list_all(sort=OrderSort.OLDEST)) == list(range(1, 11))
+        # Soonest required date first, orders without one last
+        assert asyncio.run(list_all(sort=OrderSort.DUE)) == [9, 8, 6, 5, 3, 2, 1, 4, 7, 10]
+
+    def test_filters(self, list_all):
+        """Test filters combine, with several statuses allowed."""
+        procurement = asyncio.run(list_all(
+            order_type=OrderType.PROCUREMENT, status=[OrderStatus.DRAFT, OrderStatus.SUBMITTED]
+        ))
+        assert procurement == [6, 2]
+        assert asyncio.run(list_all(item_id=2, priority="high")) == [2]
+        assert asyncio.run(list_all(
+            required_from=START + timedelta(days=3), required_to=START + timedelta(days=8)
+        )) == [8, 6, 5, 3]
+
+
+@pytest.mark.unit
+class TestOrderFacets:
+    """Test facet counts of the order list filters."""
+
+    def test_facets_ignore_their_own_filter(self):
+        """Test each facet counts under the other filters only."""
+        rows = [
+            (OrderType.PROCUREMENT, OrderStatus.DRAFT, "high", 2),
+            (OrderType.PROCUREMENT, OrderStatus.COMPLETED, "normal", 5),
+            (OrderType.PRODUCTION, OrderStatus.DRAFT, "normal", 3),
+            (OrderType.PRODUCTION, OrderStatus.CANCELLED, None, 1),
+        ]
+        facets = build_order_facets(rows, order_type=OrderType.PROCUREMENT, status=[OrderStatus.DRAFT])
+        assert facets["total"] == 2
+        assert facets["order_type"] == {"procurement": 2, "production": 3}
+        assert facets["status"] == {
+            "draft": 2, "submitted": 0, "in_progress": 0, "completed": 5, "cancelled": 0
+        }
+        assert facets["priority"] == {"high": 2}
+
+        unfiltered = build_order_facets(rows)
+        assert unfiltered["total"] == 11
+        assert unfiltered["priority"] == {"high": 2, "normal": 8}
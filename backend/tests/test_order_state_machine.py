@@ -0,0 +1,247 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app.models.order import OrderStatus, OrderType
+from app.models.outbox import OutboxMessage
+from app.models.task import Task, TaskStatus
+from app.models.user import Role, User, user_roles
+from app.schemas.order import OrderStatusChange
+from app.services import order_service
+from app.services.order_service import OrderService
+from app.services.order_state_machine import (
+    ORDER,
+    ORDER_TRANSITIONS,
+    InvalidTransition,
+    OrderStateMachine,
+    OrderTransition,
+    compare_and_swap_status,
+    order_state_machine,
+)
+
+
+# Two submitted procurement orders
+ORDERS = {ORDER: [
+    {
+        "id": order_id,
+        "order_type": OrderType.PROCUREMENT,
+        "status": OrderStatus.SUBMITTED,
+        "created_by_id": 1,
+        "item_id": 1,
+        "quantity": 5,
+        "version": 1,
+    }
+    for order_id in (1, 2)
+]}
+
+
+def transition(new_status, old_status=OrderStatus.IN_PROGRESS):
+    return OrderTransition(
+        order_id=1,
+        order_type=OrderType.PRODUCTION,
+        old_status=old_status,
+        new_status=new_status,
+        version=2,
+        user_id=1,
+        created_by_id=1,
+        quantity=5
+    )
+
+
+@pytest.mark.unit
+class TestOrderStateMachine:
+    """Test allowed order status transitions and on-enter hooks."""
+
+    def test_transitions(self):
+        """Test forward moves are allowed and finished orders stay finished."""
+        order_state_machine.check(OrderStatus.DRAFT, OrderStatus.SUBMITTED)
+        order_state_machine.check(OrderStatus.DRAFT, OrderStatus.IN_PROGRESS)
+        order_state_machine.check(OrderStatus.IN_PROGRESS, OrderStatus.COMPLETED)
+        for status in OrderStatus:
+            if ORDER_TRANSITIONS[status]:
+                order_state_machine.check(status, OrderStatus.CANCELLED)
+        with pytest.raises(InvalidTransition):
+            order_state_machine.check(OrderStatus.DRAFT, OrderStatus.COMPLETED)
+        with pytest.raises(InvalidTransition):
+            order_state_machine.check(OrderStatus.COMPLETED, OrderStatus.IN_PROGRESS)
+        assert order_state_machine.allowed(OrderStatus.CANCELLED) == frozenset()
+
+    def test_hooks_run_on_entering_their_status(self):
+        """Test only the hooks of the status entered run, in registration order."""
+        machine = OrderStateMachine(ORDER_TRANSITIONS)
+        calls = []
+
+        @machine.on_enter(OrderStatus.COMPLETED)
+        async def first(db, change):
+            calls.append(("first", change.new_status))
+
+        @machine.on_enter(OrderStatus.COMPLETED)
+        async def second(db, change):
+            calls.append(("second", change.new_status))
+
+        async def run():
+            await machine.run_hooks(None, transition(OrderStatus.CANCELLED))
+            await machine.run_hooks(None, transition(OrderStatus.COMPLETED))
+
+        asyncio.run(run())
+        assert calls == [("first", OrderStatus.COMPLETED), ("second", OrderStatus.COMPLETED)]
+
+
+@pytest.mark.unit
+class TestCompareAndSwapStatus:
+    """Test status updates conditional on the order's version."""
+
+    def test_stale_version_is_rejected(self, sqlite_session_factory):
+        """Test the second of two writers that read the same version loses."""
+        async def run():
+            session_factory = await sqlite_session_factory(ORDERS)
+            async with session_factory() as db:
+                first = await compare_and_swap_status(db, 1, 1, OrderStatus.IN_PROGRESS, remarks="picked up")
+                second = await compare_and_swap_status(db, 1, 1, OrderStatus.CANCELLED)
+                missing = await compare_and_swap_status(db, 3, 1, OrderStatus.CANCELLED)
+                await db.commit()
+                row = (await db.execute(select(ORDER).where(ORDER.c.id == 1))).mappings().one()
+            return first, second, missing, row
+
+        first, second, missing, row = asyncio.run(run())
+        assert (first, second, missing) == (True, False, False)
+        assert row["status"] == OrderStatus.IN_PROGRESS
+        assert row["version"] == 2
+        assert row["remarks"] == "picked up"
+
+
+class RecordingOutbox:
+    """Collects audit entries instead of staging outbox rows"""
+
+    def __init__(self):
+        self.audits = []
+
+    def audit(self, **entry):
+        self.audits.append(entry)
+
+
+@pytest.mark.unit
+class TestTransitionOrders:
+    """Test batch status changes, each order succeeding or failing on its own."""
+
+    @pytest.fixture
+    def completed(self, monkeypatch):
+        """A fresh machine whose only hook records completed orders"""
+        machine = OrderStateMachine(ORDER_TRANSITIONS)
+        completed = []
+
+        @machine.on_enter(OrderStatus.COMPLETED)
+        async def record(db, change):
+            completed.append((change.order_id, change.version))
+
+        monkeypatch.setattr(order_service, "order_state_machine", machine)
+        return completed
+
+    @pytest.fixture
+    def transition_orders(self, sqlite_session_factory):
+        """Applies a batch to ORDERS; its results, the order rows by id and the audit entries"""
+        def transition_orders(changes):
+            async def run():
+                session_factory = await sqlite_session_factory(ORDERS)
+                async with session_factory() as db:
+                    service = OrderService(db)
+                    service.outbox = RecordingOutbox()
+                    results = await service.transition_orders(changes, user_id=7)
+                    rows = (await db.execute(select(ORDER).order_by(ORDER.c.id))).mappings().all()
+                return results, {row["id"]: row for row in rows}, service.outbox.audits
+
+            return asyncio.run(run())
+
+        return transition_orders
+
+    def test_conflict_and_not_found_are_per_order(self, completed, transition_orders):
+        """Test a stale version and a missing id fail alone while the rest apply."""
+        results, rows, audits = transition_orders([
+            OrderStatusChange(order_id=1, status=OrderStatus.IN_PROGRESS, version=1),
+            OrderStatusChange(order_id=2, status=OrderStatus.IN_PROGRESS, version=3),
+            OrderStatusChange(order_id=99, status=OrderStatus.CANCELLED),
+        ])
+
+        assert results[0] == {"order_id": 1, "outcome": "applied", "status": OrderStatus.IN_PROGRESS, "version": 2}
+        assert results[1]["outcome"] == "conflict"
+        assert (results[1]["status"], results[1]["version"]) == (OrderStatus.SUBMITTED, 1)
+        assert results[2] == {"order_id": 99, "outcome": "not_found", "detail": "Order not found"}
+        assert (rows[1]["status"], rows[1]["version"]) == (OrderStatus.IN_PROGRESS, 2)
+        assert (rows[2]["status"], rows[2]["version"]) == (OrderStatus.SUBMITTED, 1)
+        assert [audit["resource_id"] for audit in audits] == [1]
+        assert completed == []
+
+    def test_repeated_order_continues_from_its_previous_change(self, completed, transition_orders):
+        """Test a second change of the same order in a batch starts from the first one's version."""
+        results, rows, audits = transition_orders([
+            OrderStatusChange(order_id=1, status=OrderStatus.IN_PROGRESS),
+            OrderStatusChange(order_id=1, status=OrderStatus.COMPLETED, version=2),
+        ])
+
+        assert [(result["outcome"], result["version"]) for result in results] == [("applied", 2), ("applied", 3)]
+        assert (rows[1]["status"], rows[1]["version"]) == (OrderStatus.COMPLETED, 3)
+        assert len(audits) == 2
+        # Only entering COMPLETED runs the hook
+        assert completed == [(1, 3)]
+
+    def test_invalid_transition_keeps_the_order(self, completed, transition_orders):
+        """Test a move the state machine forbids is reported and changes nothing."""
+        results, rows, audits = transition_orders([
+            OrderStatusChange(order_id=2, status=OrderStatus.COMPLETED),
+        ])
+
+        assert results[0]["outcome"] == "invalid_transition"
+        assert (rows[2]["status"], rows[2]["version"]) == (OrderStatus.SUBMITTED, 1)
+        assert audits == [] and completed == []
+
+
+@pytest.mark.unit
+class TestMarkOrderPurchased:
+    """Test buying a procurement order through the ORM, version check included."""
+
+    ROWS = {
+        User.__table__: [
+            {"id": 1, "email": "buyer@example.com", "is_active": True, "role_version": 0, "is_warehouse_staff": False},
+            {"id": 2, "email": "warehouse@example.com", "is_active": True, "role_version": 0, "is_warehouse_staff": True},
+        ],
+        Role.__table__: [{"id": 1, "name": "warehouse_manager"}],
+        user_roles: [{"user_id": 2, "role_id": 1}],
+        ORDER: [
+            {"id": 1, "order_type": OrderType.PROCUREMENT, "status": OrderStatus.DRAFT,
+             "created_by_id": 1, "item_id": 1, "quantity": 5, "version": 1},
+            {"id": 2, "order_type": OrderType.PROCUREMENT, "status": OrderStatus.COMPLETED,
+             "created_by_id": 1, "item_id": 1, "quantity": 5, "version": 1},
+        ],
+    }
+
+    def test_draft_purchase_starts_the_order_with_a_receiving_task(self, orm_session_factory):
+        """Test a shortage draft is bought: started, priced, with a task and the staged audit and notice."""
+        async def run():
+            session_factory = await orm_session_factory(self.ROWS)
+            async with session_factory() as db:
+                order = await OrderService(db).mark_order_purchased(1, "Acme", 12.5, user_id=1)
+                task = (await db.execute(select(Task.__table__))).mappings().one()
+                messages = (await db.execute(
+                    select(OutboxMessage.__table__).order_by(OutboxMessage.__table__.c.id)
+                )).mappings().all()
+            return order, task, messages
+
+        order, task, messages = asyncio.run(run())
+        assert (order.status, order.version, order.price, order.vendor_name) == (OrderStatus.IN_PROGRESS, 2, 1250, "Acme")
+        assert task["status"] == TaskStatus.NEW
+        assert (task["creator_id"], task["assignee_id"], task["order_id"]) == (1, None, 1)
+        assert [message["topic"] for message in messages] == ["audit", "notification"]
+        assert messages[1]["payload"]["user_id"] == 2
+        assert messages[1]["payload"]["link"] == f"/tasks/{task['id']}"
+
+    def test_finished_order_cannot_be_bought(self, orm_session_factory):
+        """Test a completed order is refused and left as it was."""
+        async def run():
+            session_factory = await orm_session_factory(self.ROWS)
+            async with session_factory() as db:
+                with pytest.raises(InvalidTransition):
+                    await OrderService(db).mark_order_purchased(2, "Acme", 12.5, user_id=1)
+                return (await db.execute(select(ORDER.c.status).where(ORDER.c.id == 2))).scalar_one()
+
+        assert asyncio.run(run()) == OrderStatus.COMPLETED
@@ -0,0 +1,105 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.services.outbox_service import OUTBOX, OutboxDispatcher
+
+START = datetime(2024, 5, 1, 8, tzinfo=timezone.utc)
+
+
+class FakeClock:
+    """Manually advanced clock for retry backoff tests."""
+    def __init__(self):
+        self.now = START
+
+    def __call__(self):
+        return self.now
+
+
+def pending(messages):
+    """Outbox rows of (topic, payload) messages, due now"""
+    return {OUTBOX: [
+        {"topic": topic, "payload": payload, "status": "pending", "attempts": 0, "available_at": START}
+        for topic, payload in messages
+    ]}
+
+
+async def outbox_rows(session_factory):
+    async with session_factory() as db:
+        result = await db.execute(select(OUTBOX).order_by(OUTBOX.c.id))
+        return [dict(row) for row in result.mappings()]
+
+
+@pytest.mark.unit
+class TestOutboxDispatcher:
+    """Test batched outbox dispatch with retries and dead-lettering."""
+
+    def test_batches_are_dispatched_in_order(self, sqlite_session_factory):
+        """Test due messages are handled oldest first, one batch per call."""
+        handled = []
+
+        async def record(db, payload):
+            handled.append(payload["n"])
+
+        async def run():
+            session_factory = await sqlite_session_factory(pending([("record", {"n": n}) for n in range(5)]))
+            dispatcher = OutboxDispatcher(
+                session_factory, handlers={"record": record}, batch_size=3, clock=FakeClock()
+            )
+            claimed = [await dispatcher.dispatch_batch() for _ in range(3)]
+            return claimed, await outbox_rows(session_factory)
+
+        claimed, rows = asyncio.run(run())
+        assert claimed == [3, 2, 0]
+        assert handled == [0, 1, 2, 3, 4]
+        assert {row["status"] for row in rows} == {"done"}
+        assert all(row["attempts"] == 1 for row in rows)
+
+    def test_failures_back_off_and_are_dead_lettered(self, sqlite_session_factory):
+        """Test a failing message is retried after a growing delay, then given up on."""
+        handled = []
+
+        async def record(db, payload):
+            handled.append(payload["n"])
+
+        async def fail(db, payload):
+            raise RuntimeError("SMTP unavailable")
+
+        async def run():
+            session_factory = await sqlite_session_factory(pending([("fail", {}), ("record", {"n": 1}), ("unknown", {})]))
+            clock = FakeClock()
+            dispatcher = OutboxDispatcher(
+                session_factory,
+                handlers={"record": record, "fail": fail},
+                max_attempts=3,
+                retry_base_seconds=10,
+                clock=clock
+            )
+            claimed = [await dispatcher.dispatch_batch()]
+            # Not due again before the backoff has passed
+            clock.now += timedelta(seconds=9)
+            claimed.append(await dispatcher.dispatch_batch())
+            clock.now += timedelta(seconds=1)
+            claimed.append(await dispatcher.dispatch_batch())
+            clock.now += timedelta(seconds=20)
+            claimed.append(await dispatcher.dispatch_batch())
+            claimed.append(await dispatcher.dispatch_batch())
+            return claimed, await outbox_rows(session_factory)
+
+        claimed, rows = asyncio.run(run())
+        # The healthy message isn't held back by its failing neighbours
+        assert handled == [1]
+        assert claimed == [3, 0, 2, 2, 0]
+        failing, healthy, unknown = rows
+        assert healthy["status"] == "done"
+        assert failing["status"] == unknown["status"] == "dead"
+        assert failing["attempts"] == 3
+        assert failing["last_error"] == "RuntimeError: SMTP unavailable"
+        assert "No outbox handler" in unknown["last_error"]
+
+    def test_retry_delay_is_capped(self):
+        """Test the exponential backoff stops growing at the maximum."""
+        dispatcher = OutboxDispatcher(retry_base_seconds=2, retry_max_seconds=60)
+        assert [dispatcher.retry_delay(attempts).total_seconds() for attempts in (1, 2, 3, 10)] == [2, 4, 8, 60]
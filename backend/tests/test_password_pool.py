@@ -0,0 +1,99 @@
+import asyncio
+import threading
+
+import pytest
+from app.core.password_pool import PasswordHasherPool, PasswordHashingBusy
+
+
+class MockContext:
+    """Mock CryptContext with cheap, reversible hashing."""
+    def __init__(self, gate: threading.Event = None):
+        self.gate = gate
+        self.threads = set()
+
+    def hash(self, password: str) -> str:
+        self.threads.add(threading.current_thread().name)
+        if self.gate is not None:
+            self.gate.wait(timeout=5)
+        return f"hashed:{password}"
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        self.threads.add(threading.current_thread().name)
+        return hashed_password == f"hashed:{plain_password}"
+
+
+@pytest.mark.unit
+class TestPasswordHasherPool:
+    """Test the bounded password hashing pool."""
+
+    def test_hash_and_verify_run_off_the_event_loop(self):
+        """Test hashing and verification run on the pool's worker threads."""
+        context = MockContext()
+        pool = PasswordHasherPool(context, max_workers=2, max_queue=4)
+
+        async def run():
+            hashed = await pool.hash("secret")
+            return hashed, await pool.verify("secret", hashed), await pool.verify("wrong", hashed)
+
+        try:
+            assert asyncio.run(run()) == ("hashed:secret", True, False)
+        finally:
+            pool.shutdown()
+        assert all(name.startswith("password-hash") for name in context.threads)
+        assert pool.stats()["completed"] == 3
+
+    def test_hash_many_preserves_order(self):
+        """Test batch hashing returns hashes in input order."""
+        pool = PasswordHasherPool(MockContext(), max_workers=3, max_queue=4)
+        passwords = [f"pw{i}" for i in range(10)]
+        try:
+            hashes = asyncio.run(pool.hash_many(passwords))
+        finally:
+            pool.shutdown()
+
+        assert hashes == [f"hashed:{password}" for password in passwords]
+        # One job per bulk worker, not one per password
+        assert pool.stats()["completed"] == 2
+
+    def test_batches_leave_a_worker_for_verify(self):
+        """Test concurrent batches never take every worker, so logins still verify."""
+        gate = threading.Event()
+        pool = PasswordHasherPool(MockContext(gate), max_workers=3, max_queue=8)
+
+        async def run():
+            batches = [asyncio.ensure_future(pool.hash_many(["a", "b", "c"])) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            assert pool.stats()["running"] == 2
+            verified = await asyncio.wait_for(pool.verify("secret", "hashed:secret"), timeout=1)
+            gate.set()
+            return verified, await asyncio.gather(*batches)
+
+        try:
+            verified, batches = asyncio.run(run())
+        finally:
+            gate.set()
+            pool.shutdown()
+        assert verified is True
+        assert batches == [["hashed:a", "hashed:b", "hashed:c"]] * 2
+
+    def test_rejects_work_when_queue_is_full(self):
+        """Test calls beyond max_queue fail fast instead of waiting."""
+        gate = threading.Event()
+        pool = PasswordHasherPool(MockContext(gate), max_workers=1, max_queue=2)
+
+        async def run():
+            blocked = [asyncio.ensure_future(pool.hash(f"pw{i}")) for i in range(2)]
+            await asyncio.sleep(0)
+            with pytest.raises(PasswordHashingBusy):
+                await pool.hash("one too many")
+            assert pool.stats()["pending"] == 2
+            gate.set()
+            return await asyncio.gather(*blocked)
+
+        try:
+            assert asyncio.run(run()) == ["hashed:pw0", "hashed:pw1"]
+        finally:
+            pool.shutdown()
+        stats = pool.stats()
+        assert stats["rejected"] == 1
+        assert stats["pending"] == 0
@@ -0,0 +1,123 @@
+import pytest
+from app.core.principal_cache import CachedRole, Principal, PrincipalCache
+from app.core.security import has_any_role, has_role
+
+
+class MockRole:
+    """Mock role class for testing."""
+    def __init__(self, id: int, name: str, description: str = ""):
+        self.id = id
+        self.name = name
+        self.description = description
+
+
+class MockUser:
+    """Mock user class for testing."""
+    def __init__(self, id: int, email: str, is_active: bool = True, roles=None):
+        self.id = id
+        self.email = email
+        self.full_name = "Test User"
+        self.is_active = is_active
+        self.is_warehouse_staff = False
+        self.role_version = 0
+        self.roles = roles or []
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_principal(user_id: int = 1, role_names=("manager",)) -> Principal:
+    return Principal(
+        id=user_id,
+        email=f"user{user_id}@test.com",
+        full_name="Test User",
+        is_active=True,
+        is_warehouse_staff=False,
+        roles=tuple(CachedRole(id=i, name=name) for i, name in enumerate(role_names)),
+    )
+
+
+@pytest.mark.unit
+class TestPrincipal:
+    """Test the immutable principal snapshot."""
+
+    def test_from_user_copies_roles(self):
+        """Test from_user snapshots the user's roles."""
+        user = MockUser(1, "admin@test.com", roles=[MockRole(1, "admin"), MockRole(2, "manager")])
+        principal = Principal.from_user(user)
+
+        assert principal.id == 1
+        assert principal.role_names == frozenset({"admin", "manager"})
+
+        # Later changes to the ORM object don't leak into the snapshot
+        user.roles.append(MockRole(3, "supervisor"))
+        assert "supervisor" not in principal.role_names
+
+    def test_principal_is_immutable(self):
+        """Test principals can't be modified in place."""
+        principal = make_principal()
+        with pytest.raises(AttributeError):
+            principal.is_active = False
+
+    def test_role_helpers_accept_principal(self):
+        """Test has_role/has_any_role work on principals."""
+        principal = make_principal(role_names=("manager",))
+        assert has_role(principal, "manager") is True
+        assert has_any_role(principal, ["admin", "manager"]) is True
+        assert has_any_role(principal, ["admin"]) is False
+
+
+@pytest.mark.unit
+class TestPrincipalCache:
+    """Test the bounded TTL/LRU principal cache."""
+
+    def test_get_returns_cached_principal(self):
+        """Test a cached principal is returned for the same subject and issue time."""
+        cache = PrincipalCache(maxsize=10, ttl_seconds=60)
+        principal = make_principal()
+        cache.set("user1@test.com", 1000, principal)
+
+        assert cache.get("user1@test.com", 1000) is principal
+        assert cache.get("user1@test.com", 2000) is None
+
+    def test_entries_expire_after_ttl(self):
+        """Test entries are dropped once their TTL has passed."""
+        clock = FakeClock()
+        cache = PrincipalCache(maxsize=10, ttl_seconds=60, clock=clock)
+        cache.set("user1@test.com", 1000, make_principal())
+
+        clock.now = 59
+        assert cache.get("user1@test.com", 1000) is not None
+        clock.now = 60
+        assert cache.get("user1@test.com", 1000) is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test the cache stays bounded by evicting the least recently used entry."""
+        cache = PrincipalCache(maxsize=2, ttl_seconds=60)
+        cache.set("a", 1, make_principal(1))
+        cache.set("b", 1, make_principal(2))
+        cache.get("a", 1)
+        cache.set("c", 1, make_principal(3))
+
+        assert cache.get("a", 1) is not None
+        assert cache.get("b", 1) is None
+        assert cache.get("c", 1) is not None
+
+    def test_invalidate_user_drops_all_tokens_of_user(self):
+        """Test invalidation removes every token of the user and nothing else."""
+        cache = PrincipalCache(maxsize=10, ttl_seconds=60)
+        cache.set("user1@test.com", 1, make_principal(1))
+        cache.set("user1@test.com", 2, make_principal(1))
+        cache.set("user2@test.com", 1, make_principal(2))
+
+        assert cache.invalidate_user(1) == 2
+        assert cache.get("user1@test.com", 1) is None
+        assert cache.get("user1@test.com", 2) is None
+        assert cache.get("user2@test.com", 1) is not None
@@ -0,0 +1,90 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.base_class import Base
+from app.models.production_daily_rollup import ProductionDailyRollup
+from app.models.production_report import ShiftEnum
+from app.services.production_rollup_service import ProductionRollupService
+
+ROLLUP = ProductionDailyRollup.__table__
+
+
+class MockLog:
+    """Mock production log."""
+    def __init__(self, item_id: int, produced: float, target: float, efficiency: float):
+        self.item_id = item_id
+        self.quantity_produced = produced
+        self.target_quantity = target
+        self.efficiency = efficiency
+
+
+class MockReport:
+    """Mock production report with logs."""
+    def __init__(self, report_date: date, logs):
+        self.report_date = report_date
+        self.shift = ShiftEnum.MORNING
+        self.production_logs = logs
+
+
+async def make_session() -> AsyncSession:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    tables = [Base.metadata.tables["item_category"], Base.metadata.tables["item"], ROLLUP]
+    async with engine.begin() as connection:
+        await connection.run_sync(lambda sync_connection: Base.metadata.create_all(sync_connection, tables=tables))
+    return AsyncSession(engine)
+
+
+@pytest.mark.unit
+class TestProductionRollupService:
+    """Test incremental maintenance of the daily production rollup."""
+
+    def test_rollup_rows_sum_logs_per_item(self):
+        """Test logs of the same item are summed into one row."""
+        report = MockReport(date(2026, 1, 5), [
+            MockLog(1, 8, 10, 80),
+            MockLog(1, 5, 5, 100),
+            MockLog(2, 3, 6, 50),
+        ])
+        rows = {row["item_id"]: row for row in ProductionRollupService.rollup_rows(report)}
+
+        assert rows[1]["quantity_produced"] == 13
+        assert rows[1]["target_quantity"] == 15
+        assert rows[1]["weighted_efficiency"] == 80 * 10 + 100 * 5
+        assert rows[1]["log_count"] == 2
+        assert rows[2]["log_count"] == 1
+
+    def test_apply_report_accumulates_into_existing_rows(self):
+        """Test a second report for the same date, shift and item adds to the row."""
+        today = date(2026, 1, 5)
+
+        async def run():
+            async with await make_session() as db:
+                service = ProductionRollupService(db)
+                await service.apply_report(MockReport(today, [MockLog(1, 8, 10, 80)]))
+                await service.apply_report(MockReport(today, [MockLog(1, 5, 5, 100), MockLog(2, 3, 6, 50)]))
+                await db.commit()
+                result = await db.execute(
+                    select(ROLLUP.c.item_id, ROLLUP.c.quantity_produced, ROLLUP.c.log_count)
+                    .order_by(ROLLUP.c.item_id)
+                )
+                return result.all()
+
+        assert asyncio.run(run()) == [(1, 13.0, 2), (2, 3.0, 1)]
+
+    def test_daily_efficiency_is_target_weighted(self):
+        """Test the dashboard's efficiency rows weight efficiency by target, per day with production."""
+        today = date(2026, 1, 5)
+
+        async def run():
+            async with await make_session() as db:
+                service = ProductionRollupService(db)
+                await service.apply_report(MockReport(today, [MockLog(1, 8, 10, 80), MockLog(2, 10, 30, 100)]))
+                await db.commit()
+                statement = service.daily_efficiency_statement(today - timedelta(days=1), today)
+                return (await db.execute(statement)).all()
+
+        assert asyncio.run(run()) == [("efficiency", "2026-01-05", 95.0)]
@@ -0,0 +1,69 @@
+import logging
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.core.query_counter import QueryCounterMiddleware, query_budget
+from app.db.query_stats import QueryBudgetExceeded
+
+engine = create_engine("sqlite://")
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(QueryCounterMiddleware)
+
+    @app.get("/rows/{count}")
+    def read_rows(count: int):
+        with engine.connect() as connection:
+            for row_id in range(count):
+                connection.execute(text("SELECT :row_id"), {"row_id": row_id})
+        return {"count": count}
+
+    @app.get("/budgeted/{count}", dependencies=[Depends(query_budget(3))])
+    def read_budgeted(count: int):
+        return read_rows(count)
+
+    return app
+
+
+@pytest.mark.unit
+class TestQueryCounterMiddleware:
+    """Test per-request query counting and N+1 detection."""
+
+    def test_query_count_header(self):
+        """Test every response reports its statement count."""
+        response = TestClient(build_app()).get("/rows/2")
+
+        assert response.headers["X-Query-Count"] == "2"
+        assert "X-Query-Time-Ms" in response.headers
+        assert "X-Query-Repeated" not in response.headers
+
+    def test_repeated_statement_is_flagged(self, caplog):
+        """Test a statement repeated per row is reported in header and log."""
+        with caplog.at_level(logging.WARNING, logger="app.core.query_counter"):
+            response = TestClient(build_app()).get(f"/rows/{settings.n_plus_one_threshold + 1}")
+
+        assert response.headers["X-Query-Repeated"] == str(settings.n_plus_one_threshold + 1)
+        assert "Possible N+1 on GET /rows/{count}" in caplog.text
+        assert "SELECT ?" in caplog.text
+
+    def test_budget_overrun_is_logged(self, caplog):
+        """Test a route over its budget is logged when not enforced."""
+        with caplog.at_level(logging.WARNING, logger="app.core.query_counter"):
+            response = TestClient(build_app()).get("/budgeted/4")
+
+        assert response.status_code == 200
+        assert "Query budget exceeded on GET /budgeted/{count}: 4 queries, budget 3" in caplog.text
+
+    def test_budget_is_enforced(self, monkeypatch):
+        """Test an enforced budget fails the statement that exceeds it."""
+        monkeypatch.setattr(settings, "query_budget_enforce", True)
+        client = TestClient(build_app())
+
+        assert client.get("/budgeted/3").status_code == 200
+        with pytest.raises(QueryBudgetExceeded):
+            client.get("/budgeted/4")
@@ -0,0 +1,164 @@
+import asyncio
+import inspect
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.principal_cache import RoleState, role_versions
+from app.core.security import create_access_token, get_current_principal, get_current_user, require_roles
+from app.db.session import get_primary_async_db
+
+
+class MockRole:
+    """Mock role class for testing."""
+    def __init__(self, id: int, name: str):
+        self.id = id
+        self.name = name
+        self.description = ""
+
+
+class MockUser:
+    """Mock user class for testing."""
+    def __init__(self, id: int, email: str, role_names=(), role_version: int = 0):
+        self.id = id
+        self.email = email
+        self.full_name = "Claims User"
+        self.is_active = True
+        self.is_warehouse_staff = True
+        self.role_version = role_version
+        self.roles = [MockRole(i, name) for i, name in enumerate(role_names)]
+
+
+class MockSession:
+    """Answers the role state lookup with a fixed row and counts queries"""
+    def __init__(self, row=None):
+        self.row = row
+        self.queries = 0
+
+    async def execute(self, statement):
+        self.queries += 1
+        return SimpleNamespace(first=lambda: self.row)
+
+
+@pytest.fixture(autouse=True)
+def reset_role_versions():
+    asyncio.run(cache.clear())
+    yield
+    asyncio.run(cache.clear())
+
+
+async def known(user_id: int, role_version: int = 0, is_active: bool = True):
+    await role_versions.record(user_id, RoleState(role_version, is_active))
+
+
+@pytest.mark.unit
+class TestRoleClaims:
+    """Test role claims embedded in access tokens."""
+
+    def test_token_embeds_role_claims(self):
+        """Test create_access_token embeds the user's roles and role version."""
+        user = MockUser(7, "manager@test.com", role_names=["manager", "admin"], role_version=3)
+        token = create_access_token({"sub": user.email}, user=user)
+        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+
+        assert payload["uid"] == 7
+        assert payload["roles"] == ["admin", "manager"]
+        assert payload["rv"] == 3
+        assert payload["wh"] is True
+
+    def test_token_without_user_has_no_role_claims(self):
+        """Test tokens stay minimal when no user is given."""
+        token = create_access_token({"sub": "user@test.com"})
+        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        assert "roles" not in payload
+
+    @pytest.mark.asyncio
+    async def test_principal_built_from_claims_without_db(self):
+        """Test the principal comes from the token alone (no session used)."""
+        user = MockUser(7, "manager@test.com", role_names=["manager"])
+        token = create_access_token({"sub": user.email}, user=user)
+        await known(7)
+
+        principal = await get_current_principal(token, db=None)
+
+        assert principal.id == 7
+        assert principal.full_name == "Claims User"
+        assert principal.role_names == frozenset({"manager"})
+
+    @pytest.mark.asyncio
+    async def test_role_check_on_claims_principal(self):
+        """Test require_roles authorizes a principal built from claims."""
+        user = MockUser(7, "manager@test.com", role_names=["manager"])
+        await known(7)
+        principal = await get_current_principal(create_access_token({"sub": user.email}, user=user), db=None)
+
+        assert await require_roles(["manager", "admin"])(principal) == principal
+        with pytest.raises(HTTPException) as exc_info:
+            await require_roles("admin")(principal)
+        assert exc_info.value.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_stale_role_version_rejected(self):
+        """Test tokens issued before a role change are rejected."""
+        user = MockUser(7, "manager@test.com", role_names=["manager"], role_version=1)
+        token = create_access_token({"sub": user.email}, user=user)
+        await known(7, role_version=2)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_principal(token, db=None)
+        assert exc_info.value.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_deactivated_user_rejected(self):
+        """Test a deactivated user's current-version token no longer passes."""
+        user = MockUser(7, "manager@test.com", role_names=["manager"], role_version=1)
+        token = create_access_token({"sub": user.email}, user=user)
+        await known(7, role_version=1, is_active=False)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_principal(token, db=None)
+        assert exc_info.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_unknown_role_version_is_read_from_the_database(self):
+        """Test a missing shared entry is looked up once, not taken as fresh."""
+        user = MockUser(7, "manager@test.com", role_names=["manager"], role_version=1)
+        token = create_access_token({"sub": user.email}, user=user)
+        db = MockSession(SimpleNamespace(role_version=2, is_active=True))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_principal(token, db=db)
+        assert exc_info.value.status_code == 401
+        # Recorded for every worker; the next check doesn't query
+        assert await role_versions.get(7) == RoleState(2, True)
+        with pytest.raises(HTTPException):
+            await get_current_principal(token, db=db)
+        assert db.queries == 1
+
+    @pytest.mark.asyncio
+    async def test_deleted_user_rejected(self):
+        """Test a token of a user that no longer exists is rejected."""
+        user = MockUser(7, "manager@test.com", role_names=["manager"])
+        token = create_access_token({"sub": user.email}, user=user)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_principal(token, db=MockSession(None))
+        assert exc_info.value.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_stale_read_does_not_undo_a_revocation(self):
+        """Test a state read before a revocation never replaces the newer version."""
+        await known(7, role_version=2, is_active=False)
+        await role_versions.record(7, RoleState(1, True))
+        assert await role_versions.get(7) == RoleState(2, False)
+
+        await role_versions.record(7, RoleState(3, True))
+        assert await role_versions.get(7) == RoleState(3, True)
+
+    def test_role_state_is_read_on_the_primary(self):
+        """Test the authentication dependencies never take a replica session."""
+        for dependency in (get_current_user, get_current_principal):
+            assert inspect.signature(dependency).parameters["db"].default.dependency is get_primary_async_db
@@ -0,0 +1,219 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select, update
+
+from app.db.unit_of_work import UnitOfWork
+from app.models.audit import AuditLog
+from app.models.notification import Notification
+from app.models.order import Order, OrderStatus, OrderType
+from app.models.outbox import OutboxMessage
+from app.models.route_card import RouteCard, RouteStatus
+from app.models.task import Task, TaskStatus
+from app.models.user import User
+from app.services.audit_service import AuditService
+from app.services.notification_service import NotificationService
+from app.services.order_state_machine import InvalidTransition, OrderConflict
+from app.services.route_card_service import RouteCardService
+
+ORDER = Order.__table__
+ROUTE_CARD = RouteCard.__table__
+TASK = Task.__table__
+OUTBOX = OutboxMessage.__table__
+
+
+class MockSession:
+    """Records commits and rollbacks of a sync session"""
+
+    def __init__(self):
+        self.calls = []
+
+    def commit(self):
+        self.calls.append("commit")
+
+    def rollback(self):
+        self.calls.append("rollback")
+
+
+class MockAsyncSession(MockSession):
+    """Records commits and rollbacks of an async session"""
+
+    async def commit(self):
+        self.calls.append("commit")
+
+    async def rollback(self):
+        self.calls.append("rollback")
+
+
+@pytest.mark.unit
+class TestUnitOfWork:
+    """Test one commit per business operation across nested service calls."""
+
+    def test_nested_blocks_commit_once_at_the_outermost(self):
+        """Test a service step inside another operation doesn't commit on its own."""
+        db = MockAsyncSession()
+        uow = UnitOfWork(db)
+
+        async def run():
+            async with uow:
+                async with uow:
+                    assert uow.active
+                assert db.calls == []
+            assert not uow.active
+
+        asyncio.run(run())
+        assert db.calls == ["commit"]
+
+    def test_failure_rolls_back_the_whole_operation(self):
+        """Test an error in a nested step rolls back everything staged."""
+        db = MockAsyncSession()
+        uow = UnitOfWork(db)
+
+        async def run():
+            async with uow:
+                async with uow:
+                    raise ValueError("Order not found")
+
+        with pytest.raises(ValueError):
+            asyncio.run(run())
+        assert db.calls == ["rollback"]
+        assert uow.depth == 0
+
+    def test_sync_sessions(self):
+        """Test the same scope works as a plain context manager on a sync session."""
+        db = MockSession()
+        uow = UnitOfWork(db)
+        with uow:
+            with uow:
+                pass
+        with pytest.raises(RuntimeError):
+            with uow:
+                raise RuntimeError("approval failed")
+        assert db.calls == ["commit", "rollback"]
+
+
+def route_card_rows(order_status):
+    return {
+        User.__table__: [{"id": 1, "email": "planner@example.com", "is_active": True, "role_version": 0}],
+        ORDER: [{
+            "id": 1, "order_type": OrderType.PRODUCTION, "status": order_status,
+            "created_by_id": 1, "item_id": 1, "quantity": 5, "version": 1,
+        }],
+        ROUTE_CARD: [{
+            "id": 1, "order_id": 1, "status": RouteStatus.DRAFT, "created_by_id": 1,
+            "materials": [{"item_id": 7, "quantity": 2, "unit": "kg"}], "workstations": ["saw"],
+        }],
+    }
+
+
+async def committed_state(session_factory):
+    """Route card, order and task rows and staged outbox topics, read on a fresh session"""
+    async with session_factory() as db:
+        route_card = (await db.execute(select(ROUTE_CARD))).mappings().one()
+        order = (await db.execute(select(ORDER))).mappings().one()
+        tasks = (await db.execute(select(TASK))).mappings().all()
+        topics = (await db.execute(select(OUTBOX.c.topic).order_by(OUTBOX.c.id))).scalars().all()
+    return route_card, order, tasks, topics
+
+
+@pytest.mark.unit
+class TestConfirmRouteCard:
+    """Test confirming a route card as one unit of work on a real session."""
+
+    def test_confirm_starts_the_order_and_creates_the_task(self, orm_session_factory):
+        """Test the card, its draft order, the preparation task and the outbox commit together."""
+        async def run():
+            session_factory = await orm_session_factory(route_card_rows(OrderStatus.DRAFT))
+            async with session_factory() as db:
+                confirmed = await RouteCardService(db).confirm_route_card(1, user_id=1)
+            return confirmed, await committed_state(session_factory)
+
+        confirmed, (route_card, order, tasks, topics) = asyncio.run(run())
+        assert confirmed.status == RouteStatus.CONFIRMED
+        assert confirmed.order.status == OrderStatus.IN_PROGRESS
+        assert route_card["status"] == RouteStatus.CONFIRMED
+        assert (order["status"], order["version"]) == (OrderStatus.IN_PROGRESS, 2)
+        assert [(task["status"], task["creator_id"], task["assignee_id"], task["route_card_id"]) for task in tasks] == [
+            (TaskStatus.NEW, 1, None, 1)
+        ]
+        # The order's status change, the card's, then the notification
+        assert topics == ["audit", "audit", "notification"]
+
+    def test_finished_order_rolls_the_confirmation_back(self, orm_session_factory):
+        """Test an order the state machine can't start leaves card and tasks untouched."""
+        async def run():
+            session_factory = await orm_session_factory(route_card_rows(OrderStatus.COMPLETED))
+            async with session_factory() as db:
+                with pytest.raises(InvalidTransition):
+                    await RouteCardService(db).confirm_route_card(1, user_id=1)
+            return await committed_state(session_factory)
+
+        route_card, order, tasks, topics = asyncio.run(run())
+        assert route_card["status"] == RouteStatus.DRAFT
+        assert order["status"] == OrderStatus.COMPLETED
+        assert tasks == [] and topics == []
+
+    def test_concurrent_order_change_is_a_conflict(self, orm_session_factory):
+        """Test an order changed after the card was loaded raises OrderConflict and rolls back."""
+        async def run():
+            session_factory = await orm_session_factory(route_card_rows(OrderStatus.SUBMITTED))
+            async with session_factory() as db:
+                service = RouteCardService(db)
+                load = service.get_route_card
+
+                async def load_then_change(route_card_id):
+                    route_card = await load(route_card_id)
+                    # Another writer's change lands after the card and its order were read
+                    await db.execute(update(ORDER).where(ORDER.c.id == 1).values(version=ORDER.c.version + 1))
+                    return route_card
+
+                service.get_route_card = load_then_change
+                with pytest.raises(OrderConflict):
+                    await service.confirm_route_card(1, user_id=1)
+            return await committed_state(session_factory)
+
+        route_card, order, tasks, topics = asyncio.run(run())
+        assert route_card["status"] == RouteStatus.DRAFT
+        assert (order["status"], order["version"]) == (OrderStatus.SUBMITTED, 1)
+        assert tasks == [] and topics == []
+
+
+@pytest.mark.unit
+class TestAuditAndNotifications:
+    """Test the audit and notification services against the real tables."""
+
+    def test_login_and_logout_are_logged_against_the_user(self, orm_session_factory):
+        """Test auth events commit with the user as their record."""
+        async def run():
+            session_factory = await orm_session_factory(route_card_rows(OrderStatus.DRAFT))
+            async with session_factory() as db:
+                await AuditService(db).log_login(1, ip_address="10.0.0.1")
+                await AuditService(db).log_logout(1)
+            async with session_factory() as db:
+                return (await db.execute(select(AuditLog.__table__))).mappings().all()
+
+        logs = asyncio.run(run())
+        assert [(log["action"], log["table_name"], log["record_id"]) for log in logs] == [
+            ("login", "auth", 1), ("logout", "auth", 1)
+        ]
+        assert logs[0]["changes"] == {"ip_address": "10.0.0.1"}
+
+    def test_unread_notifications_are_listed_and_marked_read(self, orm_session_factory):
+        """Test unread filtering and marking work on the notification's read flag."""
+        async def run():
+            rows = route_card_rows(OrderStatus.DRAFT)
+            rows[Notification.__table__] = [
+                {"id": notification_id, "user_id": 1, "title": "Task", "content": "New task", "type": "TASK", "read": False}
+                for notification_id in (1, 2, 3)
+            ]
+            session_factory = await orm_session_factory(rows)
+            async with session_factory() as db:
+                service = NotificationService(db)
+                assert await service.mark_as_read(1, user_id=1)
+                unread = [notification.id for notification in await service.get_user_notifications(1, unread_only=True)]
+                return unread, await service.mark_all_as_read(1), await service.get_user_notifications(1, unread_only=True)
+
+        unread, marked, left = asyncio.run(run())
+        assert sorted(unread) == [2, 3]
+        assert marked == 2
+        assert left == []
@@ -0,0 +1,280 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.api.v1 import warehouse_requests
+from app.db.base_class import Base
+from app.models.order import OrderStatus, OrderType
+from app.models.outbox import OutboxMessage
+from app.models.user import Role, User, user_roles
+from app.models.warehouse_request import WarehouseRequest, WarehouseRequestItem
+from app.schemas.warehouse_request import WarehouseRequestItemsUpdate, WarehouseRequestItemUpdate
+from app.services import warehouse_request_service
+from app.services.order_consolidation_service import ORDER, ORDER_REQUEST_ITEM, ShortageOrderConsolidator
+from app.services.warehouse_request_service import (
+    REQUEST_ITEM,
+    WAREHOUSE_REQUEST,
+    all_items_processed,
+    apply_item_updates,
+    warehouse_request_filters,
+)
+
+NOW = datetime(2026, 5, 4, 12)
+OUTBOX = OutboxMessage.__table__
+USER = User.__table__
+ROLE = Role.__table__
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[WAREHOUSE_REQUEST, REQUEST_ITEM])
+    with engine.begin() as connection:
+        connection.execute(insert(WAREHOUSE_REQUEST), [
+            {"id": 1, "project_name": "Line 1", "created_by_id": 1},
+            {"id": 2, "project_name": "Line 2", "created_by_id": 1},
+        ])
+        connection.execute(insert(REQUEST_ITEM), [
+            {"id": 1, "request_id": 1, "item_id": 1, "quantity_requested": 5, "status": "ready"},
+            {"id": 2, "request_id": 1, "item_id": 2, "quantity_requested": 5, "status": "pending"},
+            {"id": 3, "request_id": 2, "item_id": 1, "quantity_requested": 5, "status": "backordered"},
+        ])
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.mark.unit
+class TestWarehouseRequestService:
+    """Test the warehouse request list filters and the all-processed aggregate."""
+
+    def test_all_items_processed_follows_item_statuses(self, db):
+        """Test a request is processed once none of its items is pending."""
+        assert all_items_processed(db, 1) is False
+        assert all_items_processed(db, 2) is True
+
+        db.execute(update(REQUEST_ITEM).where(REQUEST_ITEM.c.id == 2).values(status="backordered"))
+        assert all_items_processed(db, 1) is True
+
+        db.execute(update(REQUEST_ITEM).where(REQUEST_ITEM.c.id == 3).values(status=None))
+        assert all_items_processed(db, 2) is False
+
+    def test_non_staff_filters_are_limited_to_own_requests(self):
+        """Test only warehouse staff lists other users' requests."""
+        staff = SimpleNamespace(id=1, is_warehouse_staff=True)
+        requester = SimpleNamespace(id=2, is_warehouse_staff=False)
+        assert warehouse_request_filters(staff) == []
+        filters = warehouse_request_filters(requester, status="draft")
+        assert [str(clause) for clause in filters] == [
+            "warehouse_request.status = :status_1",
+            "warehouse_request.created_by_id = :created_by_id_1",
+        ]
+
+
+class Row(SimpleNamespace):
+    """Stands in for a mapped row: assigned fields are recorded and written through, as autoflush would"""
+
+    def __init__(self, db, table, **values):
+        super().__init__(**values)
+        self.__dict__.update(_db=db, _table=table, assigned=[])
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        self.assigned.append((name, value))
+        self._db.execute(update(self._table).where(self._table.c.id == self.id).values({name: value}))
+
+
+class RequestItemQuery:
+    """request_item_query over Row items, applying the endpoint's `==` and `in_` filters"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def filter(self, *clauses):
+        rows = self.rows
+        for clause in clauses:
+            values = clause.right.value
+            values = values if isinstance(values, (list, tuple)) else [values]
+            rows = [row for row in rows if getattr(row, clause.left.key) in values]
+        return RequestItemQuery(rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+@pytest.fixture
+def kit(db, monkeypatch, configured_mappers):
+    """
+    Request 1 with lines 1 (ready, item 1), 2 (pending, item 2), 4 (pending,
+    item 1) and 5 (pending, item 2), and open draft orders 10 and 20 for items 1 and 2.
+    Placements stage outbox messages, so the ORM is needed.
+    """
+    Base.metadata.create_all(db.get_bind(), tables=[ORDER, ORDER_REQUEST_ITEM, OUTBOX, USER, ROLE, user_roles])
+    db.execute(insert(REQUEST_ITEM), [
+        {"id": 4, "request_id": 1, "item_id": 1, "quantity_requested": 2, "status": "pending"},
+        {"id": 5, "request_id": 1, "item_id": 2, "quantity_requested": 7, "status": "pending"},
+    ])
+    db.execute(insert(ORDER), [
+        {
+            "id": item_id * 10,
+            "order_type": OrderType.PROCUREMENT,
+            "status": OrderStatus.DRAFT,
+            "priority": "normal",
+            "created_by_id": 1,
+            "item_id": item_id,
+            "quantity": 1,
+            "version": 1,
+            "created_at": NOW - timedelta(hours=1),
+        }
+        for item_id in (1, 2)
+    ])
+    db.commit()
+    monkeypatch.setattr(
+        warehouse_request_service,
+        "shortage_order_consolidator",
+        ShortageOrderConsolidator(window=timedelta(hours=24), clock=lambda: NOW)
+    )
+
+    request = Row(db, WAREHOUSE_REQUEST, id=1, priority="high", status="submitted")
+    purchased = SimpleNamespace(category=SimpleNamespace(name="Purchased"))
+    items = {
+        row["id"]: Row(db, REQUEST_ITEM, request=request, item=purchased, **row)
+        for row in db.execute(select(REQUEST_ITEM)).mappings()
+    }
+    monkeypatch.setattr(warehouse_requests, "request_item_query", lambda db: RequestItemQuery(list(items.values())))
+    return request, items
+
+
+def staged_messages(db):
+    return [(row["topic"], row["payload"]) for row in db.execute(select(OUTBOX).order_by(OUTBOX.c.id)).mappings()]
+
+
+def linked_orders(db):
+    return {
+        row["warehouse_request_item_id"]: row["order_id"]
+        for row in db.execute(select(ORDER_REQUEST_ITEM)).mappings()
+    }
+
+
+@pytest.mark.unit
+class TestApplyItemUpdates:
+    """Test line updates of one request applied in a single transaction."""
+
+    def test_backordered_lines_share_one_order_per_item(self, db, kit):
+        """Test backordered lines of the same item go on one order and the request moves on once."""
+        request, items = kit
+        placement = apply_item_updates(db, request, [
+            (items[2], WarehouseRequestItemUpdate(status="backordered")),
+            (items[4], WarehouseRequestItemUpdate(status="backordered")),
+            (items[5], WarehouseRequestItemUpdate(status="backordered", remarks="supplier late")),
+        ], user_id=1)
+
+        assert placement.created == []
+        assert {order_id: [line.warehouse_request_item_id for line in lines] for order_id, lines in placement.merged.items()} == {
+            10: [4],
+            20: [2, 5],
+        }
+        assert linked_orders(db) == {2: 20, 4: 10, 5: 20}
+        quantities = {row["id"]: row["quantity"] for row in db.execute(select(ORDER)).mappings()}
+        assert quantities == {10: 1 + 2, 20: 1 + 5 + 7}
+        assert items[5].remarks == "supplier late"
+        assert request.assigned == [("status", "processing")]
+
+    def test_placements_are_audited_and_new_orders_announced(self, db, kit):
+        """Test lines added to a draft are audited and a new order is audited and sent to its team."""
+        request, items = kit
+        db.execute(insert(USER), [{"id": 3, "email": "lead@example.com", "is_active": True, "role_version": 0}])
+        db.execute(insert(ROLE), [{"id": 1, "name": "procurement_lead"}])
+        db.execute(insert(user_roles), [{"user_id": 3, "role_id": 1}])
+        db.execute(insert(REQUEST_ITEM), [{"id": 6, "request_id": 1, "item_id": 3, "quantity_requested": 4, "status": "pending"}])
+        new_item = Row(db, REQUEST_ITEM, request=request, item=items[5].item, id=6, request_id=1, item_id=3, quantity_requested=4)
+
+        placement = apply_item_updates(db, request, [
+            (items[5], WarehouseRequestItemUpdate(status="backordered")),
+            (new_item, WarehouseRequestItemUpdate(status="backordered")),
+        ], user_id=1)
+
+        order_id = placement.created[0].id
+        messages = staged_messages(db)
+        assert [(topic, payload.get("action"), payload.get("resource_id", payload["user_id"])) for topic, payload in messages] == [
+            ("audit", "UPDATE", 20),
+            ("audit", "CREATE", order_id),
+            ("notification", None, 3),
+        ]
+        assert messages[0][1]["details"] == {"consolidated": {"warehouse_request_item_id": 5, "quantity": 7}}
+        assert messages[2][1]["link"] == f"/orders/{order_id}"
+
+    def test_request_waits_for_its_last_line(self, db, kit):
+        """Test the request status stays while a line is still pending, then changes once."""
+        request, items = kit
+        apply_item_updates(db, request, [
+            (items[2], WarehouseRequestItemUpdate(status="ready")),
+            (items[4], WarehouseRequestItemUpdate(status="ready")),
+        ], user_id=1)
+        assert request.assigned == []
+        assert linked_orders(db) == {}
+
+        apply_item_updates(db, request, [(items[5], WarehouseRequestItemUpdate(status="ready"))], user_id=1)
+        assert request.assigned == [("status", "processing")]
+
+
+    def test_loaded_items_are_flushed_before_the_status_check(self, db, configured_mappers):
+        """Test updates to mapped items count in the all-processed check without autoflush."""
+        db.autoflush = False
+        request = db.get(WarehouseRequest, 1)
+        pending = db.get(WarehouseRequestItem, 2)
+
+        apply_item_updates(db, request, [(pending, WarehouseRequestItemUpdate(status="ready"))], user_id=1)
+
+        assert db.execute(select(WAREHOUSE_REQUEST.c.status).where(WAREHOUSE_REQUEST.c.id == 1)).scalar() == "processing"
+
+
+@pytest.mark.unit
+class TestUpdateWarehouseRequestItems:
+    """Test the bulk line update endpoint."""
+
+    staff = SimpleNamespace(id=1, is_warehouse_staff=True)
+
+    def update(self, db, *lines, request_id=1):
+        return warehouse_requests.update_warehouse_request_items(
+            db=db,
+            request_id=request_id,
+            items_update=WarehouseRequestItemsUpdate(items=list(lines)),
+            current_user=self.staff
+        )
+
+    def test_empty_and_duplicate_lines_are_rejected(self, db, kit):
+        """Test an empty line list and a line given twice are bad requests."""
+        with pytest.raises(HTTPException) as empty:
+            self.update(db)
+        with pytest.raises(HTTPException) as duplicate:
+            self.update(db, {"id": 2, "status": "ready"}, {"id": 2, "status": "backordered"})
+
+        assert (empty.value.status_code, empty.value.detail) == (400, "No items to update")
+        assert duplicate.value.status_code == 400
+        assert linked_orders(db) == {}
+
+    def test_missing_lines_are_listed(self, db, kit):
+        """Test unknown ids and ids of another request are all named in the 404."""
+        with pytest.raises(HTTPException) as missing:
+            self.update(db, {"id": 2, "status": "ready"}, {"id": 3, "status": "ready"}, {"id": 99, "status": "ready"})
+
+        assert missing.value.status_code == 404
+        assert missing.value.detail == "Warehouse request item(s) not found: 3, 99"
+        request, items = kit
+        assert items[2].assigned == []
+
+    def test_summary(self, db, kit):
+        """Test the response counts lines, extended orders and the new request status."""
+        result = self.update(
+            db,
+            {"id": 2, "status": "backordered"},
+            {"id": 4, "status": "ready", "quantity_fulfilled": 2},
+            {"id": 5, "status": "backordered"},
+        )
+
+        assert result == {"updated": 3, "orders_created": 0, "orders_extended": 1, "request_status": "processing"}
+        assert linked_orders(db) == {2: 20, 5: 20}
@@ -54,6 +54,18 @@ export const dashboard = {
   getActiveOrders: async () => {
     const response = await apiClient.get('/api/v1/dashboard/orders/active');
     return response.data;
+  },
+
+  // Live updates over Server-Sent Events; EventSource can't send headers,
+  // so the token goes in the query string. Returns the EventSource to close.
+  subscribe: (handlers) => {
+    const token = localStorage.getItem('access_token');
+    const url = `${import.meta.env.VITE_API_URL || ''}/api/v1/events/stream?access_token=${encodeURIComponent(token || '')}`;
+    const source = new EventSource(url);
+    Object.entries(handlers).forEach(([eventType, handler]) => {
+      source.addEventListener(eventType, (event) => handler(JSON.parse(event.data)));
+    });
+    return source;
   }
 };
 
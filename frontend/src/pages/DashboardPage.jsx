@@ -5,6 +5,19 @@ import ProductionEfficiencyWidget from '../components/molecules/ProductionEffici
 import ActiveOrdersWidget from '../components/molecules/ActiveOrdersWidget';
 import { dashboard } from '../api/apiClient';
 
+// Matches the pie chart labels of /dashboard/tasks/overview
+const formatStatus = (status) =>
+  status.split('_').map((word) => word.charAt(0).toUpperCase() + word.slice(1)).join(' ');
+
+const applyTaskDeltas = (taskOverview, deltas) => {
+  const counts = new Map(taskOverview.map((slice) => [slice.name, slice.value]));
+  Object.entries(deltas).forEach(([status, delta]) => {
+    const name = formatStatus(status);
+    counts.set(name, Math.max(0, (counts.get(name) || 0) + delta));
+  });
+  return Array.from(counts, ([name, value]) => ({ name, value }));
+};
+
 const DashboardPage = () => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -39,9 +52,50 @@ const DashboardPage = () => {
 
     fetchDashboardData();
 
-    // Refresh dashboard data every 5 minutes
-    const interval = setInterval(fetchDashboardData, 5 * 60 * 1000);
-    return () => clearInterval(interval);
+    // Task and order counters follow live updates; the snapshot sent on every
+    // (re)connect resets them, the deltas in between are applied in place
+    const source = dashboard.subscribe({
+      'dashboard.snapshot': (snapshot) => {
+        setDashboardData((current) => ({
+          ...current,
+          taskOverview: Object.entries(snapshot.task_summary).map(([status, count]) => ({
+            name: formatStatus(status),
+            value: count
+          })),
+          activeOrders: snapshot.active_orders
+        }));
+      },
+      'tasks.counts': (deltas) => {
+        setDashboardData((current) => ({
+          ...current,
+          taskOverview: applyTaskDeltas(current.taskOverview, deltas)
+        }));
+      },
+      'orders.active': (deltas) => {
+        setDashboardData((current) => {
+          const activeOrders = { ...current.activeOrders };
+          Object.entries(deltas).forEach(([orderType, delta]) => {
+            activeOrders[orderType] = Math.max(0, (activeOrders[orderType] || 0) + delta);
+          });
+          return { ...current, activeOrders };
+        });
+      }
+    });
+
+    // Efficiency only changes with new production reports, so it is still polled
+    const interval = setInterval(async () => {
+      try {
+        const productionEfficiency = await dashboard.getProductionEfficiency();
+        setDashboardData((current) => ({ ...current, productionEfficiency: productionEfficiency.data }));
+      } catch (err) {
+        console.error('Production efficiency refresh error:', err);
+      }
+    }, 5 * 60 * 1000);
+
+    return () => {
+      source.close();
+      clearInterval(interval);
+    };
   }, []);
 
   if (loading) {